@@ -0,0 +1,281 @@
+"""Adaptive admission control for every task the server runs.
+
+Accepting every request under overload queues it all behind the event
+loop, the rate limiter and the provider, until every request times out.
+An AdaptiveLimiter admits at most `limit` tasks at once and lets up to
+`max_queue` more wait, each for at most `queue_timeout` seconds. Anything
+beyond that is rejected at once with Overloaded, which the API turns into
+429 with a Retry-After header. Callers that already bound their own
+concurrency (batch items, jobs) may wait for a slot without those bounds
+instead.
+
+The limit adapts AIMD-style to observed task latency:
+
+- additive increase: a task that finishes within `latency_tolerance`
+  times the baseline latency, while the limit was in use, raises the limit
+  by 1/limit (about +1 per limit's worth of completions)
+- multiplicative decrease: a slower task, or one the provider failed,
+  while at least half the limit was in use, multiplies the limit by
+  `backoff`; at most once per baseline latency, so a burst of slow
+  completions counts once, and never for the odd long task on an idle
+  server
+
+The baseline is a slow moving average of task latency. Throughput then
+stays near the level where latency starts to climb, instead of collapsing
+under a growing backlog.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.config import settings
+from app.metrics import ADMISSION_LIMIT, ADMISSION_QUEUED, ADMISSION_REJECTED
+
+logger = logging.getLogger(__name__)
+
+BASELINE_SMOOTHING = 0.02  # Weight of each latency sample in the baseline
+MAX_RETRY_AFTER = 60  # Seconds
+
+
+class Overloaded(Exception):
+    """Raised instead of admitting a request while the limiter is full."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Server overloaded ({reason}); retry in {retry_after}s")
+
+
+class Slot:
+    """A held admission slot; set `failed` if the provider failed the task.
+
+    Failed tasks count as congestion when the slot is released, so only
+    mark provider-side failures (timeouts, 429/5xx, an open LLM breaker).
+    Other failures, such as unparseable output, are left to the latency
+    signal. A task that raises counts as failed.
+    """
+
+    def __init__(self) -> None:
+        self.failed = False
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded FIFO wait queue.
+
+    Args:
+        initial_limit: Concurrent tasks admitted before any latency is known
+        min_limit: The limit never drops below this
+        max_limit: The limit never grows beyond this
+        max_queue: Requests that may wait for a slot; more are rejected
+        queue_timeout: Seconds a request may wait before it is rejected
+        latency_tolerance: Latency over this multiple of the baseline
+            counts as congestion
+        backoff: Factor the limit is multiplied by on congestion
+        enabled: If False every request is admitted at once
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 64,
+        min_limit: int = 4,
+        max_limit: int = 1000,
+        max_queue: int = 100,
+        queue_timeout: float = 5.0,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.9,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.enabled = enabled
+        self._clock = clock
+
+        self.in_flight = 0
+        self._queue: deque[asyncio.Future[None]] = deque()
+        self._baseline: float | None = None  # Seconds
+        self._last_decrease = -math.inf
+        # admitted, queued, rejected_queue_full, rejected_queue_timeout,
+        # increases, decreases
+        self.counts: Counter[str] = Counter()
+        ADMISSION_LIMIT.set(self.limit)
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait: roughly one queue's worth."""
+        baseline = self._baseline or 1.0
+        seconds = baseline * (len(self._queue) + 1) / max(1.0, self.limit)
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(seconds)))
+
+    async def acquire(self, wait: bool = False) -> float:
+        """Wait for a slot; returns the time it was granted.
+
+        Args:
+            wait: Wait however long it takes, even past a full queue,
+                instead of being rejected
+
+        Raises:
+            Overloaded: If the queue is full or the wait timed out
+        """
+        if self.in_flight < self.limit and not self._queue:
+            self.in_flight += 1
+            self.counts["admitted"] += 1
+            return self._clock()
+
+        if not wait and len(self._queue) >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queue.append(waiter)
+        self.counts["queued"] += 1
+        ADMISSION_QUEUED.inc()
+        try:
+            async with asyncio.timeout(None if wait else self.queue_timeout):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the wait ended: pass the slot on
+                self.release(None)
+            elif waiter in self._queue:
+                self._queue.remove(waiter)
+            if isinstance(e, TimeoutError):
+                self._reject("queue_timeout")
+            raise
+        finally:
+            ADMISSION_QUEUED.dec()
+        self.counts["admitted"] += 1
+        return self._clock()
+
+    def release(self, started: float | None, failed: bool = False) -> None:
+        """Free a slot and adapt the limit to how the task went.
+
+        Args:
+            started: What `acquire` returned; None records no latency sample
+                (e.g. the client went away)
+            failed: Whether the task failed on the provider's side
+        """
+        # Share of the limit in use; full while requests queue
+        if self._queue or self.in_flight >= math.floor(self.limit):
+            in_use = 1.0
+        else:
+            in_use = self.in_flight / self.limit
+        self.in_flight -= 1
+        if started is not None:
+            self._adapt(self._clock() - started, failed, in_use)
+        self._grant()
+
+    @asynccontextmanager
+    async def slot(self, wait: bool = False) -> AsyncIterator[Slot]:
+        """Hold a slot for the duration of the block.
+
+        The block may mark the yielded Slot failed; raising does so too.
+
+        Args:
+            wait: As for `acquire`
+
+        Raises:
+            Overloaded: If the request isn't admitted
+        """
+        held = Slot()
+        if not self.enabled:
+            yield held
+            return
+        started: float | None = await self.acquire(wait)
+        try:
+            yield held
+        except asyncio.CancelledError:
+            started = None  # Not a latency sample
+            raise
+        except Exception:
+            held.failed = True
+            raise
+        finally:
+            self.release(started, held.failed)
+
+    def _adapt(self, latency: float, failed: bool, in_use: float) -> None:
+        """AIMD step; `in_use` is the share of the limit that was in flight."""
+        if self._baseline is None:
+            self._baseline = latency
+        now = self._clock()
+        if failed or latency > self.latency_tolerance * self._baseline:
+            if in_use >= 0.5 and now - self._last_decrease >= self._baseline:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                self.counts["decreases"] += 1
+        elif in_use >= 1.0:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.counts["increases"] += 1
+        self._baseline += BASELINE_SMOOTHING * (latency - self._baseline)
+        ADMISSION_LIMIT.set(self.limit)
+
+    def _grant(self) -> None:
+        """Hand free slots to waiting requests, oldest first."""
+        while self._queue and self.in_flight < self.limit:
+            waiter = self._queue.popleft()
+            if waiter.done():
+                continue  # Cancelled
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _reject(self, reason: str) -> None:
+        self.counts[f"rejected_{reason}"] += 1
+        ADMISSION_REJECTED.labels(reason).inc()
+        retry_after = self.retry_after()
+        logger.warning(
+            "admission.rejected",
+            extra={
+                "reason": reason,
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "retry_after": retry_after,
+            },
+        )
+        raise Overloaded(reason, retry_after)
+
+    def stats(self) -> dict[str, Any]:
+        """Current limit, queue depth and counters, for status reporting."""
+        return {
+            "enabled": self.enabled,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._queue),
+            "max_queue": self.max_queue,
+            "baseline_latency_ms": round(self._baseline * 1000, 1)
+            if self._baseline is not None
+            else None,
+            "admitted": self.counts["admitted"],
+            "queued": self.counts["queued"],
+            "rejected": {
+                "queue_full": self.counts["rejected_queue_full"],
+                "queue_timeout": self.counts["rejected_queue_timeout"],
+            },
+            "increases": self.counts["increases"],
+            "decreases": self.counts["decreases"],
+        }
+
+
+def build_admission_limiter() -> AdaptiveLimiter:
+    """Create the task admission limiter from settings."""
+    return AdaptiveLimiter(
+        initial_limit=settings.admission_initial_limit,
+        min_limit=settings.admission_min_limit,
+        max_limit=settings.admission_max_limit,
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout_seconds,
+        latency_tolerance=settings.admission_latency_tolerance,
+        enabled=settings.admission_control,
+    )
+
+
+admission = build_admission_limiter()
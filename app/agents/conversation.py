@@ -0,0 +1,111 @@
+"""Per-task conversation history for the observation loop."""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from app.schemas.task import AgentDecision, Observation, TaskInput
+
+
+class Conversation:
+    """Message history of a single task, built incrementally.
+
+    Owned by `process_task` for the lifetime of one task. Each turn appends
+    the assistant decision (with the real tool arguments it asked for) and a
+    single message carrying that turn's observations. Earlier messages are
+    never re-serialized, so building the prompt stays O(1) per iteration.
+
+    The system prompt is not stored here; the agent prepends it when
+    building the request, so registry changes are picked up mid-task.
+    """
+
+    def __init__(self, task_input: TaskInput):
+        self.task_input = task_input
+        self.observations: list[Observation] = []
+        self._messages: list[dict[str, str]] = [
+            {"role": "user", "content": format_task(task_input)}
+        ]
+        # (index in messages, observations) per observation message
+        self._observation_turns: list[tuple[int, list[Observation]]] = []
+
+    @property
+    def messages(self) -> list[dict[str, str]]:
+        """Messages so far, excluding the system prompt. Do not mutate."""
+        return self._messages
+
+    @property
+    def observation_turns(self) -> list[tuple[int, list[Observation]]]:
+        """Index in `messages` and observations of each observation message."""
+        return self._observation_turns
+
+    def add_prefetched(self, observations: list[Observation]) -> None:
+        """Add results looked up before the first decision to the task message.
+
+        Only valid before the first decision, while the task message is the
+        only message.
+        """
+        if len(self._messages) != 1:
+            raise RuntimeError("Prefetched results must precede the first decision")
+        self.observations.extend(observations)
+        self._messages[0] = {
+            "role": "user",
+            "content": format_task(self.task_input, self.observations),
+        }
+
+    def add_decision(self, decision: AgentDecision) -> None:
+        """Append the agent's decision as an assistant message."""
+        self._messages.append(
+            {
+                "role": "assistant",
+                "content": decision.model_dump_json(exclude_defaults=True),
+            }
+        )
+
+    def add_observations(self, observations: list[Observation]) -> None:
+        """Append the observations of one turn as a single user message."""
+        self.observations.extend(observations)
+        self._observation_turns.append((len(self._messages), list(observations)))
+        self._messages.append(
+            {"role": "user", "content": format_observations(observations)}
+        )
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or spaces, to keep prompts small."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def format_task(
+    task_input: TaskInput, prefetched: list[Observation] | None = None
+) -> str:
+    """Format the initial task message, with any prefetched tool results."""
+    message = f"Task: {task_input.task}"
+
+    if task_input.context:
+        message += f"\n\nContext:\n{compact_json(task_input.context)}"
+
+    if prefetched:
+        results = "\n\n".join(format_observation(obs) for obs in prefetched)
+        message += f"\n\nAlready looked up from the context:\n\n{results}"
+
+    return message
+
+
+def format_observation(observation: Observation) -> str:
+    """Format a tool observation for the agent."""
+    if observation.success:
+        return (
+            f"Tool '{observation.tool_name}' executed successfully.\n\n"
+            f"Result:\n{compact_json(observation.result)}"
+        )
+    else:
+        return f"Tool '{observation.tool_name}' failed.\n\nError: {observation.error}"
+
+
+def format_observations(
+    observations: list[Observation],
+    format_one: Callable[[Observation], str] = format_observation,
+) -> str:
+    """Format one turn's observations as a single user message."""
+    body = "\n\n".join(format_one(obs) for obs in observations)
+    return f"{body}\n\nWhat would you like to do next?"
@@ -0,0 +1,261 @@
+"""Cache of LLM decisions keyed on the exact request sent to the model."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.schemas.task import AgentDecision
+
+logger = logging.getLogger(__name__)
+
+# Writes to shared backends happen here, so a put never waits on the disk
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="decision-cache")
+
+
+class CacheBackend(ABC):
+    """Storage for serialized decisions."""
+
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        """Return the stored value, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a value, evicting old entries if needed."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk cache shared by every worker process on the host.
+
+    Uses WAL mode so readers in other uvicorn workers don't block writers.
+    Expired rows are ignored on read and pruned, together with the least
+    recently used rows beyond `max_entries`, every PRUNE_EVERY writes.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM decisions WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE decisions SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM decisions WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM decisions WHERE key NOT IN ("
+            " SELECT key FROM decisions ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+
+class DecisionCache:
+    """Reuses decisions for requests identical to one already answered.
+
+    The key hashes the model name, temperature, decision mode and canonical
+    JSON of the full message list, so any change in prompt, tools,
+    observations or in how the decision is requested is a miss. Only the decision is cached: a cached USE_TOOL decision still goes
+    through the dispatcher, so side effects are never skipped or replayed
+    from cache.
+
+    Lookups go to the in-process LRU first, then to the shared backend (if
+    any), whose hits are copied into the LRU. `aget` reads the shared
+    backend in a thread, and writes to it are made in the background, so
+    neither blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        temperature: float,
+        memory: MemoryCacheBackend,
+        shared: CacheBackend | None = None,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.memory = memory
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, messages: list[dict[str, str]], decision_mode: str = "prompt") -> str:
+        """Hash of everything that determines the model's answer."""
+        payload = json.dumps(
+            {
+                "model": self.model,
+                "temperature": self.temperature,
+                "decision_mode": decision_mode,
+                "messages": messages,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> AgentDecision | None:
+        """Return the cached decision for a key, counting the hit or miss."""
+        value = self.memory.get(key)
+        if value is None and self.shared is not None:
+            value = self._get_shared(key)
+        return self._decode(key, value)
+
+    async def aget(self, key: str) -> AgentDecision | None:
+        """`get` for the event loop: the shared backend is read in a thread."""
+        value = self.memory.get(key)
+        if value is None and self.shared is not None:
+            value = await asyncio.to_thread(self._get_shared, key)
+        return self._decode(key, value)
+
+    def _get_shared(self, key: str) -> str | None:
+        assert self.shared is not None
+        try:
+            return self.shared.get(key)
+        except sqlite3.Error as e:
+            logger.warning("agent.cache.shared_error", extra={"error": str(e)})
+            return None
+
+    def _decode(self, key: str, value: str | None) -> AgentDecision | None:
+        """Count a lookup's result; shared hits are copied into the LRU."""
+        if value is None:
+            self.misses += 1
+            return None
+
+        try:
+            decision = AgentDecision.model_validate_json(value)
+        except ValidationError:
+            self.misses += 1
+            return None
+
+        if self.memory.get(key) is None:
+            self.memory.set(key, value)
+        self.hits += 1
+        return decision
+
+    def put(self, key: str, decision: AgentDecision) -> None:
+        """Store a validated decision; the shared backend is written later."""
+        value = decision.model_dump_json()
+        self.memory.set(key, value)
+        if self.shared is not None:
+            _writer.submit(self._set_shared, key, value)
+
+    def _set_shared(self, key: str, value: str) -> None:
+        assert self.shared is not None
+        try:
+            self.shared.set(key, value)
+        except sqlite3.Error as e:
+            logger.warning("agent.cache.shared_error", extra={"error": str(e)})
+
+    def flush(self) -> None:
+        """Wait until the shared backend has every decision put so far."""
+        _writer.submit(lambda: None).result()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counts for status reporting."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "backend": "memory+sqlite" if self.shared is not None else "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.memory),
+        }
+
+
+def build_decision_cache(model: str, temperature: float) -> DecisionCache | None:
+    """Create the decision cache from settings.
+
+    Returns None when caching is disabled or the agent samples with a
+    non-zero temperature, where replaying one answer would change behavior.
+    """
+    if not settings.decision_cache_enabled or temperature != 0.0:
+        return None
+
+    memory = MemoryCacheBackend(
+        max_entries=settings.decision_cache_max_entries,
+        ttl_seconds=settings.decision_cache_ttl_seconds,
+    )
+    shared = None
+    if settings.decision_cache_sqlite_path:
+        shared = SQLiteCacheBackend(
+            settings.decision_cache_sqlite_path,
+            max_entries=settings.decision_cache_max_entries,
+            ttl_seconds=settings.decision_cache_ttl_seconds,
+        )
+    return DecisionCache(model, temperature, memory, shared)
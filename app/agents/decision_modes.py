@@ -0,0 +1,188 @@
+"""Provider-enforced decision formats (structured output and tool calling).
+
+In "prompt" mode the model is only asked, in the system prompt, to answer
+with AgentDecision JSON; malformed output costs a retry. The other modes
+let the provider enforce the format:
+
+- "json_schema": the response is constrained to a JSON schema generated
+  from AgentDecision, with each tool call tied to that tool's input model.
+- "tools": every registered tool is offered as a native function, plus
+  FINAL_DECISION_FUNCTION for steps that end without a tool call.
+
+Both still go through the prompt-mode parser when the model answers in
+plain text, so that path remains the fallback.
+"""
+
+import json
+from typing import Any
+
+from langchain_core.messages import BaseMessage
+
+from app.schemas.task import AgentDecision, DecisionType, ToolCall
+from app.tools import BaseTool
+
+# Function the model calls to respond, clarify or escalate in "tools" mode
+FINAL_DECISION_FUNCTION = "final_decision"
+
+
+def tool_arguments_schema(tool: BaseTool) -> dict[str, Any]:
+    """JSON schema of a tool's arguments (any object if it has no input model)."""
+    if tool.input_model is None:
+        return {"type": "object"}
+    return tool.input_model.model_json_schema()
+
+
+def decision_json_schema(tools: list[BaseTool]) -> dict[str, Any]:
+    """AgentDecision's JSON schema with ToolCall narrowed to the given tools."""
+    schema = AgentDecision.model_json_schema()
+    defs = schema.setdefault("$defs", {})
+
+    variants = []
+    for tool in tools:
+        arguments = tool_arguments_schema(tool)
+        # Nested definitions only resolve from the root of the schema
+        defs.update(arguments.pop("$defs", {}))
+        variants.append(
+            {
+                "type": "object",
+                "properties": {
+                    "tool_name": {"const": tool.name},
+                    "arguments": arguments,
+                },
+                "required": ["tool_name", "arguments"],
+            }
+        )
+    if variants:
+        defs["ToolCall"] = {"anyOf": variants}
+    return schema
+
+
+def response_format(tools: list[BaseTool]) -> dict[str, Any]:
+    """OpenAI `response_format` for the "json_schema" mode."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "agent_decision",
+            "schema": decision_json_schema(tools),
+            "strict": False,  # Tool arguments are open-ended objects
+        },
+    }
+
+
+def tool_definitions(tools: list[BaseTool]) -> list[dict[str, Any]]:
+    """OpenAI function definitions for the "tools" mode."""
+    definitions = [
+        {
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool_arguments_schema(tool),
+            },
+        }
+        for tool in tools
+    ]
+
+    fields = AgentDecision.model_json_schema()["properties"]
+    definitions.append(
+        {
+            "type": "function",
+            "function": {
+                "name": FINAL_DECISION_FUNCTION,
+                "description": "End this step without calling a tool: respond "
+                "with the answer, ask the user to clarify, or escalate.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "decision_type": {
+                            "type": "string",
+                            "enum": [
+                                DecisionType.RESPOND.value,
+                                DecisionType.CLARIFY.value,
+                                DecisionType.ESCALATE.value,
+                            ],
+                            "description": fields["decision_type"]["description"],
+                        },
+                        "reasoning": fields["reasoning"],
+                        "message": {
+                            "type": "string",
+                            "description": fields["message"]["description"],
+                        },
+                    },
+                    "required": ["decision_type", "reasoning", "message"],
+                },
+            },
+        }
+    )
+    return definitions
+
+
+def has_tool_calls(message: BaseMessage) -> bool:
+    """Whether the model answered with native tool calls."""
+    return bool(
+        getattr(message, "tool_calls", None)
+        or getattr(message, "invalid_tool_calls", None)
+    )
+
+
+def decision_from_tool_calls(message: BaseMessage) -> AgentDecision:
+    """Build a decision from a "tools" mode response.
+
+    Raises:
+        ValueError: If a call's arguments are not valid JSON or the final
+            decision doesn't validate
+    """
+    invalid = getattr(message, "invalid_tool_calls", None)
+    if invalid:
+        raise ValueError(f"Invalid tool call arguments: {invalid[0].get('error')}")
+
+    calls = getattr(message, "tool_calls", [])
+    for call in calls:
+        if call["name"] == FINAL_DECISION_FUNCTION:
+            try:
+                return AgentDecision.model_validate(call["args"])
+            except ValueError as e:
+                raise ValueError(f"Schema validation failed: {e}") from e
+
+    tool_calls = [
+        ToolCall(tool_name=call["name"], arguments=call["args"]) for call in calls
+    ]
+    content = message.content if isinstance(message.content, str) else ""
+    return AgentDecision(
+        decision_type=DecisionType.USE_TOOL,
+        reasoning=content or "Native tool call",
+        tool_call=tool_calls[0] if len(tool_calls) == 1 else None,
+        tool_calls=tool_calls if len(tool_calls) > 1 else [],
+    )
+
+
+def decision_as_tool_calls(output: str) -> list[dict[str, Any]] | None:
+    """Express AgentDecision JSON as native tool calls (for offline backends).
+
+    Returns None if the output is not a decision, so it can be sent as text.
+    """
+    try:
+        data = json.loads(output)
+        decision = AgentDecision.model_validate(data)
+    except ValueError:
+        return None
+
+    if decision.decision_type == DecisionType.USE_TOOL:
+        calls = [
+            (call.tool_name, call.arguments) for call in decision.requested_tool_calls
+        ]
+    else:
+        calls = [
+            (
+                FINAL_DECISION_FUNCTION,
+                {
+                    "decision_type": decision.decision_type.value,
+                    "reasoning": decision.reasoning,
+                    "message": decision.message or "",
+                },
+            )
+        ]
+    return [
+        {"name": name, "args": args, "id": f"call_{i}", "type": "tool_call"}
+        for i, (name, args) in enumerate(calls)
+    ]
@@ -1,14 +1,132 @@
 """Tool dispatcher for executing agent tool calls."""
 
+import asyncio
+import json
 import logging
+import time
+from collections import Counter
+from typing import Any, cast
 
+from app.metrics import TOOL_DURATION
+from app.resilience import (
+    CircuitOpenError,
+    breaker_stats,
+    call_with_resilience,
+    get_breaker,
+)
 from app.schemas.task import ToolCall
-from app.tools import ToolError, ToolResult, registry
+from app.tools import BaseTool, ToolError, ToolResult, registry
+from app.tools.cache import ToolResultCache
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# Configuration
+MAX_PARALLEL_TOOLS = 8  # Concurrent side-effect-free calls per decision
 
-def dispatch_tool(tool_call: ToolCall) -> ToolResult:
+# Result caches of side-effect-free tools, created on first use
+_result_caches: dict[str, ToolResultCache] = {}
+
+# Outcomes of calls started before their decision was final
+_speculation: Counter[str] = Counter()
+_prefetch: Counter[str] = Counter()
+
+
+class PendingToolCalls:
+    """Read-only tool calls started before the decision requesting them is final.
+
+    Calls come from two places: the streamed decision (speculative) and the
+    task context (prefetch). `dispatch_tools` takes a matching call's
+    running task instead of dispatching it again (confirmed). Prefetched
+    calls no decision asked for can be collected as extra results (observed);
+    other leftovers are cancelled by `discard`. Tools with side effects are never
+    started early.
+    """
+
+    def __init__(self):
+        # key -> (call, running task, counters it is reported under)
+        self._calls: dict[
+            str, tuple[ToolCall, asyncio.Task[ToolResult], Counter[str]]
+        ] = {}
+
+    def start(self, tool_call: ToolCall) -> bool:
+        """Start a call from a streaming decision if it is read-only and new."""
+        return self._start(tool_call, _speculation)
+
+    def prefetch(self, context: dict[str, Any] | None) -> int:
+        """Start every read-only call the task context fully determines.
+
+        Returns:
+            The number of calls started
+        """
+        started = 0
+        for tool in registry.tools:
+            arguments = tool.prefetch_arguments(context)
+            if arguments is not None:
+                call = ToolCall(tool_name=tool.name, arguments=arguments)
+                started += self._start(call, _prefetch)
+        return started
+
+    def _start(self, tool_call: ToolCall, counters: Counter[str]) -> bool:
+        tool = registry.get(tool_call.tool_name)
+        if tool is None or tool.has_side_effects:
+            return False
+        key = _call_key(tool_call)
+        if key in self._calls:
+            return False
+
+        task = asyncio.ensure_future(dispatch_tool(tool_call))
+        self._calls[key] = (tool_call, task, counters)
+        counters["started"] += 1
+        logger.info("Started tool ahead of decision: %s", tool_call.tool_name)
+        return True
+
+    def take(self, tool_call: ToolCall) -> asyncio.Task[ToolResult] | None:
+        """Claim the running task for a call, if one was started."""
+        entry = self._calls.pop(_call_key(tool_call), None)
+        if entry is None:
+            return None
+        _, task, counters = entry
+        counters["confirmed"] += 1
+        return task
+
+    async def collect_prefetched(
+        self, timeout: float | None = None
+    ) -> list[tuple[ToolCall, ToolResult]]:
+        """Wait for the unclaimed prefetched calls and return their results.
+
+        Args:
+            timeout: Seconds to wait; calls still running then stay pending
+                and are left out. None waits for all of them.
+        """
+        prefetched = {
+            task: key
+            for key, (_, task, counters) in self._calls.items()
+            if counters is _prefetch
+        }
+        if not prefetched:
+            return []
+        done, _ = await asyncio.wait(prefetched, timeout=timeout)
+        results = []
+        for task, key in prefetched.items():
+            if task in done:
+                call, _, _ = self._calls.pop(key)
+                results.append((call, task.result()))
+        _prefetch["observed"] += len(results)
+        return results
+
+    def discard(self) -> None:
+        """Cancel every call that was started but not claimed."""
+        for _, task, counters in self._calls.values():
+            task.cancel()
+            counters["discarded"] += 1
+        self._calls.clear()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+async def dispatch_tool(tool_call: ToolCall) -> ToolResult:
     """Execute a tool call from the agent.
 
     Args:
@@ -19,9 +137,25 @@ def dispatch_tool(tool_call: ToolCall) -> ToolResult:
 
     This function:
     - Validates the tool exists (prevents hallucinated tools)
+    - Serves cacheable read-only calls from the tool's result cache
     - Executes the tool with provided arguments
     - Returns structured results
+    - Records its latency in the tool duration histogram and a trace span
     """
+    started = time.perf_counter()
+    with tracer.start_span("dispatch_tool", {"tool.name": tool_call.tool_name}) as span:
+        result = await _execute_tool_call(tool_call)
+        span.set_attribute("tool.success", result.success)
+    # Unknown (hallucinated) names share one label to bound cardinality
+    name = tool_call.tool_name if registry.get(tool_call.tool_name) else "unknown"
+    TOOL_DURATION.labels(name, "true" if result.success else "false").observe(
+        time.perf_counter() - started
+    )
+    return result
+
+
+async def _execute_tool_call(tool_call: ToolCall) -> ToolResult:
+    """Run a tool call for `dispatch_tool`, turning errors into failed results."""
     logger.info("Dispatching tool: %s", tool_call.tool_name)
     logger.debug("Tool arguments: %s", tool_call.arguments)
 
@@ -29,8 +163,16 @@ def dispatch_tool(tool_call: ToolCall) -> ToolResult:
         # Get tool from registry (raises if not found)
         tool = registry.get_or_raise(tool_call.tool_name)
 
-        # Execute tool
-        result = tool.execute(**tool_call.arguments)
+        # Execute tool (through its result cache when it declares one, so
+        # cached results are served even while the breaker is open)
+        cache_key = tool.cache_key(tool_call.arguments)
+        if cache_key is not None:
+            cache = _get_result_cache(tool)
+            result = await cache.get_or_run(
+                cache_key, lambda: _run_tool(tool, tool_call.arguments)
+            )
+        else:
+            result = await _run_tool(tool, tool_call.arguments)
 
         logger.info(
             "Tool %s completed: success=%s",
@@ -40,6 +182,16 @@ def dispatch_tool(tool_call: ToolCall) -> ToolResult:
 
         return result
 
+    except CircuitOpenError as e:
+        # Failing fast: the tool has been failing and is cooling down
+        logger.warning("Tool %s skipped: %s", tool_call.tool_name, e)
+        return ToolResult(
+            success=False,
+            error=f"Tool '{tool_call.tool_name}' is temporarily unavailable "
+            f"after repeated failures; retry in {e.retry_after:.0f}s",
+            data={"circuit_open": True, "retry_after": round(e.retry_after, 3)},
+        )
+
     except ToolError as e:
         # Tool not found or execution error
         logger.error("Tool error: %s", e)
@@ -49,3 +201,139 @@ def dispatch_tool(tool_call: ToolCall) -> ToolResult:
         # Unexpected error during tool execution
         logger.exception("Unexpected error executing tool %s", tool_call.tool_name)
         return ToolResult(success=False, error=f"Tool execution failed: {e}")
+
+
+async def _run_tool(tool: BaseTool, arguments: dict[str, Any]) -> ToolResult:
+    """Execute a tool through its circuit breaker and retry policy.
+
+    Raised exceptions and results flagged `transient` count as breaker
+    failures. Other unsuccessful results (e.g. an unknown product) are the
+    caller's doing, not the dependency's, and leave the breaker alone; calls
+    whose arguments fail the tool's input model bypass it altogether.
+    """
+    breaker = None
+    if tool.breaker_failure_threshold is not None and tool.accepts(arguments):
+        breaker = get_breaker(
+            f"tool:{tool.name}",
+            tool.breaker_failure_threshold,
+            tool.breaker_recovery_seconds,
+        )
+    return await call_with_resilience(
+        breaker,
+        tool.retry_policy,
+        lambda: tool.aexecute(**arguments),
+        is_failure=lambda result: result.transient,
+    )
+
+
+async def dispatch_tools(
+    tool_calls: list[ToolCall], pending: PendingToolCalls | None = None
+) -> list[ToolResult]:
+    """Execute every tool call from a single agent decision.
+
+    Args:
+        tool_calls: The tool calls requested by the agent, in order
+        pending: Calls already started speculatively; matching calls reuse
+            their result instead of executing again
+
+    Returns:
+        One ToolResult per tool call, in the same order
+
+    Calls run in the order given, except that consecutive calls to tools
+    with `has_side_effects=False` run concurrently, at most
+    MAX_PARALLEL_TOOLS at a time. A call with side effects (or to an unknown
+    tool) waits for every call before it, and every call after it waits for
+    it, so a read never overlaps an earlier write. For the same reason, a
+    call started early is only reused if no write comes before it.
+    """
+    results: list[ToolResult | None] = [None] * len(tool_calls)
+    slots = asyncio.Semaphore(MAX_PARALLEL_TOOLS)
+
+    # Steps run one after another: runs of consecutive read-only calls run
+    # concurrently within their step, every other call is a step of its own
+    steps: list[tuple[bool, list[tuple[int, ToolCall]]]] = []
+    for index, tool_call in enumerate(tool_calls):
+        tool = registry.get(tool_call.tool_name)
+        read_only = tool is not None and not tool.has_side_effects
+        if read_only and steps and steps[-1][0]:
+            steps[-1][1].append((index, tool_call))
+        else:
+            steps.append((read_only, [(index, tool_call)]))
+
+    written = False
+
+    async def run_read_only(index: int, tool_call: ToolCall) -> None:
+        started = None
+        if pending is not None and not written:
+            started = pending.take(tool_call)
+        if started is not None:
+            results[index] = await started
+            return
+        async with slots:
+            results[index] = await dispatch_tool(tool_call)
+
+    logger.info("Dispatching %d tool calls in %d steps", len(tool_calls), len(steps))
+
+    for read_only, calls in steps:
+        if read_only:
+            await asyncio.gather(
+                *(run_read_only(index, tool_call) for index, tool_call in calls)
+            )
+        else:
+            [(index, tool_call)] = calls
+            results[index] = await dispatch_tool(tool_call)
+            written = True
+
+    return cast(list[ToolResult], results)
+
+
+def _get_result_cache(tool: BaseTool) -> ToolResultCache:
+    """Return the result cache for a tool, creating it on first use."""
+    cache = _result_caches.get(tool.name)
+    if cache is None:
+        cache = ToolResultCache(
+            tool.name,
+            max_entries=tool.cache_max_entries,
+            ttl_seconds=tool.cache_ttl_seconds or 0.0,
+        )
+        _result_caches[tool.name] = cache
+    return cache
+
+
+def result_cache_stats() -> dict[str, dict]:
+    """Per-tool cache statistics (hit ratio, saved latency)."""
+    return {name: cache.stats() for name, cache in _result_caches.items()}
+
+
+def breaker_stats_by_tool() -> dict[str, dict[str, Any]]:
+    """Circuit breaker state of each tool that has been called."""
+    return breaker_stats("tool:")
+
+
+def speculation_stats() -> dict[str, int]:
+    """Counts of speculatively started, confirmed and discarded tool calls."""
+    return {
+        "started": _speculation["started"],
+        "confirmed": _speculation["confirmed"],
+        "discarded": _speculation["discarded"],
+    }
+
+
+def prefetch_stats() -> dict[str, int]:
+    """Counts of context-prefetched calls by outcome.
+
+    "confirmed" calls were requested by a decision, "observed" ones were
+    handed to the agent as extra observations, "discarded" ones were unused.
+    """
+    return {
+        "started": _prefetch["started"],
+        "confirmed": _prefetch["confirmed"],
+        "observed": _prefetch["observed"],
+        "discarded": _prefetch["discarded"],
+    }
+
+
+def _call_key(tool_call: ToolCall) -> str:
+    return json.dumps(
+        [tool_call.tool_name, tool_call.arguments], sort_keys=True, default=str
+    )
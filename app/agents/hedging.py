@@ -0,0 +1,260 @@
+"""Hedged LLM calls with a hard deadline.
+
+LLM latency has a long tail. A Hedger starts a call, and if it hasn't
+answered by the `percentile` of recently observed latencies, starts a
+second identical call; whichever answers first wins and the other is
+cancelled. Hedges are capped at `max_rate` of calls by a token bucket, so
+a slow provider can't double the load on itself, and no call is hedged
+before `min_delay` or before HEDGE_MIN_SAMPLES latencies are known.
+
+For streamed calls, "answering" means producing the first chunk: an
+attempt calls the `claim` function it is given before passing anything
+on, which makes it the winner and cancels the other one. Callbacks thus
+only ever see one attempt's output.
+
+Every call, hedge included, must finish within `timeout`; TimeoutError is
+raised otherwise, which the circuit breaker counts as a failure.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HEDGE_MIN_SAMPLES = 20  # Latencies needed before the percentile is trusted
+HEDGE_BURST = 2.0  # Hedges that may be spent at once after a quiet period
+
+Claim = Callable[[], None]
+
+# Runs blocking calls for `Hedger.run_sync`; abandoned attempts finish here
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+class Hedger:
+    """Hedges calls after a learned latency percentile, within a deadline.
+
+    Args:
+        timeout: Seconds a call may take in total; None for no deadline
+        enabled: Whether to hedge at all (the deadline applies regardless)
+        percentile: Latency percentile (0-100) after which to hedge
+        min_delay: Never hedge earlier than this many seconds
+        max_rate: Largest share of calls that may be hedged
+        window: Recent latencies the percentile is computed over
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = 60.0,
+        enabled: bool = True,
+        percentile: float = 95.0,
+        min_delay: float = 0.05,
+        max_rate: float = 0.1,
+        window: int = 200,
+    ):
+        self.timeout = timeout
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_rate = max_rate
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._budget = HEDGE_BURST
+        self._lock = threading.Lock()  # run_sync attempts finish on threads
+        # calls, hedged, hedge_won, rate_limited, timeouts
+        self.counts: Counter[str] = Counter()
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging; None if there are too few samples."""
+        if not self.enabled or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        with self._lock:
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def observe(self, seconds: float) -> None:
+        """Record how long a call took to answer."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _start_call(self) -> float | None:
+        """Count a call and earn hedge budget; returns the hedge delay."""
+        self.counts["calls"] += 1
+        self._budget = min(HEDGE_BURST, self._budget + self.max_rate)
+        return self.hedge_delay()
+
+    def _may_hedge(self, admit: Callable[[], bool] | None) -> bool:
+        """Spend hedge budget, if there is any left and `admit` agrees."""
+        if self._budget < 1.0:
+            self.counts["rate_limited"] += 1
+            return False
+        if admit is not None and not admit():
+            return False
+        self._budget -= 1.0
+        self.counts["hedged"] += 1
+        return True
+
+    async def run(
+        self,
+        call: Callable[[Claim], Awaitable[T]],
+        admit_hedge: Callable[[], bool] | None = None,
+    ) -> T:
+        """Await `call(claim)`, hedged and within the deadline.
+
+        `admit_hedge`, if given, is asked before hedging; a hedge is only
+        sent if it returns True (e.g. when the rate limiter has capacity).
+
+        Raises:
+            TimeoutError: If no attempt finished within `timeout`
+            Exception: The failure of the last attempt to fail
+        """
+        delay = self._start_call()
+        started = time.perf_counter()
+        attempts: list[asyncio.Task[T]] = []
+        claims: list[Claim] = []
+        winner: asyncio.Task[T] | None = None
+
+        def launch() -> None:
+            index = len(attempts)
+
+            def claim() -> None:
+                nonlocal winner
+                if winner is not None:
+                    return
+                winner = attempts[index]
+                self.observe(time.perf_counter() - started)
+                if index > 0:
+                    self.counts["hedge_won"] += 1
+                for other in attempts:
+                    if other is not winner:
+                        other.cancel()
+
+            claims.append(claim)
+            attempts.append(asyncio.ensure_future(call(claim)))
+
+        deadline = asyncio.timeout(self.timeout)
+        try:
+            async with deadline:
+                launch()
+                if delay is not None:
+                    await asyncio.wait(attempts, timeout=delay)
+                    if (
+                        winner is None
+                        and not attempts[0].done()
+                        and self._may_hedge(admit_hedge)
+                    ):
+                        launch()
+
+                pending: set[asyncio.Task[T]] = set(attempts)
+                error: BaseException | None = None
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.cancelled():
+                            continue
+                        if task.exception() is None:
+                            # Unstreamed calls claim when they complete
+                            claims[attempts.index(task)]()
+                            return task.result()
+                        error = task.exception()
+                assert error is not None
+                raise error
+        except TimeoutError:
+            if not deadline.expired():
+                raise  # Raised by the call itself
+            self.counts["timeouts"] += 1
+            raise TimeoutError(f"LLM call timed out after {self.timeout}s") from None
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    def run_sync(
+        self, call: Callable[[], T], admit_hedge: Callable[[], bool] | None = None
+    ) -> T:
+        """Blocking variant of `run`.
+
+        Attempts run on a thread pool; a blocking call can't be interrupted,
+        so the losing (or timed out) attempt is abandoned and left to finish
+        in the background. Its result is discarded.
+
+        Raises:
+            TimeoutError: If no attempt finished within `timeout`
+        """
+        delay = self._start_call()
+        started = time.perf_counter()
+        deadline = None if self.timeout is None else started + self.timeout
+
+        def remaining() -> float:
+            return max(0.0, deadline - time.perf_counter()) if deadline else 0.0
+
+        attempts: list[Future[T]] = [_executor.submit(call)]
+        if delay is not None:
+            wait(
+                attempts, timeout=delay if deadline is None else min(delay, remaining())
+            )
+            if not attempts[0].done() and self._may_hedge(admit_hedge):
+                attempts.append(_executor.submit(call))
+
+        pending: set[Future[T]] = set(attempts)
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=remaining() if deadline is not None else None,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                for future in pending:
+                    future.cancel()
+                self.counts["timeouts"] += 1
+                raise TimeoutError(f"LLM call timed out after {self.timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    self.observe(time.perf_counter() - started)
+                    if future is not attempts[0]:
+                        self.counts["hedge_won"] += 1
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        assert error is not None
+        raise error
+
+    def stats(self) -> dict[str, Any]:
+        """Hedging counters and the current hedge delay, for status reporting."""
+        delay = self.hedge_delay()
+        calls = self.counts["calls"]
+        return {
+            "enabled": self.enabled,
+            "timeout_seconds": self.timeout,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "calls": calls,
+            "hedged": self.counts["hedged"],
+            "hedge_won": self.counts["hedge_won"],
+            "rate_limited": self.counts["rate_limited"],
+            "timeouts": self.counts["timeouts"],
+            "hedge_rate": round(self.counts["hedged"] / calls, 4) if calls else 0.0,
+        }
+
+
+def build_hedger() -> Hedger:
+    """Create the agent's hedger from settings."""
+    return Hedger(
+        timeout=settings.llm_timeout_seconds,
+        enabled=settings.llm_hedging,
+        percentile=settings.llm_hedge_percentile,
+        min_delay=settings.llm_hedge_min_delay_ms / 1000,
+        max_rate=settings.llm_hedge_max_rate,
+        window=settings.llm_hedge_window,
+    )
@@ -0,0 +1,149 @@
+"""Local repair of almost-JSON LLM output.
+
+Cheap fixes for the usual ways a model breaks the JSON format, tried
+before spending an LLM retry. Repairs are applied cumulatively in REPAIRS
+order, re-parsing after each one that changes the text, and the names of
+the repairs that were needed are returned so callers can count them.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a leading ```lang line and, if present, the closing fence."""
+    if not text.startswith("```"):
+        return text
+    lines = text.split("\n")[1:]
+    if lines and lines[-1].strip().startswith("```"):
+        lines = lines[:-1]
+    return "\n".join(lines).strip()
+
+
+def extract_object(text: str) -> str:
+    """Cut the first complete {...} object out of surrounding prose."""
+    start = text.find("{")
+    if start == -1:
+        return text
+
+    depth = 0
+    quote: str | None = None
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote is not None:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return text[start:]
+
+
+def remove_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing } or ] (outside strings)."""
+    out: list[str] = []
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            rest = text[i + 1 :].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def convert_single_quotes(text: str) -> str:
+    """Rewrite 'single-quoted' strings as JSON double-quoted strings."""
+    out: list[str] = []
+    quote: str | None = None
+    escaped = False
+    for char in text:
+        if quote is None:
+            if char == "'":
+                quote = "'"
+                out.append('"')
+                continue
+            if char == '"':
+                quote = '"'
+            out.append(char)
+        elif escaped:
+            escaped = False
+            # \' is not a valid JSON escape; a bare quote is fine inside "..."
+            if quote == "'" and char == "'":
+                out[-1] = "'"
+            else:
+                out.append(char)
+        elif char == "\\":
+            escaped = True
+            out.append(char)
+        elif char == quote:
+            quote = None
+            out.append('"')
+        elif quote == "'" and char == '"':
+            out.append('\\"')
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+# Applied in this order; each is counted under its name when needed
+REPAIRS: list[tuple[str, Callable[[str], str]]] = [
+    ("code_fence", strip_code_fence),
+    ("extract_object", extract_object),
+    ("trailing_comma", remove_trailing_commas),
+    ("single_quotes", convert_single_quotes),
+]
+
+
+def repair_json(text: str) -> tuple[Any, list[str]]:
+    """Parse JSON, applying local repairs if it doesn't parse as is.
+
+    Returns:
+        The parsed value and the names of the repairs that were applied
+
+    Raises:
+        ValueError: If the text still isn't valid JSON after every repair
+    """
+    text = text.strip()
+    first_error: json.JSONDecodeError | None = None
+    # Output that can't be a JSON object (fenced, prose) skips the failing parse
+    if text.startswith(("{", "[")):
+        try:
+            return json.loads(text), []
+        except json.JSONDecodeError as e:
+            first_error = e
+
+    applied: list[str] = []
+    for name, repair in REPAIRS:
+        fixed = repair(text)
+        if fixed == text:
+            continue
+        text = fixed
+        applied.append(name)
+        try:
+            return json.loads(text), applied
+        except json.JSONDecodeError:
+            continue
+
+    raise ValueError(f"Invalid JSON: {first_error or 'no JSON object found'}")
@@ -0,0 +1,355 @@
+"""Chat model backends for the reasoning agent.
+
+The backend is selected by `settings.llm_backend`:
+
+- "openai": ChatOpenAI against the configured model (default)
+- "scripted": ScriptedChatModel, an offline backend that answers from a rules
+  file with configurable latency and error rate. Used for load tests and CI,
+  where it measures framework overhead without the provider in the way.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from typing import Any
+
+import httpx
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.messages.ai import UsageMetadata
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from app.agents.decision_modes import decision_as_tool_calls
+from app.config import settings
+
+# Streaming configuration
+SCRIPTED_CHUNK_SIZE = 16  # Characters per streamed chunk
+SCRIPTED_CHARS_PER_TOKEN = 4  # For the estimated usage_metadata
+
+
+class ScriptedLLMError(RuntimeError):
+    """Injected failure from the scripted backend."""
+
+
+class ScriptedRule(BaseModel):
+    """One canned answer and the requests it applies to.
+
+    `match` is a case-insensitive regex searched in the latest user message
+    (the task on the first turn, the observations afterwards). String values
+    in `decision` may reference its groups as \\1, \\2, ... `turn` restricts
+    the rule to one model call of the task (1 = first). Use `output` instead
+    of `decision` to return raw text, e.g. to exercise parse retries.
+    """
+
+    match: str = ".*"
+    turn: int | None = Field(default=None, ge=1)
+    decision: dict[str, Any] | None = None
+    output: str | None = None
+
+    @model_validator(mode="after")
+    def _check_answer(self) -> "ScriptedRule":
+        if (self.decision is None) == (self.output is None):
+            raise ValueError("A rule needs exactly one of 'decision' or 'output'")
+        return self
+
+
+# Used when no rules file is configured: look up the price of the first
+# product id in the task, then answer with it.
+DEFAULT_RULES = [
+    ScriptedRule(
+        match=r"(PROD-\d+)",
+        turn=1,
+        decision={
+            "decision_type": "use_tool",
+            "reasoning": "Scripted: look up the product price.",
+            "tool_call": {
+                "tool_name": "get_pricing",
+                "arguments": {"product_id": r"\1"},
+            },
+        },
+    ),
+    ScriptedRule(
+        decision={
+            "decision_type": "respond",
+            "reasoning": "Scripted: answer directly.",
+            "message": "Scripted response.",
+        },
+    ),
+]
+
+
+def load_rules(path: str) -> list[ScriptedRule]:
+    """Read rules from a JSON file: {"rules": [...]} or a bare list."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("rules", [])
+    return [ScriptedRule.model_validate(rule) for rule in data]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Offline chat model returning canned AgentDecision JSON.
+
+    The first rule that matches a request wins; if none does, the model
+    answers with a RESPOND decision saying so. Every call sleeps for
+    `latency_ms` (+/- `latency_jitter_ms`) and fails with ScriptedLLMError
+    with probability `error_rate`. With a `seed`, the sequence of latencies
+    and failures is reproducible.
+
+    When tools are bound, decisions come back as native tool calls, so the
+    "tools" decision mode can be exercised offline too. Responses carry
+    `usage_metadata` estimated at SCRIPTED_CHARS_PER_TOKEN characters per token.
+    """
+
+    rules: list[ScriptedRule] = Field(default_factory=lambda: list(DEFAULT_RULES))
+    latency_ms: float = Field(default=0.0, ge=0.0)
+    latency_jitter_ms: float = Field(default=0.0, ge=0.0)
+    error_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    seed: int | None = None
+
+    _random: random.Random = PrivateAttr()
+    _compiled: list[re.Pattern[str]] = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+        self._compiled = [re.compile(rule.match, re.IGNORECASE) for rule in self.rules]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable[..., Any] | Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        return self.bind(tools=list(tools), tool_choice=tool_choice, **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        self._maybe_fail(failed)
+        return self._result(messages, kwargs)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        self._maybe_fail(failed)
+        return self._result(messages, kwargs)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        self._maybe_fail(failed)
+        output = self._answer(messages)
+        yield from self._chunks(output, kwargs)
+        yield self._usage_chunk(messages, output)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # The whole delay is time to first token; later chunks follow at once
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        self._maybe_fail(failed)
+        output = self._answer(messages)
+        for chunk in self._chunks(output, kwargs):
+            yield chunk
+        yield self._usage_chunk(messages, output)
+
+    def _draw(self) -> tuple[float, bool]:
+        """Draw this call's latency (seconds) and whether it fails."""
+        jitter = self._random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+        delay = max(0.0, self.latency_ms + jitter) / 1000
+        failed = self._random.random() < self.error_rate
+        return delay, failed
+
+    @staticmethod
+    def _maybe_fail(failed: bool) -> None:
+        # Raised after the latency, as a provider error would be
+        if failed:
+            raise ScriptedLLMError("Scripted LLM backend: injected failure")
+
+    def _answer(self, messages: list[BaseMessage]) -> str:
+        """Output text of the first rule matching this request."""
+        turn = 1 + sum(isinstance(m, AIMessage) for m in messages)
+        prompt = next(
+            (str(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)),
+            "",
+        )
+
+        for rule, pattern in zip(self.rules, self._compiled):
+            if rule.turn is not None and rule.turn != turn:
+                continue
+            found = pattern.search(prompt)
+            if found is None:
+                continue
+            if rule.output is not None:
+                return rule.output
+            return json.dumps(_expand(rule.decision, found))
+
+        return json.dumps(
+            {
+                "decision_type": "respond",
+                "reasoning": "Scripted: no rule matched.",
+                "message": "No scripted rule matched this request.",
+            }
+        )
+
+    def _result(
+        self, messages: list[BaseMessage], kwargs: dict[str, Any]
+    ) -> ChatResult:
+        output = self._answer(messages)
+        tool_calls = decision_as_tool_calls(output) if kwargs.get("tools") else None
+        usage = _estimate_usage(messages, output)
+        if tool_calls is not None:
+            message = AIMessage(content="", tool_calls=tool_calls, usage_metadata=usage)
+        else:
+            message = AIMessage(content=output, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _usage_chunk(messages: list[BaseMessage], output: str) -> ChatGenerationChunk:
+        # Sent last, as OpenAI does with stream_usage
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=_estimate_usage(messages, output)
+            )
+        )
+
+    @staticmethod
+    def _chunks(output: str, kwargs: dict[str, Any]) -> Iterator[ChatGenerationChunk]:
+        tool_calls = decision_as_tool_calls(output) if kwargs.get("tools") else None
+        if tool_calls is not None:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(tool_calls)
+                    ],
+                )
+            )
+            return
+
+        for start in range(0, len(output), SCRIPTED_CHUNK_SIZE):
+            text = output[start : start + SCRIPTED_CHUNK_SIZE]
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+
+
+def _estimate_usage(messages: list[BaseMessage], output: str) -> UsageMetadata:
+    input_tokens = (
+        sum(len(str(m.content)) for m in messages) // SCRIPTED_CHARS_PER_TOKEN
+    )
+    output_tokens = len(output) // SCRIPTED_CHARS_PER_TOKEN
+    return UsageMetadata(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+def _expand(value: Any, found: re.Match[str]) -> Any:
+    """Substitute regex group references in every string of a decision."""
+    if isinstance(value, str):
+        return found.expand(value) if "\\" in value else value
+    if isinstance(value, dict):
+        return {k: _expand(v, found) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v, found) for v in value]
+    return value
+
+
+# (sync, async) HTTP clients shared by every ChatOpenAI in the process
+_http_clients: tuple[httpx.Client, httpx.AsyncClient] | None = None
+
+
+def shared_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """HTTP clients with a connection pool sized for many concurrent tasks.
+
+    Connections are kept alive between calls, so most LLM calls skip the
+    TCP and TLS handshakes. Created on first use.
+    """
+    global _http_clients
+    if _http_clients is None:
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        )
+        _http_clients = (httpx.Client(limits=limits), httpx.AsyncClient(limits=limits))
+    return _http_clients
+
+
+def http_pool_stats() -> dict[str, Any]:
+    """Connection pool limits, for status reporting."""
+    return {
+        "max_connections": settings.llm_max_connections,
+        "max_keepalive_connections": settings.llm_max_keepalive_connections,
+        "keepalive_expiry_seconds": settings.llm_keepalive_expiry_seconds,
+        "created": _http_clients is not None,
+    }
+
+
+def build_chat_model(temperature: float) -> BaseChatModel:
+    """Create the chat model for the backend selected in settings."""
+    if settings.llm_backend == "scripted":
+        return ScriptedChatModel(
+            rules=(
+                load_rules(settings.scripted_rules_path)
+                if settings.scripted_rules_path
+                else list(DEFAULT_RULES)
+            ),
+            latency_ms=settings.scripted_latency_ms,
+            latency_jitter_ms=settings.scripted_latency_jitter_ms,
+            error_rate=settings.scripted_error_rate,
+            seed=settings.scripted_seed,
+        )
+
+    http_client, http_async_client = shared_http_clients()
+    return ChatOpenAI(
+        model=settings.openai_model,
+        api_key=settings.openai_api_key,
+        temperature=temperature,
+        stream_usage=True,  # Token usage on streamed responses too
+        max_retries=0,  # Retried by the agent's BackoffPolicy, behind its breaker
+        timeout=settings.llm_timeout_seconds,  # Ends abandoned sync attempts too
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
@@ -1,35 +1,9 @@
 """System prompts for the autonomous agent."""
 
-
-def build_system_prompt(tools: list[dict]) -> str:
-    """Build system prompt with available tools.
-
-    Args:
-        tools: List of tool schemas from registry.list_tools()
-
-    Returns:
-        Complete system prompt with tool descriptions
-    """
-    tools_section = "No tools are currently available."
-    tool_decision = ""
-    tool_json_example = ""
-    if tools:
-        tools_section = _format_tools(tools)
-        tool_decision = '"use_tool"'
-        tool_json_example = """
-                              For tool calls, include the tool_call object:
-                              ```json
-                              {
-                                "decision_type": "use_tool",
-                                "reasoning": "I need to look up the product price",
-                                "tool_call": {
-                                  "tool_name": "get_pricing",
-                                  "arguments": {"product_id": "PROD-001"}
-                                }
-                              }
-                              ```"""
-
-    return f"""\
+# Everything that does not depend on the registered tools. It is kept as the
+# first bytes of every system prompt so provider-side prompt-prefix caching
+# can reuse it across tasks and tool registrations.
+SYSTEM_PROMPT_PREFIX = """\
       You are an autonomous task agent. Your job is to analyze tasks and make structured decisions.
 
       ## Your Capabilities
@@ -39,27 +13,24 @@ def build_system_prompt(tools: list[dict]) -> str:
       - **clarify**: Ask for more information from the user
       - **escalate**: The task requires human intervention
 
-      ## Available Tools
-      {tools_section}
-
       ## Output Format
       You MUST respond with valid JSON matching this exact structure:
 
       ```json
-      {{
-        "decision_type": {tool_decision} | "respond" | "clarify" | "escalate",
+      {
+        "decision_type": "use_tool" | "respond" | "clarify" | "escalate",
         "reasoning": "Your internal reasoning about why you made this decision",
         "message": "The message to return to the user (optional for use_tool)",
-        "tool_call": {{"tool_name": "...", "arguments": {{...}}}}  // Only for use_tool
-      }}
+        "tool_call": {"tool_name": "...", "arguments": {...}},  // Only for use_tool
+        "tool_calls": [{"tool_name": "...", "arguments": {...}}]  // Optional: several calls at once
+      }
       ```
-      {tool_json_example}
 
       ## Rules
       1. ALWAYS output valid JSON - no markdown, no explanation outside the JSON
       2. The "reasoning" field is for your internal thought process
       3. The "message" field is what the user will see
-      4. For "use_tool", include "tool_call" with the tool name and arguments
+      4. For "use_tool", include "tool_call" with the tool name and arguments, or "tool_calls" to run several tools in one step
       5. Only use tools that are listed in Available Tools
       6. Be concise and actionable
       7. If you cannot help, escalate - do not make up information
@@ -68,22 +39,76 @@ def build_system_prompt(tools: list[dict]) -> str:
 
       Task: "What is 2 + 2?"
       ```json
-      {{
+      {
         "decision_type": "respond",
         "reasoning": "This is a simple arithmetic question I can answer directly.",
         "message": "2 + 2 equals 4."
-      }}
+      }
       ```
 
       Task: "Process the order"
       ```json
-      {{
+      {
         "decision_type": "clarify",
         "reasoning": "The user hasn't specified which order or what processing is needed.",
         "message": "Could you please specify which order you'd like me to process and what action to take?"
-      }}
+      }
+      ```
+"""
+
+TOOL_CALL_EXAMPLES = """
+      For tool calls, include the tool_call object:
+      ```json
+      {
+        "decision_type": "use_tool",
+        "reasoning": "I need to look up the product price",
+        "tool_call": {
+          "tool_name": "get_pricing",
+          "arguments": {"product_id": "PROD-001"}
+        }
+      }
+      ```
+
+      To call several tools in one step, use a tool_calls list instead.
+      Independent lookups run in parallel:
+      ```json
+      {
+        "decision_type": "use_tool",
+        "reasoning": "I need the price of both products",
+        "tool_calls": [
+          {"tool_name": "get_pricing", "arguments": {"product_id": "PROD-001"}},
+          {"tool_name": "get_pricing", "arguments": {"product_id": "PROD-002"}}
+        ]
+      }
       ```
-      """
+"""
+
+
+def build_system_prompt(tools: list[dict]) -> str:
+    """Build system prompt with available tools.
+
+    The result always starts with SYSTEM_PROMPT_PREFIX; only the trailing
+    tools section changes with the registry.
+
+    Args:
+        tools: List of tool schemas from registry.list_tools()
+
+    Returns:
+        Complete system prompt with tool descriptions
+    """
+    if not tools:
+        return (
+            f"{SYSTEM_PROMPT_PREFIX}\n"
+            "      ## Available Tools\n"
+            '      No tools are currently available. Do not use "use_tool".\n'
+        )
+
+    return (
+        f"{SYSTEM_PROMPT_PREFIX}\n"
+        "      ## Available Tools\n"
+        f"{_format_tools(tools)}\n"
+        f"{TOOL_CALL_EXAMPLES}"
+    )
 
 
 def _format_tools(tools: list[dict]) -> str:
@@ -94,5 +119,5 @@ def _format_tools(tools: list[dict]) -> str:
         desc = tool.get("description", "No description")
         side_effects = tool.get("has_side_effects", False)
         effect_note = " ⚠️ (has side effects)" if side_effects else ""
-        lines.append(f"- **{name}**: {desc}{effect_note}")
+        lines.append(f"      - **{name}**: {desc}{effect_note}")
     return "\n".join(lines)
@@ -0,0 +1,250 @@
+"""Client-side rate limiting of LLM requests and tokens.
+
+Providers limit requests and tokens per minute; bursts past either limit
+come back as 429s, and retries then make it worse. An LLMRateLimiter keeps
+each agent under both limits with two token buckets that refill
+continuously (a full minute's allowance at most).
+
+Callers over the limit wait instead of failing. Each call reserves its
+share up front, letting the buckets go into debt, and sleeps until the
+debt is paid off. Later callers reserve behind it and wait longer, so
+callers are served in arrival order without a queue object. That also
+makes the limiter independent of the event loop, and usable from threads.
+A call is reserved with an estimate of its tokens (prompt plus
+`expected_output_tokens`), then settled with the usage the provider
+reported; a call that fails or is cancelled gives its expected output back.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from app.config import settings
+from app.metrics import LLM_RATE_LIMIT_WAIT, LLM_RATE_LIMIT_WAITING
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """`capacity` units, refilled at `capacity` per `period` seconds.
+
+    The level may go negative: that is reserved but not yet available
+    capacity. Not thread-safe on its own; LLMRateLimiter locks around it.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.rate = capacity / period  # Units per second
+        self._clock = clock
+        self._level = capacity
+        self._updated = clock()
+
+    @property
+    def level(self) -> float:
+        now = self._clock()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        return self._level
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount`; returns seconds until it is actually available."""
+        level = self.level - amount
+        self._level = level
+        return max(0.0, -level / self.rate)
+
+    def try_take(self, amount: float) -> bool:
+        """Take `amount` only if it is available now."""
+        if self.level < amount:
+            return False
+        self._level -= amount
+        return True
+
+    def give_back(self, amount: float) -> None:
+        """Return (or, if negative, take more) units after the fact."""
+        self._level = min(self.capacity, self.level + amount)
+
+
+class LLMRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one model.
+
+    Args:
+        requests_per_minute: Request limit; None for no limit
+        tokens_per_minute: Token limit (prompt + output); None for no limit
+        expected_output_tokens: Output tokens assumed when reserving a call
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        expected_output_tokens: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute, clock=clock)
+            if requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        )
+        self.expected_output_tokens = expected_output_tokens
+        self._lock = threading.Lock()
+        self.waiting = 0  # Callers currently waiting for capacity
+        # calls, queued (had to wait), hedges_refused, abandoned (attempts
+        # that failed or were cancelled)
+        self.counts: Counter[str] = Counter()
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens`; seconds to wait for them."""
+        with self._lock:
+            self.counts["calls"] += 1
+            wait = 0.0
+            if self.requests is not None:
+                wait = self.requests.reserve(1)
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(tokens))
+            return wait
+
+    def _cancel(self, tokens: int) -> None:
+        """Give back a reservation that was never used."""
+        with self._lock:
+            if self.requests is not None:
+                self.requests.give_back(1)
+            if self.tokens is not None:
+                self.tokens.give_back(tokens)
+
+    def _waited(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.counts["queued"] += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        LLM_RATE_LIMIT_WAIT.observe(seconds)
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until a request of `tokens` tokens fits under the limits."""
+        wait = self._reserve(tokens)
+        if wait <= 0:
+            return
+        self._start_waiting(wait)
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._cancel(tokens)
+            raise
+        finally:
+            self._stop_waiting()
+        self._waited(wait)
+
+    def acquire_sync(self, tokens: int) -> None:
+        """Blocking variant of `acquire`."""
+        wait = self._reserve(tokens)
+        if wait <= 0:
+            return
+        self._start_waiting(wait)
+        try:
+            time.sleep(wait)
+        finally:
+            self._stop_waiting()
+        self._waited(wait)
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take capacity only if it is free now (hedges never queue)."""
+        with self._lock:
+            if self.requests is not None and not self.requests.try_take(1):
+                self.counts["hedges_refused"] += 1
+                return False
+            if self.tokens is not None and not self.tokens.try_take(tokens):
+                if self.requests is not None:
+                    self.requests.give_back(1)
+                self.counts["hedges_refused"] += 1
+                return False
+            return True
+
+    def settle(self, reserved: int, used: int | None) -> None:
+        """Correct a reservation once its call has ended.
+
+        Args:
+            reserved: Tokens reserved for the call
+            used: Tokens the provider reported, 0 if it reported none (the
+                estimate stands), or None if the call failed or was
+                cancelled: the prompt was sent, but the expected output
+                tokens are given back
+        """
+        if self.tokens is None or not reserved or used == 0:
+            return
+        with self._lock:
+            if used is None:
+                used = max(0, reserved - self.expected_output_tokens)
+                self.counts["abandoned"] += 1
+            self.tokens.give_back(reserved - used)
+
+    def _start_waiting(self, seconds: float) -> None:
+        with self._lock:
+            self.waiting += 1
+        LLM_RATE_LIMIT_WAITING.inc()
+        logger.info(
+            "agent.rate_limit.wait",
+            extra={"wait_ms": round(seconds * 1000, 1), "waiting": self.waiting},
+        )
+
+    def _stop_waiting(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+        LLM_RATE_LIMIT_WAITING.dec()
+
+    def stats(self) -> dict[str, Any]:
+        """Limits, free capacity, queue depth and wait times, for status reporting."""
+        with self._lock:
+            queued = self.counts["queued"]
+            return {
+                "enabled": self.enabled,
+                "requests_per_minute": self.requests.capacity
+                if self.requests
+                else None,
+                "tokens_per_minute": self.tokens.capacity if self.tokens else None,
+                "available_requests": round(self.requests.level, 2)
+                if self.requests
+                else None,
+                "available_tokens": round(self.tokens.level) if self.tokens else None,
+                "waiting": self.waiting,
+                "calls": self.counts["calls"],
+                "queued": queued,
+                "hedges_refused": self.counts["hedges_refused"],
+                "abandoned": self.counts["abandoned"],
+                "avg_wait_ms": round(self.wait_seconds / queued * 1000, 1)
+                if queued
+                else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            }
+
+
+def build_rate_limiter(model: str) -> LLMRateLimiter:
+    """The limiter for `model`: its MODEL_RATE_LIMITS entry or the defaults."""
+    requests_per_minute, tokens_per_minute = settings.model_rate_limits.get(
+        model, (settings.llm_requests_per_minute, settings.llm_tokens_per_minute)
+    )
+    return LLMRateLimiter(
+        requests_per_minute,
+        tokens_per_minute,
+        settings.llm_expected_output_tokens,
+    )
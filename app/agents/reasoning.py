@@ -2,20 +2,168 @@
 
 import json
 import logging
-from typing import cast
-
-from langchain_openai import ChatOpenAI
+import time
+from collections import Counter
+from collections.abc import Callable, Generator
+from functools import partial
+from typing import Any, cast
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
 from pydantic import ValidationError
 
+from app.agents.conversation import Conversation
+from app.agents.decision_cache import build_decision_cache
+from app.agents.decision_modes import (
+    decision_from_tool_calls,
+    has_tool_calls,
+    response_format,
+    tool_definitions,
+)
+from app.agents.hedging import Claim, build_hedger
+from app.agents.json_repair import repair_json
+from app.agents.llm import build_chat_model
 from app.agents.prompts import build_system_prompt
+from app.agents.rate_limit import build_rate_limiter
+from app.agents.token_budget import build_token_budget
+from app.agents.usage import StepUsage, response_tokens
 from app.config import settings
-from app.schemas.task import AgentDecision, DecisionType, Observation, TaskInput
+from app.metrics import PARSE_FAILURES, PARSE_RETRIES
+from app.resilience import (
+    BackoffPolicy,
+    call_with_resilience,
+    call_with_resilience_sync,
+    get_breaker,
+)
+from app.schemas.task import AgentDecision, DecisionType, ToolCall
 from app.tools import registry
+from app.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 # Retry configuration
 MAX_PARSE_RETRIES = 2
+RETRY_HINT = "Your response was not valid JSON. Please respond with ONLY valid JSON, no markdown."
+
+DECISION_TYPES = {decision_type.value for decision_type in DecisionType}
+
+
+class StreamingDecisionParser:
+    """Incremental JSON scanner that finds tool calls in a streamed decision.
+
+    Fed the completion chunk by chunk, it tracks the top-level keys of the
+    decision object and returns each `tool_call` (or `tool_calls` element)
+    as soon as its closing brace arrives - provided `decision_type` is
+    "use_tool". Calls seen before `decision_type` are held until it is
+    known. Anything before the first "{" (a code fence, prose) is skipped;
+    output it cannot follow simply yields nothing, and the full decision is
+    still parsed normally once the stream ends.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+        self._key: str | None = None  # Current top-level key
+        self._key_start: int | None = None
+        self._value_start: int | None = None  # Start of its value
+        self._element_start: int | None = None  # Start of a tool_calls element
+        self.decision_type: str | None = None
+        self._held: list[ToolCall] = []
+
+    def feed(self, chunk: str) -> list[ToolCall]:
+        """Consume a chunk; return tool calls that became complete."""
+        if self._done:
+            return []
+        self._text += chunk
+        text = self._text
+        found: list[ToolCall] = []
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._string_closed(text, i, found)
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    if self._key is None:
+                        self._key_start = i
+                    else:
+                        self._value_start = i
+            elif char in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                elif self._depth == 2 and char == "{" and self._key == "tool_calls":
+                    self._element_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._element_start is not None:
+                    self._hold(text[self._element_start : i + 1])
+                    self._element_start = None
+                elif self._depth == 1 and self._value_start is not None:
+                    self._complete_value(text[self._value_start : i + 1])
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        self._complete_value(text[self._value_start : i])
+                    self._done = True
+                    break
+            elif self._depth == 1:
+                if char == ",":
+                    if self._value_start is not None:
+                        self._complete_value(text[self._value_start : i])
+                elif (
+                    self._key is not None
+                    and self._value_start is None
+                    and char != ":"
+                    and not char.isspace()
+                ):
+                    self._value_start = i  # Number, true, false or null
+
+        self._pos = len(text)
+        if self.decision_type == DecisionType.USE_TOOL.value:
+            found.extend(self._held)
+            self._held.clear()
+        return found
+
+    def _string_closed(self, text: str, end: int, found: list[ToolCall]) -> None:
+        if self._key is None and self._key_start is not None:
+            self._key = json.loads(text[self._key_start : end + 1])
+            self._key_start = None
+        elif self._value_start is not None:
+            self._complete_value(text[self._value_start : end + 1])
+
+    def _complete_value(self, raw: str) -> None:
+        key, self._key, self._value_start = self._key, None, None
+        if key == "decision_type":
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError:
+                return
+            if isinstance(value, str):
+                self.decision_type = value.strip().lower()
+        elif key == "tool_call":
+            self._hold(raw)
+
+    def _hold(self, raw: str) -> None:
+        try:
+            self._held.append(ToolCall.model_validate_json(raw))
+        except ValidationError:
+            pass
 
 
 class ReasoningAgent:
@@ -26,29 +174,76 @@ class ReasoningAgent:
     """
 
     def __init__(self, temperature: float = 0.0):
-        self.llm = ChatOpenAI(
-            model=settings.openai_model,
-            api_key=settings.openai_api_key,
-            temperature=temperature,
+        self.llm = build_chat_model(temperature)
+        self.decision_mode = settings.decision_mode
+        self.decision_cache = build_decision_cache(settings.openai_model, temperature)
+        self.token_budget = build_token_budget(settings.openai_model)
+        # Fail fast while the provider is failing; retry transient errors
+        resilience = settings.model_resilience.get(
+            settings.openai_model, settings.llm_resilience
+        )
+        self.breaker = get_breaker(
+            f"llm:{settings.openai_model}",
+            resilience.failure_threshold,
+            resilience.recovery_seconds,
+        )
+        self.retry_policy = BackoffPolicy(
+            max_retries=resilience.max_retries,
+            base_delay=resilience.base_delay,
+            max_delay=resilience.max_delay,
         )
+        # Per-call deadline, and a second call when the first is unusually slow
+        self.hedger = build_hedger()
+        # Requests/tokens per minute under the provider's limits
+        self.rate_limiter = build_rate_limiter(settings.openai_model)
+        self._system_prompt: tuple[int, str] | None = None
+        self._bound_llm: tuple[tuple[Any, ...], Runnable] | None = None
+        # Per decision mode: LLM decisions requested, parse retries, failures
+        self.parse_stats: dict[str, Counter[str]] = {}
+        # Local repairs that made a decision parse without a retry, by category
+        self.repair_counts: Counter[str] = Counter()
 
     @property
     def system_prompt(self) -> str:
-        """Build system prompt with current available tools."""
-        return build_system_prompt(registry.list_tools())
+        """System prompt for the current tools, rebuilt only when they change."""
+        version = registry.version
+        if self._system_prompt is None or self._system_prompt[0] != version:
+            self._system_prompt = (version, build_system_prompt(registry.list_tools()))
+        return self._system_prompt[1]
+
+    @property
+    def decision_llm(self) -> Runnable:
+        """The LLM configured for the decision mode.
+
+        "json_schema" binds a response format and "tools" binds every tool as
+        a native function; both are rebuilt only when the tools change.
+        "prompt" uses the plain LLM.
+        """
+        if self.decision_mode == "prompt":
+            return self.llm
+
+        key = (self.decision_mode, registry.version, id(self.llm))
+        if self._bound_llm is None or self._bound_llm[0] != key:
+            llm = cast(BaseChatModel, self.llm)
+            if self.decision_mode == "json_schema":
+                bound = llm.bind(response_format=response_format(registry.tools))
+            else:
+                bound = llm.bind_tools(
+                    tool_definitions(registry.tools), tool_choice="required"
+                )
+            self._bound_llm = (key, bound)
+        return self._bound_llm[1]
 
     def reason(
-        self,
-        task_input: TaskInput,
-        observations: list[Observation] | None = None,
+        self, conversation: Conversation, usage: StepUsage | None = None
     ) -> AgentDecision:
         """Analyze a task and produce a structured decision.
 
         Includes retry logic for malformed LLM outputs.
 
         Args:
-            task_input: The task to analyze
-            observations: Previous tool execution results (for observation loop)
+            conversation: The task and its history so far (observation loop)
+            usage: If given, LLM and parse timings and token usage are added to it
 
         Returns:
             AgentDecision with the agent's decision
@@ -56,34 +251,147 @@ class ReasoningAgent:
         Raises:
             ValueError: If LLM output cannot be parsed after retries
         """
-        messages = self._build_messages(task_input, observations)
+        messages = self._build_messages(conversation)
+        cache_key = self._cache_key(messages)
+        if cache_key is not None:
+            assert self.decision_cache is not None
+            cached = self.decision_cache.get(cache_key)
+            if cached is not None:
+                return self._cache_hit(cached, usage)
+
+        steps = self._reason_steps(conversation, messages, cache_key, usage)
+        try:
+            messages = next(steps)
+            while True:
+                try:
+                    response = call_with_resilience_sync(
+                        self.breaker,
+                        self.retry_policy,
+                        partial(self._call_llm_sync, messages),
+                    )
+                except BaseException as e:
+                    messages = steps.throw(e)
+                else:
+                    messages = steps.send(response)
+        except StopIteration as done:
+            return done.value
+
+    async def areason(
+        self,
+        conversation: Conversation,
+        on_token: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[ToolCall], None] | None = None,
+        usage: StepUsage | None = None,
+    ) -> AgentDecision:
+        """Async variant of `reason` built on `ChatOpenAI.ainvoke`.
+
+        Awaiting the LLM instead of blocking on it lets a single worker keep
+        many tasks in flight while they wait on the provider.
+
+        Args:
+            conversation: The task and its history so far (observation loop)
+            on_token: If given, the completion is streamed and each text
+                chunk is passed to this callback as it arrives
+            on_tool_call: If given, the completion is streamed and each tool
+                call of a "use_tool" decision is passed to this callback as
+                soon as it is complete, before the decision is validated
+            usage: If given, LLM and parse timings and token usage are added to it
+
+        Returns:
+            AgentDecision with the agent's decision
+
+        Raises:
+            ValueError: If LLM output cannot be parsed after retries
+        """
+        messages = self._build_messages(conversation)
+        cache_key = self._cache_key(messages)
+        if cache_key is not None:
+            assert self.decision_cache is not None
+            cached = await self.decision_cache.aget(cache_key)
+            if cached is not None:
+                return self._cache_hit(cached, usage)
+
+        steps = self._reason_steps(conversation, messages, cache_key, usage)
+        try:
+            messages = next(steps)
+            while True:
+                try:
+                    response = await call_with_resilience(
+                        self.breaker,
+                        self.retry_policy,
+                        partial(self._call_llm, messages, on_token, on_tool_call),
+                        ignore=(ValueError,),  # Empty output is not an outage
+                    )
+                except BaseException as e:
+                    messages = steps.throw(e)
+                else:
+                    messages = steps.send(response)
+        except StopIteration as done:
+            return done.value
+
+    def _reason_steps(
+        self,
+        conversation: Conversation,
+        messages: list[dict[str, str]],
+        cache_key: str | None,
+        usage: StepUsage | None,
+    ) -> Generator[list[dict[str, str]], tuple[BaseMessage, float], AgentDecision]:
+        """Everything in `reason` / `areason` after a cache miss but the LLM call.
+
+        Yields the messages to send, and is sent what `_call_llm` returns (or
+        has the call's exception thrown in); returns the decision. Tracing,
+        parsing, parse retries and storing the decision thus live here once,
+        and the two callers only differ in how they do I/O.
+        """
         last_error: Exception | None = None
 
         logger.info(
             "agent.reason.start",
             extra={
-                "task": task_input.task[:100],
-                "observations_count": len(observations) if observations else 0,
+                "task": conversation.task_input.task[:100],
+                "observations_count": len(conversation.observations),
             },
         )
 
+        stats = self._count_request()
         for attempt in range(1, MAX_PARSE_RETRIES + 1):
             try:
-                response = self.llm.invoke(messages)
-                raw_output = cast(str, response.content)
+                with tracer.start_span(
+                    "llm.invoke",
+                    {"attempt": attempt, "decision_mode": self.decision_mode},
+                ) as span:
+                    response, llm_seconds = yield messages
+                    received = time.perf_counter()
+                    input_tokens, output_tokens = response_tokens(response)
+                    span.set_attributes(
+                        {"input_tokens": input_tokens, "output_tokens": output_tokens}
+                    )
 
-                logger.debug(
-                    "agent.llm.response",
-                    extra={"attempt": attempt, "output_length": len(raw_output)},
-                )
+                    logger.debug(
+                        "agent.llm.response",
+                        extra={
+                            "attempt": attempt,
+                            "output_length": len(response.content),
+                        },
+                    )
 
-                decision = self._parse_decision(raw_output)
+                    try:
+                        decision = self._decide(response)
+                    finally:
+                        if usage is not None:
+                            usage.record_llm_call(
+                                response,
+                                llm_seconds,
+                                time.perf_counter() - received,
+                            )
+                    span.set_attribute("decision_type", decision.decision_type.value)
+                self._cache_store(cache_key, decision)
 
                 logger.info(
                     "agent.reason.success",
                     extra={
                         "decision_type": decision.decision_type.value,
-                        "has_tool_call": decision.tool_call is not None,
+                        "tool_calls": len(decision.requested_tool_calls),
                         "attempt": attempt,
                     },
                 )
@@ -99,110 +407,229 @@ class ReasoningAgent:
 
                 if attempt < MAX_PARSE_RETRIES:
                     # Add a hint to the conversation for retry
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": "Your response was not valid JSON. Please respond with ONLY valid JSON, no markdown.",
-                        }
-                    )
+                    stats["retries"] += 1
+                    PARSE_RETRIES.inc()
+                    messages.append({"role": "user", "content": RETRY_HINT})
                     continue
 
-        # All retries exhausted
-        logger.error(
-            "agent.reason.failed",
-            extra={"attempts": MAX_PARSE_RETRIES, "error": str(last_error)},
-        )
-        raise ValueError(
-            f"Failed to get valid response after {MAX_PARSE_RETRIES} attempts: {last_error}"
+        stats["failures"] += 1
+        PARSE_FAILURES.inc()
+        raise self._retries_exhausted(last_error)
+
+    def _call_llm_sync(
+        self, messages: list[dict[str, str]]
+    ) -> tuple[BaseMessage, float]:
+        """One rate-limited, hedged LLM call (see `_call_llm`)."""
+        tokens = self._reserved_tokens(messages)
+        self.rate_limiter.acquire_sync(tokens)
+        started = time.perf_counter()
+
+        def attempt() -> BaseMessage:
+            used = None
+            try:
+                response = self.decision_llm.invoke(messages)
+                used = sum(response_tokens(response))
+                return response
+            finally:
+                self.rate_limiter.settle(tokens, used)
+
+        response = self.hedger.run_sync(
+            attempt, admit_hedge=lambda: self.rate_limiter.try_acquire(tokens)
         )
+        return response, time.perf_counter() - started
 
-    def _build_messages(
+    async def _call_llm(
         self,
-        task_input: TaskInput,
-        observations: list[Observation] | None = None,
-    ) -> list[dict[str, str]]:
-        """Build the message history for the LLM."""
-        messages: list[dict[str, str]] = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": self._format_task(task_input)},
-        ]
-
-        if observations:
-            for obs in observations:
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": json.dumps(
-                            {
-                                "decision_type": "use_tool",
-                                "reasoning": f"Calling {obs.tool_name}",
-                                "tool_call": {
-                                    "tool_name": obs.tool_name,
-                                    "arguments": {},
-                                },
-                            }
-                        ),
-                    }
-                )
-                messages.append(
-                    {
-                        "role": "user",
-                        "content": self._format_observation(obs),
-                    }
+        messages: list[dict[str, str]],
+        on_token: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[ToolCall], None] | None = None,
+    ) -> tuple[BaseMessage, float]:
+        """One rate-limited, hedged LLM call.
+
+        The call waits its turn under the rate limits before its deadline
+        starts; a hedge is only sent if the limiter has capacity right away.
+        Every attempt settles its own reservation when it ends, whether it
+        answered, failed, timed out or lost to the other attempt.
+
+        Returns:
+            The response, and the seconds the provider took to give it: rate
+            limiter waits (and the caller's retry backoff) are not included
+        """
+        tokens = self._reserved_tokens(messages)
+        await self.rate_limiter.acquire(tokens)
+        started = time.perf_counter()
+
+        async def attempt(claim: Claim) -> BaseMessage:
+            used = None
+            try:
+                response = await self._acomplete(
+                    messages, on_token, on_tool_call, claim
                 )
+                used = sum(response_tokens(response))
+                return response
+            finally:
+                self.rate_limiter.settle(tokens, used)
 
-        return messages
+        response = await self.hedger.run(
+            attempt, admit_hedge=lambda: self.rate_limiter.try_acquire(tokens)
+        )
+        return response, time.perf_counter() - started
+
+    def _reserved_tokens(self, messages: list[dict[str, str]]) -> int:
+        """Tokens to reserve for a call: the prompt plus the expected output."""
+        if self.rate_limiter.tokens is None:
+            return 0  # Not limited; skip counting
+        return (
+            self.token_budget.counter.count_messages(messages)
+            + self.rate_limiter.expected_output_tokens
+        )
 
-    def _format_task(self, task_input: TaskInput) -> str:
-        """Format the initial task message."""
-        message = f"Task: {task_input.task}"
+    async def _acomplete(
+        self,
+        messages: list[dict[str, str]],
+        on_token: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[ToolCall], None] | None = None,
+        claim: Claim | None = None,
+    ) -> BaseMessage:
+        """Run one LLM call and return its message, streaming it if asked.
+
+        A streamed call calls `claim` on its first chunk, before any
+        callback, so that only the winner of a hedged call is forwarded.
+        """
+        if on_token is None and on_tool_call is None:
+            return await self.decision_llm.ainvoke(messages)
+
+        parser = StreamingDecisionParser() if on_tool_call is not None else None
+        response: Any = None
+        async for chunk in self.decision_llm.astream(messages):
+            if response is None and claim is not None:
+                claim()
+            response = chunk if response is None else response + chunk
+            text = cast(str, chunk.content)
+            if not text:
+                continue
+            if on_token is not None:
+                on_token(text)
+            if parser is not None and on_tool_call is not None:
+                for tool_call in parser.feed(text):
+                    on_tool_call(tool_call)
+        if response is None:
+            raise ValueError("Empty response from LLM")
+        return cast(BaseMessage, response)
+
+    def _decide(self, response: BaseMessage) -> AgentDecision:
+        """Turn an LLM response into a decision.
+
+        Native tool calls are read directly; anything else, including text
+        answers in the structured modes, goes through `_parse_decision`.
 
-        if task_input.context:
-            context_str = json.dumps(task_input.context, indent=2)
-            message += f"\n\nContext:\n{context_str}"
+        Raises:
+            ValueError: If the response holds no valid decision
+        """
+        if has_tool_calls(response):
+            return decision_from_tool_calls(response)
+        return self._parse_decision(cast(str, response.content))
+
+    def _count_request(self) -> Counter[str]:
+        """Count an LLM decision request; returns the mode's counters."""
+        stats = self.parse_stats.setdefault(self.decision_mode, Counter())
+        stats["requests"] += 1
+        return stats
+
+    def parse_stats_summary(self) -> dict[str, dict[str, Any]]:
+        """Parse-retry rate per decision mode, for status reporting."""
+        return {
+            mode: {
+                "requests": stats["requests"],
+                "retries": stats["retries"],
+                "failures": stats["failures"],
+                "retry_rate": round(stats["retries"] / stats["requests"], 4)
+                if stats["requests"]
+                else 0.0,
+            }
+            for mode, stats in self.parse_stats.items()
+        }
+
+    def _cache_key(self, messages: list[dict[str, str]]) -> str | None:
+        """Decision cache key of a request; None when caching is off.
+
+        The key is taken before any retry hint is added.
+        """
+        if self.decision_cache is None:
+            return None
+        return self.decision_cache.key(messages, self.decision_mode)
 
-        return message
+    def _cache_hit(
+        self, decision: AgentDecision, usage: StepUsage | None
+    ) -> AgentDecision:
+        """Account for a decision served from the cache and return it."""
+        if usage is not None:
+            usage.cached = True
+        logger.info(
+            "agent.reason.cache_hit",
+            extra={"decision_type": decision.decision_type.value},
+        )
+        return decision
 
-    def _format_observation(self, observation: Observation) -> str:
-        """Format a tool observation for the agent."""
-        if observation.success:
-            result_str = json.dumps(observation.result, indent=2)
-            return (
-                f"Tool '{observation.tool_name}' executed successfully.\n\n"
-                f"Result:\n{result_str}\n\n"
-                f"What would you like to do next?"
-            )
-        else:
-            return (
-                f"Tool '{observation.tool_name}' failed.\n\n"
-                f"Error: {observation.error}\n\n"
-                f"What would you like to do next?"
-            )
+    def _cache_store(self, key: str | None, decision: AgentDecision) -> None:
+        """Remember a freshly parsed decision under its request key."""
+        if key is not None and self.decision_cache is not None:
+            self.decision_cache.put(key, decision)
+
+    def _retries_exhausted(self, last_error: Exception | None) -> ValueError:
+        """Log and build the error raised once all parse retries are used."""
+        logger.error(
+            "agent.reason.failed",
+            extra={"attempts": MAX_PARSE_RETRIES, "error": str(last_error)},
+        )
+        return ValueError(
+            f"Failed to get valid response after {MAX_PARSE_RETRIES} attempts: {last_error}"
+        )
+
+    def _build_messages(self, conversation: Conversation) -> list[dict[str, str]]:
+        """Build the message list for the LLM.
+
+        Returns a fresh list (retry hints may be appended to it) that shares
+        the conversation's already-formatted message dicts. Older observations
+        are compacted if the prompt would exceed the model's token budget.
+        """
+        return self.token_budget.build(self.system_prompt, conversation)
 
     def _parse_decision(self, raw_output: str) -> AgentDecision:
         """Parse LLM output into an AgentDecision.
 
+        Output that isn't valid JSON as is goes through local repairs (see
+        `json_repair`) before the caller spends an LLM retry on it. Each
+        repair that was needed is counted in `repair_counts`.
+
         Raises:
             ValueError: If parsing or validation fails
         """
-        cleaned = raw_output.strip()
-
-        # Handle markdown code fences
-        if cleaned.startswith("```"):
-            lines = cleaned.split("\n")
-            cleaned = "\n".join(lines[1:-1])
-
-        try:
-            data = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON: {e}") from e
+        data, repairs = repair_json(raw_output)
+        if not isinstance(data, dict):
+            raise ValueError("Schema validation failed: expected a JSON object")
+
+        decision_type = data.get("decision_type")
+        if isinstance(decision_type, str) and decision_type not in DECISION_TYPES:
+            normalized = (
+                decision_type.strip().lower().replace("-", "_").replace(" ", "_")
+            )
+            if normalized in DECISION_TYPES:
+                decision_type = normalized
+                repairs.append("decision_type_case")
 
         try:
-            return AgentDecision(
-                decision_type=DecisionType(data.get("decision_type")),
+            decision = AgentDecision(
+                decision_type=DecisionType(decision_type),
                 reasoning=data.get("reasoning", ""),
                 message=data.get("message"),
                 tool_call=data.get("tool_call"),
+                tool_calls=data.get("tool_calls") or [],
             )
         except (ValidationError, ValueError) as e:
             raise ValueError(f"Schema validation failed: {e}") from e
+
+        if repairs:
+            self.repair_counts.update(repairs)
+            logger.info("agent.parse.repaired", extra={"repairs": repairs})
+        return decision
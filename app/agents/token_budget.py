@@ -0,0 +1,220 @@
+"""Token budget for the prompt sent on each reasoning step.
+
+Every earlier observation is replayed on each iteration, so tools that
+return large payloads would otherwise grow the prompt without bound. The
+budget counts tokens per message and, when the prompt would exceed the
+model's limit, compacts older observation messages step by step:
+
+1. "truncate": long strings are cut and long lists shortened
+2. "elide": the result is dropped, keeping only the tool name and outcome
+
+Older turns are compacted first, oldest first; the most recent
+`keep_recent` turns are only touched when compacting the rest wasn't
+enough. The system prompt, the task and the decisions are never changed.
+"""
+
+import logging
+from collections import Counter
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from app.agents.conversation import Conversation, compact_json, format_observations
+from app.config import settings
+from app.schemas.task import Observation
+
+logger = logging.getLogger(__name__)
+
+# Counting configuration
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators per chat message
+CHARS_PER_TOKEN = 4  # Estimate used when no tokenizer is available
+
+
+class TokenCounter:
+    """Counts tokens with the model's tiktoken encoding, or estimates them.
+
+    The encoding is loaded on first use. If tiktoken or the encoding is not
+    available (e.g. offline), counts fall back to characters / 4. Counts
+    are memoized per string, so replayed messages are only counted once.
+    """
+
+    def __init__(self, model: str, use_tiktoken: bool = True):
+        self.model = model
+        self._use_tiktoken = use_tiktoken
+        self._encode: Callable[[str], list[int]] | None = None
+        self.count = lru_cache(maxsize=4096)(self._count)
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the real tokenizer."""
+        return self._load() is not None
+
+    def _load(self) -> Callable[[str], list[int]] | None:
+        if self._encode is None and self._use_tiktoken:
+            try:
+                import tiktoken
+
+                try:
+                    encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("o200k_base")
+                self._encode = encoding.encode
+            except Exception as e:
+                logger.warning(
+                    "agent.tokens.estimate",
+                    extra={"model": self.model, "error": str(e)},
+                )
+                self._use_tiktoken = False
+        return self._encode
+
+    def _count(self, text: str) -> int:
+        encode = self._load()
+        if encode is None:
+            return len(text) // CHARS_PER_TOKEN + 1
+        return len(encode(text))
+
+    def count_messages(self, messages: list[dict[str, str]]) -> int:
+        """Tokens of a whole chat request."""
+        return sum(
+            self.count(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+            for message in messages
+        )
+
+
+class TokenBudget:
+    """Keeps each reasoning prompt under a token budget.
+
+    Args:
+        counter: Token counter for the model
+        max_tokens: Prompt budget (system prompt + conversation)
+        keep_recent: Most recent observation turns compacted only as a last resort
+        max_string_chars: Longest string kept by the "truncate" step
+        max_list_items: Longest list kept by the "truncate" step
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        max_tokens: int,
+        keep_recent: int = 1,
+        max_string_chars: int = 500,
+        max_list_items: int = 10,
+    ):
+        self.counter = counter
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.max_string_chars = max_string_chars
+        self.max_list_items = max_list_items
+        self.compactions: Counter[str] = Counter()
+        # Conversations are append-only: (messages counted, their tokens)
+        self._counted: WeakKeyDictionary[Conversation, tuple[int, int]] = (
+            WeakKeyDictionary()
+        )
+
+    def build(
+        self, system_prompt: str, conversation: Conversation
+    ) -> list[dict[str, str]]:
+        """Messages for the next request, compacted to fit the budget.
+
+        Returns a fresh list; the conversation itself is never modified.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            *conversation.messages,
+        ]
+        total = self.counter.count(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        total += self._conversation_tokens(conversation)
+        if total <= self.max_tokens:
+            return messages
+
+        turns = conversation.observation_turns
+        split = max(0, len(turns) - self.keep_recent)
+        steps: list[tuple[str, Callable[[Observation], str]]] = [
+            ("truncate", self._truncated),
+            ("elide", _elided),
+        ]
+        # Older turns through both steps first, recent ones only if needed
+        passes = [(step, turns[:split]) for step in steps]
+        passes += [(step, turns[split:]) for step in steps]
+
+        for (name, format_one), group in passes:
+            for index, observations in group:
+                position = index + 1  # After the system prompt
+                before = self.counter.count(messages[position]["content"])
+                content = format_observations(observations, format_one)
+                after = self.counter.count(content)
+                if after >= before:
+                    continue
+                messages[position] = {"role": "user", "content": content}
+                total -= before - after
+                self.compactions[name] += 1
+                if total <= self.max_tokens:
+                    return messages
+
+        self.compactions["over_budget"] += 1
+        logger.warning(
+            "agent.tokens.over_budget",
+            extra={"tokens": total, "budget": self.max_tokens},
+        )
+        return messages
+
+    def _conversation_tokens(self, conversation: Conversation) -> int:
+        """Tokens of the conversation, counting only messages added since last time."""
+        counted, tokens = self._counted.get(conversation, (0, 0))
+        new = conversation.messages[counted:]
+        if new:
+            tokens += self.counter.count_messages(new)
+            self._counted[conversation] = (counted + len(new), tokens)
+        return tokens
+
+    def _truncated(self, observation: Observation) -> str:
+        if not observation.success:
+            return _elided(observation)
+        result = _shrink(observation.result, self.max_string_chars, self.max_list_items)
+        return (
+            f"Tool '{observation.tool_name}' executed successfully.\n\n"
+            f"Result (truncated):\n{compact_json(result)}"
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Budget and compaction counts, for status reporting."""
+        return {
+            "max_tokens": self.max_tokens,
+            "exact_counts": self.counter.exact,
+            "truncated": self.compactions["truncate"],
+            "elided": self.compactions["elide"],
+            "over_budget": self.compactions["over_budget"],
+        }
+
+
+def _elided(observation: Observation) -> str:
+    outcome = "executed successfully" if observation.success else "failed"
+    return f"Tool '{observation.tool_name}' {outcome}. (Details elided to save space.)"
+
+
+def _shrink(value: Any, max_chars: int, max_items: int) -> Any:
+    """Copy of a JSON value with long strings and lists cut down."""
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"{value[:max_chars]}...[{len(value) - max_chars} more chars]"
+    if isinstance(value, list):
+        items = [_shrink(v, max_chars, max_items) for v in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"...[{len(value) - max_items} more items]")
+        return items
+    if isinstance(value, dict):
+        return {k: _shrink(v, max_chars, max_items) for k, v in value.items()}
+    return value
+
+
+def build_token_budget(model: str) -> TokenBudget:
+    """Create the prompt budget for a model from settings."""
+    return TokenBudget(
+        TokenCounter(model, use_tiktoken=settings.llm_backend == "openai"),
+        max_tokens=settings.model_token_budgets.get(
+            model, settings.default_token_budget
+        ),
+        keep_recent=settings.observation_keep_recent,
+        max_string_chars=settings.observation_max_string_chars,
+        max_list_items=settings.observation_max_list_items,
+    )
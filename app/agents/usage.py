@@ -0,0 +1,144 @@
+"""Per-task latency and token accounting.
+
+Each iteration of the observation loop records how long the LLM call(s),
+decision parsing and tool dispatch took, and the tokens the provider
+reported in the response's `usage_metadata`. A finished task is added to
+per-model totals, with a cost estimate from `settings.model_prices`.
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.messages import BaseMessage
+
+from app.config import settings
+
+# Aggregates per model, across tasks
+_totals: dict[str, Counter[str]] = {}
+
+
+@dataclass
+class StepUsage:
+    """Timings (ms) and tokens of one observation loop iteration."""
+
+    llm_ms: float = 0.0
+    parse_ms: float = 0.0
+    tools_ms: float = 0.0
+    llm_calls: int = 0  # More than one when parse retries were needed
+    cached: bool = False  # Decision served from the decision cache
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def record_llm_call(
+        self, response: BaseMessage, llm_seconds: float, parse_seconds: float
+    ) -> None:
+        """Add one LLM call: its latency, parse time and reported tokens."""
+        self.llm_calls += 1
+        self.llm_ms += llm_seconds * 1000
+        self.parse_ms += parse_seconds * 1000
+        input_tokens, output_tokens = response_tokens(response)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "llm_ms": round(self.llm_ms, 2),
+            "parse_ms": round(self.parse_ms, 2),
+            "tools_ms": round(self.tools_ms, 2),
+            "llm_calls": self.llm_calls,
+            "cached": self.cached,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+@dataclass
+class TaskUsage:
+    """Usage of one task, one StepUsage per iteration."""
+
+    model: str
+    steps: list[StepUsage] = field(default_factory=list)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def step(self) -> StepUsage:
+        """Start accounting for the next iteration."""
+        step = StepUsage()
+        self.steps.append(step)
+        return step
+
+    @property
+    def duration_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(step.input_tokens for step in self.steps)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(step.output_tokens for step in self.steps)
+
+    def totals(self) -> dict[str, Any]:
+        """Task-level totals, flat so they fit a log event."""
+        return {
+            "duration_ms": round(self.duration_ms, 2),
+            "llm_ms": round(sum(step.llm_ms for step in self.steps), 2),
+            "parse_ms": round(sum(step.parse_ms for step in self.steps), 2),
+            "tools_ms": round(sum(step.tools_ms for step in self.steps), 2),
+            "llm_calls": sum(step.llm_calls for step in self.steps),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": estimate_cost(
+                self.model, self.input_tokens, self.output_tokens
+            ),
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Totals plus the per-iteration breakdown."""
+        return {
+            "model": self.model,
+            **self.totals(),
+            "iterations": [step.summary() for step in self.steps],
+        }
+
+
+def response_tokens(response: BaseMessage) -> tuple[int, int]:
+    """(input, output) tokens from a response's usage_metadata, 0 if absent."""
+    metadata = getattr(response, "usage_metadata", None) or {}
+    return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float | None:
+    """Cost in USD from `settings.model_prices`; None for unpriced models."""
+    prices = settings.model_prices.get(model)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return round((input_tokens * input_price + output_tokens * output_price) / 1e6, 6)
+
+
+def record_task(usage: TaskUsage) -> None:
+    """Add a finished task to the per-model totals."""
+    totals = _totals.setdefault(usage.model, Counter())
+    totals["tasks"] += 1
+    totals["llm_calls"] += sum(step.llm_calls for step in usage.steps)
+    totals["input_tokens"] += usage.input_tokens
+    totals["output_tokens"] += usage.output_tokens
+
+
+def usage_stats() -> dict[str, dict[str, Any]]:
+    """Tokens and estimated cost per model, for status reporting."""
+    return {
+        model: {
+            "tasks": totals["tasks"],
+            "llm_calls": totals["llm_calls"],
+            "input_tokens": totals["input_tokens"],
+            "output_tokens": totals["output_tokens"],
+            "cost_usd": estimate_cost(
+                model, totals["input_tokens"], totals["output_tokens"]
+            ),
+        }
+        for model, totals in _totals.items()
+    }
@@ -0,0 +1,371 @@
+"""Command-line batch runner for JSONL task files.
+
+Streams `TaskRequest` records (one JSON object per line) through
+`process_task` with a pool of workers and writes one result line per task
+to an output JSONL file as each finishes, in completion order.
+
+Usage:
+    uv run python -m app.cli tasks.jsonl -o results.jsonl --workers 16
+
+Memory stays constant whatever the input size: at most a small window of
+lines is read ahead, results are written immediately and latency
+percentiles come from a fixed-size reservoir sample.
+
+Progress is checkpointed next to the output file. Re-running the same
+command after an interruption truncates the output back to the last
+checkpoint and resumes with the lines not yet recorded in it, so every
+input line ends up in the output exactly once.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.schemas.task import TaskRequest, TaskResponse
+from app.services.task_service import process_task
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CHECKPOINT_EVERY = 100  # Completed tasks between checkpoints
+LATENCY_RESERVOIR_SIZE = 10_000  # Samples kept for percentile estimates
+READ_CHUNK_BYTES = 64 * 1024  # Input read per thread hop
+
+
+@dataclass
+class Checkpoint:
+    """Which input lines are already in the output, and where it ends.
+
+    `next_line` is the lowest line number not yet done; `done_above` holds
+    lines beyond it that finished out of order. Its size is bounded by the
+    number of tasks in flight.
+    """
+
+    output_offset: int = 0
+    next_line: int = 0
+    done_above: set[int] = field(default_factory=set)
+
+    def is_done(self, line: int) -> bool:
+        return line < self.next_line or line in self.done_above
+
+    def mark_done(self, line: int) -> None:
+        self.done_above.add(line)
+        while self.next_line in self.done_above:
+            self.done_above.remove(self.next_line)
+            self.next_line += 1
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            output_offset=data["output_offset"],
+            next_line=data["next_line"],
+            done_above=set(data["done_above"]),
+        )
+
+    def save(self, path: str) -> None:
+        """Write atomically so a crash never leaves a torn checkpoint."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "output_offset": self.output_offset,
+                    "next_line": self.next_line,
+                    "done_above": sorted(self.done_above),
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+
+class RunStats:
+    """Throughput, latency percentiles and status counts for one run."""
+
+    def __init__(self, reservoir_size: int = LATENCY_RESERVOIR_SIZE):
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.statuses: Counter[str] = Counter()
+        self._reservoir: list[float] = []
+        self._reservoir_size = reservoir_size
+        self._random = random.Random(0)
+
+    def record(self, status: str, duration_ms: float) -> None:
+        self.completed += 1
+        self.statuses[status] += 1
+        # Reservoir sampling (Algorithm R) keeps memory constant
+        if len(self._reservoir) < self._reservoir_size:
+            self._reservoir.append(duration_ms)
+        else:
+            slot = self._random.randrange(self.completed)
+            if slot < self._reservoir_size:
+                self._reservoir[slot] = duration_ms
+
+    def percentile(self, p: float) -> float:
+        if not self._reservoir:
+            return 0.0
+        ordered = sorted(self._reservoir)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "completed": self.completed,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(self.completed / elapsed, 3) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(self.percentile(50), 1),
+                "p90": round(self.percentile(90), 1),
+                "p99": round(self.percentile(99), 1),
+                "max": round(max(self._reservoir, default=0.0), 1),
+            },
+            "statuses": dict(self.statuses),
+        }
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: int,
+    checkpoint_path: str | None = None,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    overwrite: bool = False,
+) -> RunStats:
+    """Stream a JSONL file of tasks through the agent.
+
+    Args:
+        input_path: JSONL file of TaskRequest records (extra keys such as
+            "id" are copied to the output record)
+        output_path: JSONL file to write one result record per input line
+        workers: Number of tasks processed concurrently
+        checkpoint_path: Where progress is saved (default: output + ".checkpoint")
+        checkpoint_every: Completed tasks between checkpoint writes
+        overwrite: Replace an existing output file that has no checkpoint
+
+    Returns:
+        RunStats for the tasks processed in this run
+
+    Raises:
+        FileExistsError: If the output exists without a checkpoint to resume
+    """
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+
+    output, checkpoint = await asyncio.to_thread(
+        _open_output, output_path, checkpoint_path, overwrite
+    )
+
+    stats = RunStats()
+    queue: asyncio.Queue[tuple[int, str] | None] = asyncio.Queue(maxsize=workers * 2)
+    # Finished lines go through one writer task so the output and checkpoint
+    # are only touched from a thread, one batch at a time. A record of None
+    # marks a blank input line that only moves the watermark.
+    results: asyncio.Queue[tuple[int, dict[str, Any] | None] | None] = asyncio.Queue(
+        maxsize=workers * 2
+    )
+    write_lock = threading.Lock()
+    since_checkpoint = 0
+
+    def write_batch(batch: list[tuple[int, dict[str, Any] | None]]) -> None:
+        nonlocal since_checkpoint
+        with write_lock:
+            output.write(
+                b"".join(
+                    json.dumps(record, default=str).encode("utf-8") + b"\n"
+                    for _, record in batch
+                    if record is not None
+                )
+            )
+            for line_no, _ in batch:
+                checkpoint.mark_done(line_no)
+            since_checkpoint += len(batch)
+            if since_checkpoint >= checkpoint_every:
+                _save_checkpoint(output, checkpoint, checkpoint_path)
+                since_checkpoint = 0
+
+    def save_final() -> None:
+        with write_lock:  # Wait for a batch still being written
+            _save_checkpoint(output, checkpoint, checkpoint_path)
+            output.close()
+
+    async def writer() -> None:
+        while True:
+            items = [await results.get()]
+            while not results.empty():
+                items.append(results.get_nowait())
+            batch = [item for item in items if item is not None]
+            if batch:
+                await asyncio.to_thread(write_batch, batch)
+            if len(batch) < len(items):
+                return
+
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            line_no, raw = item
+            record, status, duration_ms = await _run_line(line_no, raw)
+            stats.record(status, duration_ms)
+            await results.put((line_no, record))
+
+    async def reader(f: IO[str]) -> None:
+        line_no = 0
+        # File reads happen in a thread, a chunk at a time, to keep the loop free
+        while lines := await asyncio.to_thread(f.readlines, READ_CHUNK_BYTES):
+            for raw in lines:
+                if not raw.strip():
+                    await results.put((line_no, None))  # Keep the watermark moving
+                elif not checkpoint.is_done(line_no):
+                    await queue.put((line_no, raw))
+                line_no += 1
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def process() -> None:
+        await asyncio.gather(reader(f), *(worker() for _ in range(workers)))
+        await results.put(None)
+
+    try:
+        f = await asyncio.to_thread(open, input_path, encoding="utf-8")
+        with f:
+            await asyncio.gather(process(), writer())
+    finally:
+        await asyncio.to_thread(save_final)
+
+    await asyncio.to_thread(os.remove, checkpoint_path)
+    return stats
+
+
+async def _run_line(line_no: int, raw: str) -> tuple[dict[str, Any], str, float]:
+    """Process one input line. Returns (output record, status, duration ms)."""
+    start = time.perf_counter()
+    try:
+        data = json.loads(raw)
+        request = TaskRequest.model_validate(data)
+    except (json.JSONDecodeError, ValidationError) as e:
+        return {"line": line_no, "error": f"Invalid record: {e}"}, "invalid", 0.0
+
+    record: dict[str, Any] = {"line": line_no}
+    if isinstance(data, dict) and "id" in data:
+        record["id"] = data["id"]
+
+    try:
+        agent_response = await process_task(
+            request.to_task_input(), wait_for_admission=True
+        )
+        response = TaskResponse.from_agent_response(agent_response)
+        record.update(response.model_dump(mode="json"))
+        status = response.status.value
+    except Exception as e:
+        logger.exception("batch.item.error", extra={"line": line_no})
+        record["error"] = str(e)
+        status = "error"
+
+    duration_ms = (time.perf_counter() - start) * 1000
+    record["duration_ms"] = round(duration_ms, 3)
+    return record, status, duration_ms
+
+
+def _open_output(
+    output_path: str, checkpoint_path: str, overwrite: bool
+) -> tuple[IO[bytes], Checkpoint]:
+    """Open the output for writing, truncated back to the saved checkpoint."""
+    if os.path.exists(checkpoint_path):
+        checkpoint = Checkpoint.load(checkpoint_path)
+        output = open(output_path, "r+b" if os.path.exists(output_path) else "wb")
+        output.truncate(checkpoint.output_offset)
+        output.seek(checkpoint.output_offset)
+        logger.info(
+            "batch.resume",
+            extra={"next_line": checkpoint.next_line, "output": output_path},
+        )
+    elif os.path.exists(output_path) and not overwrite:
+        raise FileExistsError(
+            f"{output_path} exists and there is no checkpoint to resume from "
+            "(pass --overwrite to replace it)"
+        )
+    else:
+        checkpoint = Checkpoint()
+        output = open(output_path, "wb")
+    return output, checkpoint
+
+
+def _save_checkpoint(output: IO[bytes], checkpoint: Checkpoint, path: str) -> None:
+    """Flush the output, then record how much of it the checkpoint covers."""
+    output.flush()
+    os.fsync(output.fileno())
+    checkpoint.output_offset = output.tell()
+    checkpoint.save(path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Run a JSONL file of tasks through the autonomous agent.",
+    )
+    parser.add_argument("input", help="JSONL file of TaskRequest records")
+    parser.add_argument("-o", "--output", required=True, help="Output JSONL file")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=settings.batch_default_concurrency,
+        help="Tasks processed concurrently (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--checkpoint", help="Checkpoint file (default: <output>.checkpoint)"
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=CHECKPOINT_EVERY,
+        help="Completed tasks between checkpoints (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace an existing output file that has no checkpoint",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    logging.basicConfig(level=logging.WARNING)
+
+    try:
+        stats = asyncio.run(
+            run_batch(
+                args.input,
+                args.output,
+                workers=args.workers,
+                checkpoint_path=args.checkpoint,
+                checkpoint_every=args.checkpoint_every,
+                overwrite=args.overwrite,
+            )
+        )
+    except FileExistsError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("Interrupted; re-run the same command to resume.", file=sys.stderr)
+        return 130
+
+    print(json.dumps(stats.summary(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,21 @@
 """Application configuration with validation."""
 
-from pydantic import SecretStr
+from typing import Literal
+
+from pydantic import BaseModel, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class ResilienceSettings(BaseModel):
+    """Circuit breaker and retry policy for one dependency (app/resilience.py)."""
+
+    failure_threshold: int = 5  # Consecutive failures that open the breaker
+    recovery_seconds: float = 30.0  # Open time before a half-open trial call
+    max_retries: int = 2
+    base_delay: float = 0.5  # First retry waits up to this (full jitter)
+    max_delay: float = 20.0  # Longer retry-after hints are not waited for
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
@@ -12,8 +24,124 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
     )
 
-    openai_api_key: SecretStr
+    # LLM backend: "openai", or "scripted" for offline load tests and CI
+    llm_backend: Literal["openai", "scripted"] = "openai"
+    openai_api_key: SecretStr | None = None  # Required by the openai backend
     openai_model: str = "gpt-4o-mini"
+    # How decisions are returned: "prompt" (JSON described in the prompt),
+    # "json_schema" (structured output) or "tools" (native function calling)
+    decision_mode: Literal["prompt", "json_schema", "tools"] = "prompt"
+    # Start read-only tool calls while the decision is still streaming
+    speculative_tools: bool = True
+    # Start read-only tools whose arguments are in the task context
+    # (BaseTool.prefetch_context) before the first LLM call
+    context_prefetch: bool = True
+    # Seconds the first LLM call waits for prefetched results to include them
+    # in its prompt; slower ones are handed in with the first tool results
+    context_prefetch_wait_seconds: float = 0.1
+
+    # Prompt token budget per model (system prompt + conversation); older
+    # observations are truncated, then elided, to stay under it
+    model_token_budgets: dict[str, int] = {
+        "gpt-4o-mini": 100_000,
+        "gpt-4o": 100_000,
+        "gpt-4.1-mini": 100_000,
+        "gpt-4.1": 100_000,
+    }
+    default_token_budget: int = 16_000  # Models not listed above
+    observation_keep_recent: int = 1  # Latest turns compacted only as a last resort
+    observation_max_string_chars: int = 500  # Longest string kept when truncating
+    observation_max_list_items: int = 10  # Longest list kept when truncating
+
+    # USD per million (input, output) tokens, for cost estimates
+    model_prices: dict[str, tuple[float, float]] = {
+        "gpt-4o-mini": (0.15, 0.60),
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4.1-mini": (0.40, 1.60),
+        "gpt-4.1": (2.00, 8.00),
+    }
+    # Add per-iteration timings and token usage to AgentResponse.data
+    task_usage_in_response: bool = False
+
+    # Tracing (see app/tracing.py): "none", "memory" or "file" (JSON lines)
+    trace_exporter: Literal["none", "memory", "file"] = "none"
+    trace_file_path: str = "traces.jsonl"
+    trace_sample_rate: float = 1.0  # Share of new traces recorded
+
+    # Per-request profiling (see app/profiling.py), requested with
+    # ?profile=true or an "X-Profile: 1" header on POST /tasks
+    profiling_enabled: bool = False
+    profile_dir: str = "profiles"
+    profile_format: Literal["collapsed", "speedscope"] = "speedscope"
+    profile_max_files: int = 20  # Oldest profiles beyond this are deleted
+
+    # Hedged LLM calls (see app/agents/hedging.py): a second identical call
+    # when the first is slower than the percentile of recent latencies
+    llm_timeout_seconds: float | None = 60.0  # Deadline per call, hedges included
+    llm_hedging: bool = True
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_delay_ms: float = 50.0  # Never hedge sooner than this
+    llm_hedge_max_rate: float = 0.1  # Share of calls that may be hedged
+    llm_hedge_window: int = 200  # Recent latencies the percentile is taken over
+
+    # Client-side LLM rate limits (see app/agents/rate_limit.py); calls over
+    # a limit wait their turn. Per-model (requests, tokens) per minute
+    # overrides, None for no limit
+    llm_requests_per_minute: int | None = None
+    llm_tokens_per_minute: int | None = None
+    model_rate_limits: dict[str, tuple[int | None, int | None]] = {}
+    llm_expected_output_tokens: int = 256  # Reserved per call, settled after
+
+    # HTTP connection pool shared by the OpenAI clients
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30.0
+
+    # LLM circuit breaker and retries, per model (overrides) or default
+    llm_resilience: ResilienceSettings = ResilienceSettings()
+    model_resilience: dict[str, ResilienceSettings] = {}
+
+    # Scripted backend (see app/agents/llm.py)
+    scripted_rules_path: str | None = None  # JSON rules; built-in rules if unset
+    scripted_latency_ms: float = 0.0
+    scripted_latency_jitter_ms: float = 0.0
+    scripted_error_rate: float = 0.0  # Probability a call raises
+    scripted_seed: int | None = None  # Reproducible latency/failure sequence
+
+    # Decision cache (only used when the agent runs at temperature 0)
+    decision_cache_enabled: bool = True
+    decision_cache_max_entries: int = 1024
+    decision_cache_ttl_seconds: float = 300.0
+    decision_cache_sqlite_path: str | None = None  # Share hits across workers
+
+    # POST /tasks/batch
+    batch_max_tasks: int = 1000
+    batch_default_concurrency: int = 8
+    batch_max_concurrency: int = 64
+
+    # Adaptive admission control on POST /tasks (see app/admission.py)
+    admission_control: bool = True
+    admission_initial_limit: int = 64  # Concurrent tasks
+    admission_min_limit: int = 4
+    admission_max_limit: int = 1000
+    admission_max_queue: int = 100  # Waiting requests; more get 429
+    admission_queue_timeout_seconds: float = 5.0  # Longer waits get 429
+    admission_latency_tolerance: float = 2.0  # x baseline latency = congestion
+
+    # Job queue (POST /jobs)
+    job_workers: int = 4  # Concurrent jobs per process
+    job_store: Literal["memory", "sqlite"] = "memory"
+    job_sqlite_path: str = "jobs.db"
+    job_owner_id: str | None = None  # This process in the store; host:pid if unset
+    job_lease_seconds: float = 60.0  # Running jobs of dead processes are retried
+    job_retention_seconds: float = 3600.0  # Finished jobs kept (memory store)
+    job_max_finished: int = 10_000  # At most this many finished jobs (memory store)
+
+    @model_validator(mode="after")
+    def _require_api_key(self) -> "Settings":
+        if self.llm_backend == "openai" and self.openai_api_key is None:
+            raise ValueError("OPENAI_API_KEY is required when LLM_BACKEND=openai")
+        return self
 
 
 settings = Settings()  # type: ignore[call-arg]
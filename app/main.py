@@ -1,17 +1,73 @@
-from fastapi import FastAPI
+import json
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from app.admission import Overloaded, admission
+from app.agents.dispatcher import (
+    breaker_stats_by_tool,
+    prefetch_stats,
+    result_cache_stats,
+    speculation_stats,
+)
+from app.agents.llm import http_pool_stats
+from app.agents.usage import usage_stats
 from app.config import settings
-from app.schemas.task import TaskRequest, TaskResponse
-from app.services.task_service import MAX_ITERATIONS, process_task
+from app.metrics import CONTENT_TYPE
+from app.metrics import registry as metrics_registry
+from app.profiling import run_profiled
+from app.schemas.task import (
+    BatchItemResult,
+    BatchTaskRequest,
+    BatchTaskResponse,
+    Job,
+    JobSubmitResponse,
+    TaskEvent,
+    TaskRequest,
+    TaskResponse,
+)
+from app.services.batch_service import iter_batch, process_batch
+from app.services.job_service import job_queue
+from app.services.task_service import (
+    MAX_ITERATIONS,
+    get_agent,
+    process_task,
+    stream_task_events,
+)
 from app.tools import registry
+from app.tracing import tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background job workers for the lifetime of the app."""
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+
 
 app = FastAPI(
     title="Autonomous Task Agent",
     description="Agent with reasoning and tool execution capabilities",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded) -> JSONResponse:
+    """Reject fast with 429 and a Retry-After hint instead of queueing."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.get("/health")
 def health_check():
     """Basic health check endpoint."""
@@ -21,22 +77,174 @@ def health_check():
 @app.get("/status")
 def status():
     """Detailed status endpoint with agent configuration."""
+    agent = get_agent()
+    decision_cache = agent.decision_cache
     return {
         "status": "ok",
         "agent": {
+            "backend": settings.llm_backend,
             "model": settings.openai_model,
             "max_iterations": MAX_ITERATIONS,
+            "decision_mode": agent.decision_mode,
+            "parse": agent.parse_stats_summary(),
+            "parse_repairs": dict(agent.repair_counts),
+            "token_budget": agent.token_budget.stats(),
+            "breaker": agent.breaker.stats(),
+            "hedging": agent.hedger.stats(),
+            "rate_limit": agent.rate_limiter.stats(),
+            "http_pool": http_pool_stats(),
+            "usage": usage_stats(),
+            "decision_cache": decision_cache.stats()
+            if decision_cache is not None
+            else {"enabled": False},
         },
         "tools": {
             "available": registry.tool_names,
             "count": len(registry.tool_names),
+            "cache": result_cache_stats(),
+            "speculation": speculation_stats(),
+            "prefetch": prefetch_stats(),
+            "breakers": breaker_stats_by_tool(),
         },
+        "jobs": job_queue.stats(),
+        "admission": admission.stats(),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Agent loop metrics in Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.post("/tasks", response_model=TaskResponse)
-def run_task(payload: TaskRequest):
-    """Process a task through the autonomous agent."""
+async def run_task(
+    payload: TaskRequest,
+    response: Response,
+    profile: bool = False,
+    x_profile: str | None = Header(default=None),
+    traceparent: str | None = Header(default=None),
+):
+    """Process a task through the autonomous agent.
+
+    A W3C `traceparent` header is continued as the parent of the task's
+    spans; the response's `traceparent` identifies this request's span.
+
+    With PROFILING_ENABLED, `?profile=true` or an `X-Profile: 1` header
+    profiles this request; the file name is returned in `X-Profile-File`.
+
+    Admission control may queue the request briefly, or reject it with 429
+    and `Retry-After` when the server is at its concurrency limit.
+    """
     task_input = payload.to_task_input()
-    agent_response = process_task(task_input)
+    profiled = settings.profiling_enabled and (profile or _truthy(x_profile))
+    with tracer.start_span("run_task", traceparent=traceparent) as span:
+        if profiled:
+            agent_response, path = await run_profiled(
+                process_task(task_input), f"run_task: {task_input.task[:80]}"
+            )
+            if path is not None:
+                response.headers["X-Profile-File"] = os.path.basename(path)
+        else:
+            agent_response = await process_task(task_input)
+        span.set_attribute("status", agent_response.status.value)
+    if span.recording:
+        response.headers["traceparent"] = span.traceparent
     return TaskResponse.from_agent_response(agent_response)
+
+
+def _truthy(value: str | None) -> bool:
+    return value is not None and value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@app.post("/tasks/stream")
+async def stream_task(payload: TaskRequest, tokens: bool = False):
+    """Process a task and stream its progress as Server-Sent Events.
+
+    Emits `iteration`, `decision`, `tool_call`, `observation` and a final
+    `result` event (the TaskResponse). With `?tokens=true`, LLM output is
+    also forwarded as `token` events. Disconnecting cancels the task.
+
+    The task is admitted before the stream starts, so an overloaded server
+    still answers 429 with `Retry-After`.
+    """
+    events = stream_task_events(payload.to_task_input(), stream_tokens=tokens)
+    first = await anext(events)  # Raises Overloaded if not admitted
+    return StreamingResponse(
+        _sse(first, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse(
+    first: TaskEvent, events: AsyncIterator[TaskEvent]
+) -> AsyncIterator[str]:
+    """Serialize task events in Server-Sent Events wire format."""
+    yield _sse_event(first)
+    async for event in events:
+        yield _sse_event(event)
+
+
+def _sse_event(event: TaskEvent) -> str:
+    data = json.dumps(event.data, default=str)
+    return f"event: {event.event.value}\ndata: {data}\n\n"
+
+
+@app.post("/tasks/batch", response_model=BatchTaskResponse)
+async def run_task_batch(payload: BatchTaskRequest):
+    """Process a batch of tasks with bounded concurrency.
+
+    Returns every result in input order, or streams them as NDJSON lines in
+    completion order when `stream` is set. A failed task never fails the
+    batch; its item carries a FAILED response or an error instead.
+    """
+    if len(payload.tasks) > settings.batch_max_tasks:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(payload.tasks)} tasks "
+            f"(max {settings.batch_max_tasks})",
+        )
+
+    concurrency = min(
+        payload.concurrency or settings.batch_default_concurrency,
+        settings.batch_max_concurrency,
+    )
+    task_inputs = [task.to_task_input() for task in payload.tasks]
+
+    if payload.stream:
+        return StreamingResponse(
+            _ndjson(iter_batch(task_inputs, concurrency)),
+            media_type="application/x-ndjson",
+        )
+
+    start = time.perf_counter()
+    results = await process_batch(task_inputs, concurrency)
+    return BatchTaskResponse(
+        results=results,
+        duration_ms=(time.perf_counter() - start) * 1000,
+    )
+
+
+async def _ndjson(results: AsyncIterator[BatchItemResult]) -> AsyncIterator[str]:
+    """Serialize batch results as newline-delimited JSON."""
+    async for result in results:
+        yield result.model_dump_json() + "\n"
+
+
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(payload: TaskRequest):
+    """Queue a task for background processing and return its job id."""
+    if not job_queue.started:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    job = await job_queue.submit(payload)
+    return JobSubmitResponse(job_id=job.job_id, status=job.status)
+
+
+@app.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """Return a job's status and, once finished, its result."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
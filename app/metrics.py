@@ -0,0 +1,292 @@
+"""In-process metrics, exposed in Prometheus text format on /metrics.
+
+Deliberately minimal instead of a client library: an observation is a
+dict lookup for the label values plus a `bisect` into the bucket bounds,
+well under a microsecond. Label children are created on first use; call
+`labels(...)` once and keep the child on hot paths that reuse the same
+labels. Each child has its own lock, since updates also come from worker
+threads (e.g. the rate limiter and hedger under a sync `reason`); an
+uncontended acquire adds well under a microsecond more.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import TypeVar
+
+# Seconds; LLM calls dominate, so the buckets reach well past a minute
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)  # fmt: skip
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric(ABC):
+    """Common naming, labels and rendering of one metric family."""
+
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self) -> object:
+        """A fresh child holding the values of one label combination."""
+
+    def labels(self, *values: str):
+        """The child for these label values, in `labelnames` order."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_text(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    @abstractmethod
+    def _render_child(self, values: tuple[str, ...], child: object) -> list[str]:
+        """Exposition lines of one child."""
+
+
+class _Value:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic count. Names should end in `_total`."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabeled counter."""
+        self.labels().inc(amount)
+
+    def _render_child(self, values: tuple[str, ...], child: object) -> list[str]:
+        assert isinstance(child, _Value)
+        return [f"{self.name}{self._label_text(values)} {_number(child.value)}"]
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. tasks in flight."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabeled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabeled gauge."""
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_lock", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._bounds = bounds
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(bounds) + 1)  # Per bucket, last is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        """Bucket counts and sum, consistent with each other."""
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(_Metric):
+    """Distribution over fixed buckets (upper bounds, inclusive)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observe a value on the unlabeled histogram."""
+        self.labels().observe(value)
+
+    def _render_child(self, values: tuple[str, ...], child: object) -> list[str]:
+        assert isinstance(child, _HistogramChild)
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), counts):
+            cumulative += count
+            le = bound if isinstance(bound, str) else _number(bound)
+            labels = self._label_text(values, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = self._label_text(values)
+        lines.append(f"{self.name}_sum{labels} {_number(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """Metric families in registration order."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+# =============================================================================
+# Agent metrics
+# =============================================================================
+
+registry = MetricsRegistry()
+
+TASK_DURATION = registry.register(
+    Histogram(
+        "agent_task_duration_seconds",
+        "End-to-end task latency by response status.",
+        ["status"],
+    )
+)
+TASKS = registry.register(
+    Counter("agent_tasks_total", "Finished tasks by response status.", ["status"])
+)
+TASKS_IN_FLIGHT = registry.register(
+    Gauge("agent_tasks_in_flight", "Tasks currently in the observation loop.")
+)
+ADMISSION_LIMIT = registry.register(
+    Gauge("agent_admission_limit", "Current adaptive concurrency limit on /tasks.")
+)
+ADMISSION_QUEUED = registry.register(
+    Gauge("agent_admission_queue_depth", "Requests waiting for a /tasks slot.")
+)
+ADMISSION_REJECTED = registry.register(
+    Counter(
+        "agent_admission_rejected_total",
+        "Requests rejected with 429 by reason (queue_full, queue_timeout).",
+        ["reason"],
+    )
+)
+TASK_ITERATIONS = registry.register(
+    Histogram(
+        "agent_task_iterations",
+        "Observation loop iterations per task.",
+        buckets=(1, 2, 3, 4, 5, 10),
+    )
+)
+MAX_ITERATIONS_EXHAUSTED = registry.register(
+    Counter(
+        "agent_max_iterations_exhausted_total",
+        "Tasks stopped by MAX_ITERATIONS.",
+    )
+)
+LLM_LATENCY = registry.register(
+    Histogram(
+        "agent_llm_iteration_duration_seconds",
+        "LLM time per loop iteration, parse retries included (cache hits excluded).",
+    )
+)
+LLM_RATE_LIMIT_WAIT = registry.register(
+    Histogram(
+        "agent_llm_rate_limit_wait_seconds",
+        "Time LLM calls waited for the client-side rate limiter (waits only).",
+    )
+)
+LLM_RATE_LIMIT_WAITING = registry.register(
+    Gauge(
+        "agent_llm_rate_limit_waiting",
+        "LLM calls currently waiting for the client-side rate limiter.",
+    )
+)
+PARSE_RETRIES = registry.register(
+    Counter("agent_parse_retries_total", "LLM calls repeated for unparseable output.")
+)
+PARSE_FAILURES = registry.register(
+    Counter(
+        "agent_parse_failures_total", "Decisions that failed after every parse retry."
+    )
+)
+TOOL_DURATION = registry.register(
+    Histogram(
+        "agent_tool_duration_seconds",
+        "Tool execution latency in dispatch_tool, cache hits included.",
+        ["tool", "success"],
+    )
+)
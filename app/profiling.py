@@ -0,0 +1,206 @@
+"""On-demand profiling of a single request.
+
+`run_profiled` drives a coroutine and switches a deterministic profiler on
+only while that coroutine is running, so other requests interleaved on
+the same event loop don't show up in its profile. The profiler records
+every Python and C call with its full stack, including Pydantic
+validation, prompt building and JSON handling, and writes either:
+
+- "collapsed": one `frame;frame;frame <microseconds>` line per stack
+  (flamegraph.pl, inferno, speedscope)
+- "speedscope": a speedscope.app JSON file
+
+Work in tasks the coroutine starts (concurrent tool calls, speculative
+and prefetched calls) runs outside it and shows up only as the time spent
+awaiting them. Profiling slows the request down several times over, which
+is why it is opt-in per request and gated by `settings.profiling_enabled`.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Coroutine, Generator
+from functools import partial
+from types import FrameType
+from typing import Any, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROFILE_PREFIX = "profile-"
+EXTENSIONS = {"collapsed": ".collapsed.txt", "speedscope": ".speedscope.json"}
+
+
+class StackProfiler:
+    """Self time per call stack, from `sys.setprofile` events."""
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = defaultdict(float)  # Stack -> seconds
+        self._stack: list[str] = []
+        self._last = 0.0
+
+    def start(self) -> Callable[[], None]:
+        """Start recording; returns the function that stops it.
+
+        The stop function is a C callable so that stopping doesn't show up
+        as a Python frame in the profile.
+        """
+        self._stack.clear()
+        stop = partial(sys.setprofile, sys.getprofile())
+        self._last = time.perf_counter()
+        sys.setprofile(self._on_event)
+        return stop
+
+    def _on_event(self, frame: FrameType, event: str, arg: Any) -> None:
+        now = time.perf_counter()
+        stack = self._stack
+        if stack:
+            self.totals[stack[-1]] += now - self._last
+        if event == "call":
+            name = _frame_name(frame)
+        elif event == "c_call":
+            if not stack:
+                # The driver's own calls (coroutine.send, setprofile)
+                return
+            name = _c_function_name(arg)
+        else:
+            # Returns of frames entered before recording started are ignored
+            if stack:
+                stack.pop()
+            self._last = time.perf_counter()
+            return
+        stack.append(f"{stack[-1]};{name}" if stack else name)
+        self._last = time.perf_counter()
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, weights in microseconds."""
+        return "".join(
+            f"{stack} {round(seconds * 1e6)}\n"
+            for stack, seconds in sorted(self.totals.items())
+            if seconds >= 5e-7
+        )
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """The profile as a speedscope "sampled" profile, one sample per stack."""
+        frames: dict[str, int] = {}
+        samples: list[list[int]] = []
+        weights: list[float] = []
+        for stack, seconds in sorted(self.totals.items()):
+            samples.append(
+                [frames.setdefault(frame, len(frames)) for frame in stack.split(";")]
+            )
+            weights.append(round(seconds * 1e6, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "autonomous-task-agent",
+            "shared": {"frames": [{"name": frame} for frame in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "microseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+def _frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}"
+
+
+def _c_function_name(function: Any) -> str:
+    module = getattr(function, "__module__", None)
+    if module is None:
+        # Methods of C types: qualname already includes the type
+        module = type(getattr(function, "__self__", None)).__module__
+    return f"{module}.{getattr(function, '__qualname__', repr(function))}"
+
+
+class _Profiled:
+    """Awaitable that runs `coro` with `profiler` on during each of its steps."""
+
+    def __init__(self, coro: Coroutine[Any, Any, Any], profiler: StackProfiler):
+        self._coro = coro
+        self._profiler = profiler
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            stop = self._profiler.start()
+            try:
+                if error is not None:
+                    future = self._coro.throw(error)
+                else:
+                    future = self._coro.send(value)
+            except StopIteration as finished:
+                return finished.value
+            finally:
+                stop()
+            try:
+                value, error = (yield future), None
+            except BaseException as e:  # Cancellation, forwarded to the coroutine
+                value, error = None, e
+
+
+async def run_profiled(
+    coro: Coroutine[Any, Any, T], label: str
+) -> tuple[T, str | None]:
+    """Await `coro` under the profiler and save the profile.
+
+    Returns:
+        The coroutine's result and the saved profile's path (None if saving
+        failed; profiling never fails the request)
+    """
+    profiler = StackProfiler()
+    try:
+        result = await _Profiled(coro, profiler)
+    finally:
+        path = save_profile(profiler, label)
+    return result, path
+
+
+def save_profile(profiler: StackProfiler, label: str) -> str | None:
+    """Write a profile in `settings.profile_format` and apply the retention cap."""
+    fmt = settings.profile_format
+    name = f"{PROFILE_PREFIX}{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(settings.profile_dir, name + EXTENSIONS[fmt])
+    try:
+        os.makedirs(settings.profile_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "speedscope":
+                json.dump(profiler.speedscope(label), f)
+            else:
+                f.write(profiler.collapsed())
+        _prune(settings.profile_dir, settings.profile_max_files)
+    except OSError as e:
+        logger.warning("profile.save.failed", extra={"error": str(e)})
+        return None
+
+    logger.info("profile.saved", extra={"path": path, "label": label})
+    return path
+
+
+def _prune(directory: str, keep: int) -> None:
+    """Delete the oldest profiles beyond `keep`."""
+    profiles = [
+        entry
+        for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.startswith(PROFILE_PREFIX)
+    ]
+    profiles.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in profiles[keep:]:
+        os.remove(entry.path)
@@ -0,0 +1,309 @@
+"""Circuit breakers and jittered exponential backoff.
+
+A CircuitBreaker guards one dependency (a tool, or the LLM for a model):
+
+- closed: calls go through; `failure_threshold` consecutive failures open it
+- open: calls fail fast with CircuitOpenError for `recovery_seconds`
+- half-open: after that, up to `half_open_max_calls` trial calls go
+  through; a success closes the breaker, a failure opens it again
+
+`call_with_resilience` combines a breaker with a BackoffPolicy: failed
+calls are retried after a "full jitter" exponential delay, or after the
+dependency's retry-after hint when it sent one. A hint only sets that
+retry's delay; the failure counts towards the threshold like any other.
+Exceptions are failures, and so are returned results the caller's
+`is_failure` rejects (e.g. a ToolResult flagged transient); those are
+returned as they are rather than retried.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Literal, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+# Breakers by key ("tool:<name>", "llm:<model>"), created on first use
+_breakers: dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """Retries with full-jitter exponential backoff.
+
+    The n-th retry waits a random time in [0, min(max_delay, base_delay *
+    multiplier ** (n - 1))]. A retry-after hint replaces the random delay;
+    hints longer than `max_delay` are not waited for (the call fails).
+    """
+
+    max_retries: int = 2
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    multiplier: float = 2.0
+
+    def delay(self, retry: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait before the given retry (1-based), None to give up."""
+        if retry > self.max_retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one dependency."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        self._state: BreakerState = "closed"
+        self._failures = 0  # Consecutive
+        self._open_until = 0.0
+        self._half_open_calls = 0
+
+        self.opened = 0  # Times the breaker opened
+        self.rejected = 0  # Calls failed fast
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == "open" and self._clock() >= self._open_until:
+            self._state = "half_open"
+            self._half_open_calls = 0
+        return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a call through again."""
+        return max(0.0, self._open_until - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (counts half-open trial calls)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """Return a half-open trial slot whose call ended without an outcome."""
+        if self._state == "half_open" and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        if self._state != "closed":
+            logger.info("breaker.closed", extra={"breaker": self.name})
+        self._state = "closed"
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failure; opens the breaker at the threshold or when half-open."""
+        self._failures += 1
+        if self._state == "half_open" or self._failures >= self.failure_threshold:
+            self._open(self.recovery_seconds)
+
+    def _open(self, seconds: float) -> None:
+        self._open_until = max(self._open_until, self._clock() + seconds)
+        if self._state != "open":
+            self.opened += 1
+            logger.warning(
+                "breaker.opened",
+                extra={"breaker": self.name, "seconds": round(seconds, 3)},
+            )
+        self._state = "open"
+
+    def stats(self) -> dict[str, Any]:
+        """State and counters, for status reporting."""
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_in(), 3) if state == "open" else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+def get_breaker(
+    key: str, failure_threshold: int, recovery_seconds: float
+) -> CircuitBreaker:
+    """The shared breaker for `key`, created with these settings on first use."""
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(key, failure_threshold, recovery_seconds)
+        _breakers[key] = breaker
+    return breaker
+
+
+def breaker_stats(prefix: str = "") -> dict[str, dict[str, Any]]:
+    """Stats of every breaker whose key starts with `prefix` (prefix removed)."""
+    return {
+        key[len(prefix) :]: breaker.stats()
+        for key, breaker in _breakers.items()
+        if key.startswith(prefix)
+    }
+
+
+def retry_after_hint(error: BaseException) -> float | None:
+    """Seconds a rate-limited dependency asked us to wait, if it said.
+
+    Reads a `retry_after` attribute, or the `retry-after-ms` / `retry-after`
+    headers of an HTTP error response (as raised by the OpenAI client).
+    """
+    value = getattr(error, "retry_after", None)
+    if isinstance(value, int | float):
+        return float(value)
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        if (ms := headers.get("retry-after-ms")) is not None:
+            return float(ms) / 1000
+        if (seconds := headers.get("retry-after")) is not None:
+            return float(seconds)
+    except (TypeError, ValueError):
+        return None  # HTTP-date form: fall back to the policy's backoff
+    return None
+
+
+async def call_with_resilience(
+    breaker: CircuitBreaker | None,
+    policy: BackoffPolicy | None,
+    call: Callable[[], Awaitable[T]],
+    ignore: tuple[type[Exception], ...] = (),
+    is_failure: Callable[[T], bool] | None = None,
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+) -> T:
+    """Run `call` through the breaker, retrying failures per `policy`.
+
+    Exceptions of the `ignore` types are raised as is and, since the
+    dependency did answer, don't count as failures. A result for which
+    `is_failure` returns True counts as a failure but is returned as is.
+
+    Raises:
+        CircuitOpenError: If the breaker is open (before or between retries)
+        Exception: The last failure, once retries are used up
+    """
+    retry = 0
+    while True:
+        _check(breaker)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # Not an outcome: give a half-open trial slot back
+            if breaker is not None:
+                breaker.release()
+            raise
+        except ignore:
+            _succeeded(breaker)
+            raise
+        except Exception as e:
+            retry += 1
+            await sleep(_failed(breaker, policy, retry, e))
+            continue
+        _returned(breaker, result, is_failure)
+        return result
+
+
+def call_with_resilience_sync(
+    breaker: CircuitBreaker | None,
+    policy: BackoffPolicy | None,
+    call: Callable[[], T],
+    ignore: tuple[type[Exception], ...] = (),
+    is_failure: Callable[[T], bool] | None = None,
+    sleep: Callable[[float], Any] = time.sleep,
+) -> T:
+    """Blocking variant of `call_with_resilience`."""
+    retry = 0
+    while True:
+        _check(breaker)
+        try:
+            result = call()
+        except ignore:
+            _succeeded(breaker)
+            raise
+        except Exception as e:
+            retry += 1
+            sleep(_failed(breaker, policy, retry, e))
+            continue
+        _returned(breaker, result, is_failure)
+        return result
+
+
+def _check(breaker: CircuitBreaker | None) -> None:
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(breaker.name, breaker.retry_in())
+
+
+def _succeeded(breaker: CircuitBreaker | None) -> None:
+    if breaker is not None:
+        breaker.record_success()
+
+
+def _returned(
+    breaker: CircuitBreaker | None,
+    result: T,
+    is_failure: Callable[[T], bool] | None,
+) -> None:
+    if breaker is None:
+        return
+    if is_failure is not None and is_failure(result):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _failed(
+    breaker: CircuitBreaker | None,
+    policy: BackoffPolicy | None,
+    retry: int,
+    error: Exception,
+) -> float:
+    """Record a failure; the delay before retrying, or re-raise `error`."""
+    if breaker is not None:
+        breaker.record_failure()
+    hint = retry_after_hint(error)
+    delay = policy.delay(retry, hint) if policy is not None else None
+    if delay is None:
+        raise error
+    logger.warning(
+        "resilience.retry",
+        extra={
+            "breaker": breaker.name if breaker is not None else None,
+            "retry": retry,
+            "delay": round(delay, 3),
+            "error": str(error),
+        },
+    )
+    return delay
@@ -62,11 +62,26 @@ class AgentDecision(BaseModel):
         default=None,
         description="Tool call details (required if decision_type is USE_TOOL)",
     )
+    tool_calls: list[ToolCall] = Field(
+        default_factory=list,
+        description="Several tool calls to run in one step (alternative to tool_call)",
+    )
     message: str | None = Field(
         default=None,
         description="Message content (for RESPOND, CLARIFY, or ESCALATE decisions)",
     )
 
+    @property
+    def requested_tool_calls(self) -> list[ToolCall]:
+        """All tool calls in this decision, whichever field they came in.
+
+        If both are set, `tool_call` comes first, unless `tool_calls`
+        repeats it.
+        """
+        if self.tool_call is None or self.tool_call in self.tool_calls:
+            return self.tool_calls
+        return [self.tool_call, *self.tool_calls]
+
 
 # =============================================================================
 # Observation Schema (M5)
@@ -88,6 +103,29 @@ class Observation(BaseModel):
     error: str | None = Field(default=None, description="Error message (if failed)")
 
 
+# =============================================================================
+# Task Event Schema
+# =============================================================================
+
+
+class TaskEventType(str, Enum):
+    """Progress events emitted while a task runs."""
+
+    ITERATION = "iteration"  # A new observation-loop iteration started
+    TOKEN = "token"  # A chunk of LLM output arrived
+    DECISION = "decision"  # The agent produced a decision
+    TOOL_CALL = "tool_call"  # A tool call is being dispatched
+    OBSERVATION = "observation"  # A tool call finished
+    RESULT = "result"  # The final TaskResponse
+
+
+class TaskEvent(BaseModel):
+    """A single progress event for a running task."""
+
+    event: TaskEventType = Field(..., description="Type of event")
+    data: dict[str, Any] = Field(default_factory=dict, description="Event payload")
+
+
 # =============================================================================
 # Agent Response Schema
 # =============================================================================
@@ -113,6 +151,12 @@ class AgentResponse(BaseModel):
     data: dict[str, Any] | None = Field(
         default=None, description="Structured data from tool execution (if any)"
     )
+    provider_error: bool = Field(
+        default=False,
+        exclude=True,
+        description="Failed because the LLM provider did (timeout, 429/5xx, "
+        "open breaker); internal, used as a congestion signal",
+    )
 
 
 # =============================================================================
@@ -146,3 +190,81 @@ class TaskResponse(BaseModel):
             message=response.message,
             data=response.data,
         )
+
+
+# =============================================================================
+# Batch API Models
+# =============================================================================
+
+
+class BatchTaskRequest(BaseModel):
+    """API request model for the /tasks/batch endpoint."""
+
+    tasks: list[TaskRequest] = Field(..., min_length=1, description="Tasks to process")
+    concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Max tasks processed at once (capped by the server limit)",
+    )
+    stream: bool = Field(
+        default=False,
+        description="Stream results as NDJSON in completion order instead of "
+        "returning them all at once in input order",
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one task in a batch."""
+
+    index: int = Field(..., description="Position of the task in the request")
+    response: TaskResponse | None = Field(
+        default=None, description="Task response (if processing completed)"
+    )
+    error: str | None = Field(
+        default=None, description="Error message (if processing raised)"
+    )
+    queued_ms: float = Field(..., description="Time spent waiting for a slot")
+    duration_ms: float = Field(..., description="Time spent processing the task")
+
+
+class BatchTaskResponse(BaseModel):
+    """API response model for the /tasks/batch endpoint."""
+
+    results: list[BatchItemResult] = Field(..., description="Results in input order")
+    duration_ms: float = Field(..., description="Wall time for the whole batch")
+
+
+# =============================================================================
+# Job Queue Models
+# =============================================================================
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of an asynchronous job."""
+
+    QUEUED = "queued"  # Waiting for a worker
+    RUNNING = "running"  # A worker is processing the task
+    COMPLETED = "completed"  # Finished; see result (which may itself be FAILED)
+    FAILED = "failed"  # Processing raised before producing a result
+
+
+class Job(BaseModel):
+    """A task submitted to the job queue, with its outcome once finished."""
+
+    job_id: str = Field(..., description="Unique job identifier")
+    status: JobStatus = Field(..., description="Current job status")
+    task: TaskRequest = Field(..., description="The submitted task")
+    result: TaskResponse | None = Field(
+        default=None, description="Task response (when completed)"
+    )
+    error: str | None = Field(default=None, description="Error (when failed)")
+    created_at: float = Field(..., description="Submission time (unix seconds)")
+    started_at: float | None = Field(default=None, description="Start time")
+    finished_at: float | None = Field(default=None, description="Finish time")
+
+
+class JobSubmitResponse(BaseModel):
+    """API response model for POST /jobs."""
+
+    job_id: str = Field(..., description="Identifier to poll with GET /jobs/{id}")
+    status: JobStatus = Field(..., description="Initial job status")
@@ -0,0 +1,74 @@
+"""Batch processing - runs many tasks through the observation loop."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import cast
+
+from app.schemas.task import BatchItemResult, TaskInput, TaskResponse
+from app.services.task_service import process_task
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_batch(
+    task_inputs: list[TaskInput],
+    concurrency: int,
+) -> AsyncIterator[BatchItemResult]:
+    """Process tasks with at most `concurrency` in flight, yielding as each ends.
+
+    A failing task yields a result with `error` set; it never aborts the
+    batch. If the consumer stops iterating (e.g. a streaming client
+    disconnects), tasks still pending are cancelled.
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, task_input: TaskInput) -> BatchItemResult:
+        enqueued = time.perf_counter()
+        async with slots:
+            started = time.perf_counter()
+            queued_ms = (started - enqueued) * 1000
+            try:
+                agent_response = await process_task(task_input, wait_for_admission=True)
+                return BatchItemResult(
+                    index=index,
+                    response=TaskResponse.from_agent_response(agent_response),
+                    queued_ms=queued_ms,
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                )
+            except Exception as e:
+                logger.exception("batch.item.error", extra={"index": index})
+                return BatchItemResult(
+                    index=index,
+                    error=str(e),
+                    queued_ms=queued_ms,
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                )
+
+    logger.info(
+        "batch.start",
+        extra={"tasks": len(task_inputs), "concurrency": concurrency},
+    )
+
+    pending = [
+        asyncio.ensure_future(run_one(index, task_input))
+        for index, task_input in enumerate(task_inputs)
+    ]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def process_batch(
+    task_inputs: list[TaskInput],
+    concurrency: int,
+) -> list[BatchItemResult]:
+    """Process tasks with bounded concurrency and return results in input order."""
+    results: list[BatchItemResult | None] = [None] * len(task_inputs)
+    async for result in iter_batch(task_inputs, concurrency):
+        results[result.index] = result
+    return cast(list[BatchItemResult], results)
@@ -0,0 +1,238 @@
+"""Asynchronous job queue - submit now, poll for the result later."""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from typing import Any
+
+from app.config import settings
+from app.schemas.task import Job, JobStatus, TaskRequest, TaskResponse
+from app.services.job_store import JobStore, build_job_store
+from app.services.task_service import process_task
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+WAIT_TIME_WINDOW = 1000  # Recent jobs used for wait-time statistics
+
+
+class JobQueue:
+    """Runs submitted tasks on a pool of background workers.
+
+    Jobs are persisted in a JobStore before being queued, and a worker
+    claims a job in the store before running it, so a job runs once even if
+    it is queued twice or several processes share the store. While a job
+    runs its lease is renewed every third of `lease_seconds`. On start, and
+    then every `lease_seconds`, jobs the store still has as queued, or as
+    running under an expired lease (e.g. from before a restart), are
+    queued again. Store calls run in a thread, off the event loop.
+
+    Args:
+        store: Where jobs are persisted
+        workers: Jobs run concurrently
+        owner: This process's id in the store; defaults to host and pid
+        lease_seconds: How long a claim lasts without being renewed
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int,
+        owner: str | None = None,
+        lease_seconds: float = 60.0,
+    ):
+        self.store = store
+        self.workers = workers
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._queue: asyncio.Queue[str] | None = None
+        self._queued: set[str] = set()  # Job ids in the queue
+        self._tasks: list[asyncio.Task[None]] = []
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._recovered = 0
+        self._lost = 0  # Claims taken by another worker, or results discarded
+        self._errors = 0  # Store calls that raised (e.g. database locked)
+        self._wait_ms: deque[float] = deque(maxlen=WAIT_TIME_WINDOW)
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """Start the workers and re-queue unfinished jobs."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._queued.clear()
+
+        # Running jobs of this owner are from before a restart
+        queued = await self._requeue(self.owner)
+
+        self._tasks = [
+            asyncio.create_task(self._worker(self._queue), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._recoverer(), name="job-recoverer"))
+        logger.info(
+            "jobs.start",
+            extra={"workers": self.workers, "owner": self.owner, "queued": queued},
+        )
+
+    async def stop(self) -> None:
+        """Cancel the workers.
+
+        Unfinished jobs stay in the store; a job interrupted mid-run is left
+        RUNNING and is queued again by the next start(), or by any process
+        once its lease expires.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, request: TaskRequest) -> Job:
+        """Persist and enqueue a task. Returns immediately.
+
+        Raises:
+            RuntimeError: If the queue has not been started
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            task=request,
+            created_at=time.time(),
+        )
+        await asyncio.to_thread(self.store.create, job)
+        self._queued.add(job.job_id)
+        self._queue.put_nowait(job.job_id)
+        logger.info("jobs.submit", extra={"job_id": job.job_id})
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _requeue(self, owner: str | None = None) -> int:
+        """Queue every job the store has as queued; returns how many."""
+        assert self._queue is not None
+        before = len(self._queued)
+        for job in await asyncio.to_thread(self.store.recover, owner):
+            if job.job_id not in self._queued:
+                self._queued.add(job.job_id)
+                self._queue.put_nowait(job.job_id)
+        return len(self._queued) - before
+
+    async def _recoverer(self) -> None:
+        """Pick up jobs whose process died, once their lease has expired."""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                recovered = await self._requeue()
+            except Exception:
+                self._errors += 1
+                logger.exception("jobs.recover.error")
+                continue
+            if recovered:
+                self._recovered += recovered
+                logger.warning("jobs.recovered", extra={"jobs": recovered})
+
+    async def _worker(self, queue: asyncio.Queue[str]) -> None:
+        while True:
+            job_id = await queue.get()
+            self._queued.discard(job_id)
+            # A store error must not end the worker and shrink the pool; the
+            # job is picked up again by recovery once its lease expires
+            try:
+                job = await asyncio.to_thread(
+                    self.store.claim, job_id, self.owner, self.lease_seconds
+                )
+                if job is None:
+                    self._lost += 1  # Finished, or claimed by another worker
+                    continue
+                await self._run(job)
+            except Exception:
+                self._errors += 1
+                logger.exception("jobs.worker.error", extra={"job_id": job_id})
+
+    async def _run(self, job: Job) -> None:
+        assert job.started_at is not None
+        self._wait_ms.append((job.started_at - job.created_at) * 1000)
+        self._running += 1
+        renewer = asyncio.create_task(self._renew_lease(job.job_id))
+
+        try:
+            agent_response = await process_task(
+                job.task.to_task_input(), wait_for_admission=True
+            )
+            job.result = TaskResponse.from_agent_response(agent_response)
+            job.status = JobStatus.COMPLETED
+            self._completed += 1
+        except Exception as e:
+            logger.exception("jobs.error", extra={"job_id": job.job_id})
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            self._failed += 1
+        finally:
+            try:
+                if job.status != JobStatus.RUNNING:  # Not cancelled mid-run
+                    job.finished_at = time.time()
+                    if await asyncio.to_thread(self.store.update, job, self.owner):
+                        logger.info(
+                            "jobs.complete",
+                            extra={"job_id": job.job_id, "status": job.status.value},
+                        )
+                    else:
+                        # Lease lost: the job was recovered, so this result
+                        # must not overwrite the rerun's
+                        self._lost += 1
+                        logger.warning(
+                            "jobs.result_discarded", extra={"job_id": job.job_id}
+                        )
+            finally:
+                renewer.cancel()
+                self._running -= 1
+
+    async def _renew_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(
+                self.store.renew, job_id, self.owner, self.lease_seconds
+            ):
+                logger.warning("jobs.lease_lost", extra={"job_id": job_id})
+                return
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, wait times and counts for status reporting."""
+        waits = sorted(self._wait_ms)
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "recovered": self._recovered,
+            "lost_claims": self._lost,
+            "store_errors": self._errors,
+            "wait_ms": {
+                "avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+        }
+
+
+job_queue = JobQueue(
+    build_job_store(),
+    workers=settings.job_workers,
+    owner=settings.job_owner_id,
+    lease_seconds=settings.job_lease_seconds,
+)
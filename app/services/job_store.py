@@ -0,0 +1,287 @@
+"""Storage backends for the asynchronous job queue.
+
+A worker claims a queued job atomically, so a job is only ever run once,
+even with several processes sharing a SQLite store. The claim records the
+process's owner id and a lease, which the worker renews while the job
+runs. `recover` queues RUNNING jobs again only if their lease expired
+(their process died) or, at start-up, if they carry this process's own
+owner id (it was restarted); jobs other live processes run are left alone.
+A result is only saved while its worker still owns the job, so a worker
+whose lease expired can't overwrite the result of the job's rerun.
+"""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from app.config import settings
+from app.schemas.task import Job, JobStatus
+
+FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+class JobStore(ABC):
+    """Persists jobs and their results. Methods may block; call from a thread."""
+
+    @abstractmethod
+    def create(self, job: Job) -> None:
+        """Store a newly submitted job."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None:
+        """Return a job by id, or None if unknown."""
+
+    @abstractmethod
+    def update(self, job: Job, owner: str) -> bool:
+        """Persist the new status/result of a job `owner` is running.
+
+        Returns:
+            False, writing nothing, if `owner` no longer holds the job (its
+            lease expired and it was recovered, maybe run elsewhere)
+        """
+
+    @abstractmethod
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Job | None:
+        """Move a QUEUED job to RUNNING for `owner`, atomically.
+
+        Returns:
+            The claimed job, or None if it is unknown or no longer queued
+            (e.g. another worker claimed it first)
+        """
+
+    @abstractmethod
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend `owner`'s lease on a running job; False if it lost the job."""
+
+    @abstractmethod
+    def recover(self, owner: str | None = None) -> list[Job]:
+        """Queue again the RUNNING jobs whose lease expired, or of `owner`.
+
+        Args:
+            owner: Also recover this owner's jobs, leased or not; only pass
+                it at start-up, when none of them can still be running
+
+        Returns:
+            Every QUEUED job (recovered or not), oldest first
+        """
+
+
+class MemoryJobStore(JobStore):
+    """In-process store. Jobs are lost when the process exits.
+
+    Finished jobs are kept for `retention_seconds`, and at most
+    `max_finished` of them; older ones are forgotten.
+    """
+
+    def __init__(self, retention_seconds: float = 3600.0, max_finished: int = 10_000):
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._leases: dict[str, tuple[str, float]] = {}  # job_id -> (owner, until)
+        self._finished: OrderedDict[str, float] = OrderedDict()  # job_id -> when
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict()
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def update(self, job: Job, owner: str) -> bool:
+        with self._lock:
+            lease = self._leases.get(job.job_id)
+            current = self._jobs.get(job.job_id)
+            if (
+                lease is None
+                or lease[0] != owner
+                or current is None
+                or current.status != JobStatus.RUNNING
+            ):
+                return False
+            self._jobs[job.job_id] = job.model_copy()
+            if job.status in FINISHED:
+                self._leases.pop(job.job_id, None)
+                self._finished[job.job_id] = time.monotonic()
+                self._finished.move_to_end(job.job_id)
+            self._evict()
+            return True
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Job | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JobStatus.QUEUED:
+                return None
+            job = job.model_copy(
+                update={"status": JobStatus.RUNNING, "started_at": time.time()}
+            )
+            self._jobs[job_id] = job
+            self._leases[job_id] = (owner, time.time() + lease_seconds)
+            return job.model_copy()  # The caller's copy; update() stores it
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock:
+            lease = self._leases.get(job_id)
+            if lease is None or lease[0] != owner:
+                return False
+            self._leases[job_id] = (owner, time.time() + lease_seconds)
+            return True
+
+    def recover(self, owner: str | None = None) -> list[Job]:
+        now = time.time()
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                lease = self._leases.get(job_id)
+                if job.status == JobStatus.RUNNING and (
+                    lease is None or lease[1] < now or lease[0] == owner
+                ):
+                    self._leases.pop(job_id, None)
+                    self._jobs[job_id] = job.model_copy(
+                        update={"status": JobStatus.QUEUED, "started_at": None}
+                    )
+            return sorted(
+                (job for job in self._jobs.values() if job.status == JobStatus.QUEUED),
+                key=lambda job: job.created_at,
+            )
+
+    def _evict(self) -> None:
+        """Forget finished jobs past their retention or over the cap."""
+        expired = time.monotonic() - self.retention_seconds
+        while self._finished:
+            job_id, finished = next(iter(self._finished.items()))
+            if finished >= expired and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+
+class SQLiteJobStore(JobStore):
+    """SQLite-backed store, so queued and finished jobs survive restarts."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " body TEXT NOT NULL,"
+                " owner TEXT,"  # Process running the job
+                " lease_until REAL)"  # Unix seconds; the owner renews it
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+            )
+
+    def create(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, created_at, body)"
+                " VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status.value, job.created_at, job.model_dump_json()),
+            )
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def update(self, job: Job, owner: str) -> bool:
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, body = ?"
+                " WHERE job_id = ? AND owner = ? AND status = ?",
+                (
+                    job.status.value,
+                    job.model_dump_json(),
+                    job.job_id,
+                    owner,
+                    JobStatus.RUNNING.value,
+                ),
+            )
+        return updated.rowcount == 1
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Job | None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body FROM jobs WHERE job_id = ? AND status = ?",
+                (job_id, JobStatus.QUEUED.value),
+            ).fetchone()
+            if row is None:
+                return None
+            job = Job.model_validate_json(row[0]).model_copy(
+                update={"status": JobStatus.RUNNING, "started_at": time.time()}
+            )
+            # The status check makes the claim atomic across processes
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = ?, body = ?, owner = ?, lease_until = ?"
+                " WHERE job_id = ? AND status = ?",
+                (
+                    JobStatus.RUNNING.value,
+                    job.model_dump_json(),
+                    owner,
+                    time.time() + lease_seconds,
+                    job_id,
+                    JobStatus.QUEUED.value,
+                ),
+            )
+        return job if claimed.rowcount == 1 else None
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock, self._conn:
+            renewed = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?"
+                " WHERE job_id = ? AND owner = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, owner, JobStatus.RUNNING.value),
+            )
+        return renewed.rowcount == 1
+
+    def recover(self, owner: str | None = None) -> list[Job]:
+        recoverable = (
+            " WHERE status = ?"
+            " AND (lease_until IS NULL OR lease_until < ? OR owner IS ?)"
+        )
+        with self._lock, self._conn:
+            now = time.time()
+            stale = self._conn.execute(
+                "SELECT body FROM jobs" + recoverable,
+                (JobStatus.RUNNING.value, now, owner),
+            ).fetchall()
+            for (body,) in stale:
+                job = Job.model_validate_json(body).model_copy(
+                    update={"status": JobStatus.QUEUED, "started_at": None}
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, body = ?, owner = NULL,"
+                    " lease_until = NULL" + recoverable + " AND job_id = ?",
+                    (
+                        JobStatus.QUEUED.value,
+                        job.model_dump_json(),
+                        JobStatus.RUNNING.value,
+                        now,
+                        owner,
+                        job.job_id,
+                    ),
+                )
+            rows = self._conn.execute(
+                "SELECT body FROM jobs WHERE status = ? ORDER BY created_at",
+                (JobStatus.QUEUED.value,),
+            ).fetchall()
+        return [Job.model_validate_json(row[0]) for row in rows]
+
+
+def build_job_store() -> JobStore:
+    """Create the job store selected in settings."""
+    if settings.job_store == "sqlite":
+        return SQLiteJobStore(settings.job_sqlite_path)
+    return MemoryJobStore(settings.job_retention_seconds, settings.job_max_finished)
@@ -1,18 +1,39 @@
 """Task processing service - main entry point for agent execution."""
 
+import asyncio
 import logging
 import time
+from collections.abc import AsyncIterator, Callable
 
-from app.agents.dispatcher import dispatch_tool
+from app.admission import admission
+from app.agents.conversation import Conversation
+from app.agents.dispatcher import PendingToolCalls, dispatch_tools
 from app.agents.reasoning import ReasoningAgent
+from app.agents.usage import TaskUsage, record_task
+from app.config import settings
+from app.metrics import (
+    LLM_LATENCY,
+    MAX_ITERATIONS_EXHAUSTED,
+    TASK_DURATION,
+    TASK_ITERATIONS,
+    TASKS,
+    TASKS_IN_FLIGHT,
+)
+from app.resilience import CircuitOpenError
 from app.schemas.task import (
     AgentDecision,
     AgentResponse,
     DecisionType,
     Observation,
     ResponseStatus,
+    TaskEvent,
+    TaskEventType,
     TaskInput,
+    TaskResponse,
+    ToolCall,
 )
+from app.tools import ToolResult
+from app.tracing import current_span, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +44,20 @@ MAX_ITERATIONS = 5  # Prevent infinite loops
 _agent = ReasoningAgent()
 
 
-def process_task(task_input: TaskInput) -> AgentResponse:
+def get_agent() -> ReasoningAgent:
+    """Return the shared reasoning agent (used for status reporting)."""
+    return _agent
+
+
+EventCallback = Callable[[TaskEvent], None]
+
+
+async def process_task(
+    task_input: TaskInput,
+    on_event: EventCallback | None = None,
+    stream_tokens: bool = False,
+    wait_for_admission: bool = False,
+) -> AgentResponse:
     """Process a task using the observation loop.
 
     The agent can:
@@ -31,10 +65,88 @@ def process_task(task_input: TaskInput) -> AgentResponse:
     2. Decide to respond/clarify/escalate → return final response
 
     Loop continues until agent makes a final decision or max iterations reached.
+
+    Args:
+        task_input: The task to process
+        on_event: Called with a TaskEvent at each step (iteration start,
+            decision, tool dispatch, observation, final result)
+        stream_tokens: Also emit TOKEN events with LLM output as it arrives
+            (only meaningful with on_event)
+        wait_for_admission: Wait for an admission slot however long it
+            takes, for callers that bound their own concurrency (batches,
+            jobs); otherwise the wait is bounded
+
+    Raises:
+        Overloaded: If admission control turned the task away
     """
-    observations: list[Observation] = []
+    emit = on_event or _ignore_event
+    async with admission.slot(wait_for_admission) as slot:
+        started = time.perf_counter()
+        with tracer.start_span("process_task") as span:
+            response = await _run_observation_loop(task_input, emit, stream_tokens)
+            span.set_attribute("status", response.status.value)
+        slot.failed = response.provider_error
+    status = response.status.value
+    TASK_DURATION.labels(status).observe(time.perf_counter() - started)
+    TASKS.labels(status).inc()
+    emit(
+        TaskEvent(
+            event=TaskEventType.RESULT,
+            data=TaskResponse.from_agent_response(response).model_dump(mode="json"),
+        )
+    )
+    return response
+
+
+async def stream_task_events(
+    task_input: TaskInput,
+    stream_tokens: bool = False,
+) -> AsyncIterator[TaskEvent]:
+    """Run a task and yield its progress events, ending with the RESULT event.
+
+    If the consumer stops iterating early (e.g. the client disconnected or
+    already has what it needs), the task is cancelled.
+    """
+    queue: asyncio.Queue[TaskEvent | None] = asyncio.Queue()
+
+    async def run() -> None:
+        try:
+            await process_task(task_input, queue.put_nowait, stream_tokens)
+        finally:
+            queue.put_nowait(None)
+
+    runner = asyncio.ensure_future(run())
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        await runner  # Raises what the task raised, e.g. Overloaded
+    finally:
+        runner.cancel()
+
+
+def _ignore_event(event: TaskEvent) -> None:
+    pass
+
+
+async def _run_observation_loop(
+    task_input: TaskInput,
+    emit: EventCallback,
+    stream_tokens: bool,
+) -> AgentResponse:
+    """Run the observation loop for `process_task`, emitting progress events."""
+
+    def forward_token(text: str) -> None:
+        emit(TaskEvent(event=TaskEventType.TOKEN, data={"text": text}))
+
+    conversation = Conversation(task_input)
+    observations = conversation.observations
+    # Read-only calls started before a decision asks for them: prefetched
+    # from the context now, or seen while a decision is still streaming
+    pending = PendingToolCalls()
+    on_tool_call = pending.start if settings.speculative_tools else None
+    usage = TaskUsage(model=settings.openai_model)
     iteration = 0
-    start_time = time.time()
+    provider_failed = False  # An LLM call raised after its retries
 
     logger.info(
         "task.start",
@@ -44,108 +156,275 @@ def process_task(task_input: TaskInput) -> AgentResponse:
         },
     )
 
+    TASKS_IN_FLIGHT.inc()
     try:
-        while iteration < MAX_ITERATIONS:
-            iteration += 1
-            logger.info(
-                "task.iteration",
-                extra={"iteration": iteration, "max": MAX_ITERATIONS},
+        if settings.context_prefetch and pending.prefetch(task_input.context):
+            # Results ready in time go into the first prompt, so the model
+            # needn't ask for them; the rest are still reused if it does
+            prefetched = await pending.collect_prefetched(
+                settings.context_prefetch_wait_seconds
             )
-
-            # Get agent's decision (with any previous observations)
-            decision = _agent.reason(task_input, observations if observations else None)
-
-            # Terminal decisions - return response
-            if decision.decision_type in (
-                DecisionType.RESPOND,
-                DecisionType.CLARIFY,
-                DecisionType.ESCALATE,
+            if prefetched:
+                conversation.add_prefetched(
+                    [_observation(call, result) for call, result in prefetched]
+                )
+            for (tool_call, _), observation in zip(
+                prefetched, conversation.observations, strict=True
             ):
-                duration = time.time() - start_time
-                logger.info(
-                    "task.complete",
-                    extra={
-                        "decision": decision.decision_type.value,
-                        "iterations": iteration,
-                        "tools_called": len(observations),
-                        "duration_ms": int(duration * 1000),
-                    },
+                emit(
+                    TaskEvent(
+                        event=TaskEventType.TOOL_CALL,
+                        data=tool_call.model_dump(mode="json"),
+                    )
+                )
+                emit(
+                    TaskEvent(
+                        event=TaskEventType.OBSERVATION,
+                        data=observation.model_dump(mode="json"),
+                    )
                 )
-                return _decision_to_response(decision, observations)
-
-            # USE_TOOL - execute and observe
-            if decision.decision_type == DecisionType.USE_TOOL:
-                observation = _execute_and_observe(decision)
-                observations.append(observation)
 
+        while iteration < MAX_ITERATIONS:
+            iteration += 1
+            step = usage.step()
+            with tracer.start_span(
+                "process_task.iteration", {"iteration": iteration}
+            ) as span:
                 logger.info(
-                    "task.tool_executed",
-                    extra={
-                        "tool": observation.tool_name,
-                        "success": observation.success,
-                        "iteration": iteration,
-                    },
+                    "task.iteration",
+                    extra={"iteration": iteration, "max": MAX_ITERATIONS},
                 )
+                emit(
+                    TaskEvent(
+                        event=TaskEventType.ITERATION,
+                        data={"iteration": iteration, "max": MAX_ITERATIONS},
+                    )
+                )
+
+                # Get agent's decision (with any previous observations)
+                try:
+                    decision = await _agent.areason(
+                        conversation,
+                        on_token=forward_token if stream_tokens else None,
+                        on_tool_call=on_tool_call,
+                        usage=step,
+                    )
+                except ValueError:
+                    raise  # Unparseable output: the provider did answer
+                except Exception:
+                    provider_failed = True
+                    raise
+                finally:
+                    if step.llm_calls:
+                        LLM_LATENCY.observe(step.llm_ms / 1000)
+                emit(_decision_event(decision))
+                span.set_attributes(
+                    {
+                        "decision_type": decision.decision_type.value,
+                        "tool_calls": len(decision.requested_tool_calls),
+                        "cached": step.cached,
+                    }
+                )
+
+                # Terminal decisions - return response
+                if decision.decision_type in (
+                    DecisionType.RESPOND,
+                    DecisionType.CLARIFY,
+                    DecisionType.ESCALATE,
+                ):
+                    logger.info(
+                        "task.complete",
+                        extra={
+                            "decision": decision.decision_type.value,
+                            "iterations": iteration,
+                            "tools_called": len(observations),
+                            **usage.totals(),
+                        },
+                    )
+                    return _with_usage(
+                        _decision_to_response(decision, observations), usage
+                    )
 
-                continue
+                # USE_TOOL - execute and observe
+                if decision.decision_type == DecisionType.USE_TOOL:
+                    for tool_call in decision.requested_tool_calls:
+                        emit(
+                            TaskEvent(
+                                event=TaskEventType.TOOL_CALL,
+                                data=tool_call.model_dump(mode="json"),
+                            )
+                        )
+
+                    tools_started = time.perf_counter()
+                    new_observations = await _execute_and_observe(decision, pending)
+                    # Prefetched results the decision didn't ask for go in as
+                    # observations too, saving the round trip to request them
+                    for tool_call, result in await pending.collect_prefetched():
+                        emit(
+                            TaskEvent(
+                                event=TaskEventType.TOOL_CALL,
+                                data=tool_call.model_dump(mode="json"),
+                            )
+                        )
+                        new_observations.append(_observation(tool_call, result))
+                    step.tools_ms += (time.perf_counter() - tools_started) * 1000
+                    pending.discard()
+                    conversation.add_decision(decision)
+                    conversation.add_observations(new_observations)
+
+                    for observation in new_observations:
+                        emit(
+                            TaskEvent(
+                                event=TaskEventType.OBSERVATION,
+                                data=observation.model_dump(mode="json"),
+                            )
+                        )
+                        logger.info(
+                            "task.tool_executed",
+                            extra={
+                                "tool": observation.tool_name,
+                                "success": observation.success,
+                                "iteration": iteration,
+                            },
+                        )
+
+                    continue
 
         # Max iterations reached
-        duration = time.time() - start_time
+        MAX_ITERATIONS_EXHAUSTED.inc()
         logger.warning(
             "task.max_iterations",
             extra={
                 "iterations": MAX_ITERATIONS,
                 "tools_called": len(observations),
-                "duration_ms": int(duration * 1000),
+                **usage.totals(),
             },
         )
-        return AgentResponse(
-            status=ResponseStatus.FAILED,
-            message="I was unable to complete the task within the allowed steps.",
-            data={
-                "iterations": iteration,
-                "observations": [obs.model_dump() for obs in observations],
-            },
+        return _with_usage(
+            AgentResponse(
+                status=ResponseStatus.FAILED,
+                message="I was unable to complete the task within the allowed steps.",
+                data={
+                    "iterations": iteration,
+                    "observations": [obs.model_dump() for obs in observations],
+                },
+            ),
+            usage,
         )
 
+    except CircuitOpenError as e:
+        logger.warning(
+            "task.error.circuit_open", extra={"error": str(e), **usage.totals()}
+        )
+        return _with_usage(
+            AgentResponse(
+                status=ResponseStatus.FAILED,
+                message="The AI service is temporarily unavailable. Please try again shortly.",
+                data={
+                    "error": str(e),
+                    "circuit_open": True,
+                    "retry_after": round(e.retry_after, 3),
+                },
+                provider_error=True,
+            ),
+            usage,
+        )
     except ValueError as e:
-        logger.error("task.error.parsing", extra={"error": str(e)})
-        return AgentResponse(
-            status=ResponseStatus.FAILED,
-            message="I encountered an error while processing your request.",
-            data={"error": str(e)},
+        logger.error("task.error.parsing", extra={"error": str(e), **usage.totals()})
+        return _with_usage(
+            AgentResponse(
+                status=ResponseStatus.FAILED,
+                message="I encountered an error while processing your request.",
+                data={"error": str(e)},
+            ),
+            usage,
         )
     except Exception as e:
-        logger.exception("task.error.unexpected")
-        return AgentResponse(
-            status=ResponseStatus.FAILED,
-            message="An unexpected error occurred.",
-            data={"error": str(e)},
+        logger.exception("task.error.unexpected", extra=usage.totals())
+        return _with_usage(
+            AgentResponse(
+                status=ResponseStatus.FAILED,
+                message="An unexpected error occurred.",
+                data={"error": str(e)},
+                provider_error=provider_failed,
+            ),
+            usage,
         )
+    finally:
+        # Speculative calls the final decision didn't ask for
+        pending.discard()
+        record_task(usage)
+        if (task_span := current_span()) is not None:
+            task_span.set_attributes(
+                {
+                    "iterations": len(usage.steps),
+                    "input_tokens": usage.input_tokens,
+                    "output_tokens": usage.output_tokens,
+                }
+            )
+        TASK_ITERATIONS.observe(len(usage.steps))
+        TASKS_IN_FLIGHT.dec()
+
 
+async def _execute_and_observe(
+    decision: AgentDecision, pending: PendingToolCalls | None = None
+) -> list[Observation]:
+    """Execute the decision's tool calls and return one observation per call.
 
-def _execute_and_observe(decision: AgentDecision) -> Observation:
-    """Execute a tool and return an observation."""
-    if decision.tool_call is None:
+    Calls already started speculatively (in `pending`) are not run again.
+    """
+    tool_calls = decision.requested_tool_calls
+    if not tool_calls:
         logger.error(
             "task.tool.missing", extra={"decision": decision.decision_type.value}
         )
-        return Observation(
-            tool_name="unknown",
-            success=False,
-            error="Agent decided to use a tool but didn't specify which one.",
-        )
+        return [
+            Observation(
+                tool_name="unknown",
+                success=False,
+                error="Agent decided to use a tool but didn't specify which one.",
+            )
+        ]
+
+    results = await dispatch_tools(tool_calls, pending)
 
-    result = dispatch_tool(decision.tool_call)
+    return [
+        _observation(tool_call, result)
+        for tool_call, result in zip(tool_calls, results)
+    ]
 
+
+def _with_usage(response: AgentResponse, usage: TaskUsage) -> AgentResponse:
+    """Attach the task's usage breakdown if `task_usage_in_response` is set."""
+    if settings.task_usage_in_response:
+        response.data = {**(response.data or {}), "usage": usage.summary()}
+    return response
+
+
+def _observation(tool_call: ToolCall, result: ToolResult) -> Observation:
     return Observation(
-        tool_name=decision.tool_call.tool_name,
+        tool_name=tool_call.tool_name,
         success=result.success,
         result=result.data,
         error=result.error,
     )
 
 
+def _decision_event(decision: AgentDecision) -> TaskEvent:
+    """Build the DECISION event. Reasoning stays internal and is not included."""
+    return TaskEvent(
+        event=TaskEventType.DECISION,
+        data={
+            "decision_type": decision.decision_type.value,
+            "message": decision.message,
+            "tool_calls": [
+                tool_call.model_dump(mode="json")
+                for tool_call in decision.requested_tool_calls
+            ],
+        },
+    )
+
+
 def _decision_to_response(
     decision: AgentDecision,
     observations: list[Observation],
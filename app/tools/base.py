@@ -1,9 +1,12 @@
 """Base tool interface and registry."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from app.resilience import BackoffPolicy
 
 
 class ToolError(Exception):
@@ -13,11 +16,17 @@ class ToolError(Exception):
 
 
 class ToolResult(BaseModel):
-    """Standardized result from tool execution."""
+    """Standardized result from tool execution.
+
+    Set `transient` on a failure the tool's dependency caused (timeout,
+    outage) rather than the call itself (unknown id, bad input); only those
+    count towards the tool's circuit breaker.
+    """
 
     success: bool
     data: dict[str, Any] | None = None
     error: str | None = None
+    transient: bool = False
 
 
 class BaseTool(ABC):
@@ -33,6 +42,20 @@ class BaseTool(ABC):
     name: str
     description: str
     has_side_effects: bool = False  # Does this tool modify external state?
+    input_model: type[BaseModel] | None = None  # Pydantic schema of the arguments
+
+    # Result caching (honoured only when has_side_effects is False)
+    cache_ttl_seconds: float | None = None  # None disables caching
+    cache_max_entries: int = 256
+
+    # Context prefetch: task context key -> argument name (read-only tools only)
+    prefetch_context: dict[str, str] | None = None
+
+    # Circuit breaker (None disables it) and retries of raised exceptions;
+    # only give tools with side effects a retry policy if they are idempotent
+    breaker_failure_threshold: int | None = 5
+    breaker_recovery_seconds: float = 30.0
+    retry_policy: BackoffPolicy | None = None
 
     @abstractmethod
     def execute(self, **kwargs: Any) -> ToolResult:
@@ -46,6 +69,65 @@ class BaseTool(ABC):
         """
         pass
 
+    async def aexecute(self, **kwargs: Any) -> ToolResult:
+        """Execute the tool without blocking the event loop.
+
+        The default runs `execute` in a worker thread. Tools backed by an
+        async client should override this with a native implementation.
+
+        Args:
+            **kwargs: Tool-specific arguments
+
+        Returns:
+            ToolResult with success status and data/error
+        """
+        return await asyncio.to_thread(self.execute, **kwargs)
+
+    def accepts(self, arguments: dict[str, Any]) -> bool:
+        """Whether `arguments` validate against `input_model` (True without one)."""
+        if self.input_model is None:
+            return True
+        try:
+            self.input_model(**arguments)
+        except ValidationError:
+            return False
+        return True
+
+    def cache_key(self, arguments: dict[str, Any]) -> str | None:
+        """Canonical cache key for a call, or None if it must not be cached.
+
+        The key is the JSON of the validated input model, so argument order,
+        defaults and coercions don't cause spurious misses. Calls that fail
+        validation are never cached.
+        """
+        if (
+            self.has_side_effects
+            or self.cache_ttl_seconds is None
+            or self.input_model is None
+        ):
+            return None
+        try:
+            return self.input_model(**arguments).model_dump_json()
+        except ValidationError:
+            return None
+
+    def prefetch_arguments(
+        self, context: dict[str, Any] | None
+    ) -> dict[str, Any] | None:
+        """Arguments for a call to start from the task context, if any.
+
+        Returns None unless the tool is side-effect-free, declares
+        `prefetch_context`, the context holds every mapped key and the
+        resulting arguments validate against `input_model`.
+        """
+        if self.has_side_effects or not self.prefetch_context or not context:
+            return None
+        if any(key not in context for key in self.prefetch_context):
+            return None
+
+        arguments = {arg: context[key] for key, arg in self.prefetch_context.items()}
+        return arguments if self.accepts(arguments) else None
+
     def get_schema(self) -> dict[str, Any]:
         """Return tool metadata for agent prompt."""
         return {
@@ -64,10 +146,21 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: dict[str, BaseTool] = {}
+        self._version = 0
 
     def register(self, tool: BaseTool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        """Counter bumped on every registration.
+
+        Lets callers cache anything derived from the tool list (like the
+        system prompt) and rebuild it only when the registry changes.
+        """
+        return self._version
 
     def get(self, name: str) -> BaseTool | None:
         """Get a tool by name. Returns None if not found."""
@@ -85,6 +178,11 @@ class ToolRegistry:
         """List all registered tools with their schemas."""
         return [tool.get_schema() for tool in self._tools.values()]
 
+    @property
+    def tools(self) -> list[BaseTool]:
+        """Get the registered tool instances."""
+        return list(self._tools.values())
+
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
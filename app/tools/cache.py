@@ -0,0 +1,90 @@
+"""Result cache for side-effect-free tools."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.tools.base import ToolResult
+
+
+class ToolResultCache:
+    """LRU + TTL cache of one tool's successful results.
+
+    Concurrent lookups for a key that is already executing wait for that
+    execution instead of starting their own (request coalescing). Failed
+    results are returned to every waiter but never stored.
+    """
+
+    def __init__(self, tool_name: str, max_entries: int, ttl_seconds: float):
+        self.tool_name = tool_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, result, execution seconds)
+        self._entries: OrderedDict[str, tuple[float, ToolResult, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[tuple[ToolResult, float]]] = {}
+
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    async def get_or_run(
+        self, key: str, run: Callable[[], Awaitable[ToolResult]]
+    ) -> ToolResult:
+        """Return a cached result for `key`, or compute it with `run`."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result, duration = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += duration
+                return result.model_copy(deep=True)
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            result, duration = await asyncio.shield(inflight)
+            self.saved_seconds += duration
+            return result.model_copy(deep=True)
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._execute(key, run))
+        self._inflight[key] = task
+        # Shielded so a cancelled caller doesn't cancel the coalesced waiters
+        result, _ = await asyncio.shield(task)
+        return result.model_copy(deep=True)
+
+    async def _execute(
+        self, key: str, run: Callable[[], Awaitable[ToolResult]]
+    ) -> tuple[ToolResult, float]:
+        start = time.perf_counter()
+        try:
+            result = await run()
+        finally:
+            self._inflight.pop(key, None)
+        duration = time.perf_counter() - start
+
+        if result.success:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result, duration)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return result, duration
+
+    def stats(self) -> dict[str, Any]:
+        """Hit ratio and latency saved, for status reporting."""
+        lookups = self.hits + self.coalesced + self.misses
+        served = self.hits + self.coalesced
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "saved_latency_ms": round(self.saved_seconds * 1000, 3),
+            "entries": len(self._entries),
+        }
@@ -27,6 +27,7 @@ class EscalateToHumanTool(BaseTool):
         "Escalate the current task to a human operator when the agent cannot proceed"
     )
     has_side_effects = True
+    input_model = EscalateToHumanInput
 
     def execute(self, **kwargs: Any) -> ToolResult:
         # Validate input
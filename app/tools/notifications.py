@@ -28,6 +28,7 @@ class SendNotificationTool(BaseTool):
     name = "send_notification"
     description = "Send a notification message to a user via email, SMS, or Slack"
     has_side_effects = True
+    input_model = SendNotificationInput
 
     def execute(self, **kwargs: Any) -> ToolResult:
         # Validate input
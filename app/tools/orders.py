@@ -22,6 +22,7 @@ class CreateOrderTool(BaseTool):
     name = "create_order"
     description = "Create a new order for a product"
     has_side_effects = True  # This modifies external state
+    input_model = CreateOrderInput
 
     def execute(self, **kwargs: Any) -> ToolResult:
         # Validate input
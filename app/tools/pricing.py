@@ -27,6 +27,9 @@ class GetPricingTool(BaseTool):
     name = "get_pricing"
     description = "Get pricing information for a product by its ID"
     has_side_effects = False
+    input_model = GetPricingInput
+    cache_ttl_seconds = 60.0  # Prices change rarely within a task
+    prefetch_context = {"product_id": "product_id"}  # Context key -> argument
 
     def execute(self, **kwargs: Any) -> ToolResult:
         # Validate input
@@ -0,0 +1,314 @@
+"""Lightweight tracing compatible with OpenTelemetry and W3C Trace Context.
+
+Spans follow the OpenTelemetry data model (32-hex trace id, 16-hex span
+id, parent, start/end in unix nanoseconds, attributes, status) and are
+linked through a context variable, so they nest across `await`s and the
+tasks asyncio starts from the current context. Incoming `traceparent`
+headers are continued, and the sampling decision is made once per trace:
+at the root with probability `trace_sample_rate`, or taken from the
+remote parent's sampled flag.
+
+Exporters:
+- "memory": InMemoryExporter, the most recent spans (tests, debugging)
+- "file": FileExporter, one JSON object per finished span (offline analysis),
+  written by a background thread
+- "none": tracing off; `start_span` returns a shared no-op span
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from typing import Any, Protocol
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+AttributeValue = str | int | float | bool
+
+
+class Span:
+    """A recorded operation. Use as a context manager to make it current."""
+
+    recording = True
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: dict[str, AttributeValue] | None = None,
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes: dict[str, AttributeValue] = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message: str | None = None
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self._token: Token[Any] | None = None
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, AttributeValue]) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        if self._token is not None:
+            _current_span.reset(self._token)
+        if exc is not None:
+            self.record_exception(exc)
+        elif self.status == "UNSET":
+            self.status = "OK"
+        self.end_ns = time.time_ns()
+        self._tracer.export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        """OTel-style JSON representation."""
+        status: dict[str, Any] = {"code": self.status}
+        if self.status_message:
+            status["message"] = self.status_message
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": status,
+        }
+
+
+class NonRecordingSpan:
+    """Span of an unsampled trace: carries the ids, records nothing."""
+
+    recording = False
+    __slots__ = ("trace_id", "span_id", "_token")
+
+    def __init__(self, trace_id: str = "0" * 32, span_id: str = "0" * 16):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self._token: Token[Any] | None = None
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, AttributeValue]) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-00"
+
+    def __enter__(self) -> "NonRecordingSpan":
+        # The no-op span (tracing off) never becomes current
+        if self is not _NOOP_SPAN:
+            self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        if self._token is not None:
+            _current_span.reset(self._token)
+
+
+_NOOP_SPAN = NonRecordingSpan()
+_current_span: ContextVar[Span | NonRecordingSpan | None] = ContextVar(
+    "current_span", default=None
+)
+
+
+def current_span() -> Span | NonRecordingSpan | None:
+    """The span the caller is running in, if any."""
+    return _current_span.get()
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """(trace id, parent span id, sampled) from a W3C traceparent, if valid."""
+    if not header:
+        return None
+    found = _TRACEPARENT.match(header.strip().lower())
+    if found is None:
+        return None
+    trace_id, span_id, flags = found.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 0x01)
+
+
+# =============================================================================
+# Exporters
+# =============================================================================
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class InMemoryExporter:
+    """Keeps the last `max_spans` finished spans, oldest first."""
+
+    def __init__(self, max_spans: int = 10_000) -> None:
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class FileExporter:
+    """Appends each finished span as a JSON line, from a background thread.
+
+    `export` only queues the span, so requests never wait on the disk. The
+    writer thread keeps the file open, writes whatever has queued up in one
+    go and flushes once the queue is empty. Spans finished while
+    `max_queue` are already waiting are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10_000):
+        self.path = path
+        self.dropped = 0
+        self._file = open(path, "a", encoding="utf-8")  # Fail fast on a bad path
+        self._queue: queue.Queue[Span | None] = queue.Queue(max_queue)
+        self._writer = threading.Thread(
+            target=self._write, name="trace-exporter", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every span exported so far is written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued spans and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write(self) -> None:
+        with self._file as f:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                f.writelines(
+                    json.dumps(span.to_dict(), default=str) + "\n"
+                    for span in batch
+                    if span is not None
+                )
+                f.flush()
+                for _ in batch:
+                    self._queue.task_done()
+                if None in batch:
+                    return
+
+
+# =============================================================================
+# Tracer
+# =============================================================================
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter.
+
+    Args:
+        exporter: Where finished spans go; None turns tracing off
+        sample_rate: Probability a new root trace is recorded
+    """
+
+    def __init__(self, exporter: SpanExporter | None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_span(
+        self,
+        name: str,
+        attributes: dict[str, AttributeValue] | None = None,
+        traceparent: str | None = None,
+    ) -> Span | NonRecordingSpan:
+        """Start a child of the current span, or a root span.
+
+        A valid `traceparent` (e.g. from a request header) takes precedence
+        over the current span as the parent.
+        """
+        if self.exporter is None:
+            return _NOOP_SPAN
+
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        else:
+            parent = _current_span.get()
+            if parent is not None:
+                trace_id, parent_id = parent.trace_id, parent.span_id
+                sampled = parent.recording
+            else:
+                trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+                sampled = random.random() < self.sample_rate
+
+        if not sampled:
+            return NonRecordingSpan(trace_id, parent_id or "0" * 16)
+        return Span(self, name, trace_id, parent_id, attributes)
+
+    def export(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            # Tracing must never fail the traced operation
+            logger.warning("tracing.export.failed", extra={"error": str(e)})
+
+
+def build_exporter() -> SpanExporter | None:
+    """Create the exporter selected in settings."""
+    if settings.trace_exporter == "memory":
+        return InMemoryExporter()
+    if settings.trace_exporter == "file":
+        return FileExporter(settings.trace_file_path)
+    return None
+
+
+tracer = Tracer(build_exporter(), settings.trace_sample_rate)
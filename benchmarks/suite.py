@@ -0,0 +1,350 @@
+"""Micro-benchmark suite for the agent hot paths, with a stored baseline.
+
+Times the per-iteration work the agent does around the model call:
+decision parsing, message building (per call, and over a whole
+trajectory of tool iterations), system prompt rendering (uncached for
+a growing tool list, and cached as `reason()` uses it), tool dispatch,
+schema round trips, metric updates, and a full `process_task` against the
+offline scripted LLM. Results are per-operation times in microseconds
+(best of several repeats).
+
+Run with:
+    uv run python -m benchmarks.suite                  # print results
+    uv run python -m benchmarks.suite --save-baseline  # write baseline.json
+    uv run python -m benchmarks.suite --check          # fail on regressions
+
+`--check` exits non-zero when any benchmark is slower than its baseline by
+more than `--threshold` (a fraction, default 0.25). Baselines are only
+comparable on the machine that recorded them: re-record after hardware or
+interpreter changes.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+os.environ.setdefault("LLM_BACKEND", "scripted")
+
+from app.agents.conversation import Conversation
+from app.agents.dispatcher import dispatch_tool
+from app.agents.llm import ScriptedChatModel, ScriptedRule
+from app.agents.prompts import build_system_prompt
+from app.agents.reasoning import ReasoningAgent
+from app.metrics import Counter, Histogram
+from app.schemas.task import (
+    AgentDecision,
+    AgentResponse,
+    DecisionType,
+    Observation,
+    ResponseStatus,
+    TaskInput,
+    TaskResponse,
+    ToolCall,
+)
+from app.services import task_service
+from app.tools import BaseTool, ToolResult, registry
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown before --check fails
+MIN_RUN_SECONDS = 0.1  # Calibrated duration of one timed run
+REPEATS = 7
+
+OBSERVATION_COUNTS = [1, 5, 50]
+TRAJECTORY_LENGTHS = [10, 100]
+TOOL_COUNTS = [4, 100, 1000]
+
+# Valid arguments for each registered tool
+TOOL_ARGUMENTS: dict[str, dict[str, Any]] = {
+    "get_pricing": {"product_id": "PROD-001"},
+    "create_order": {"product_id": "PROD-001", "quantity": 2, "customer_id": "C-1"},
+    "send_notification": {"recipient": "ops@example.com", "message": "Order placed"},
+    "escalate_to_human": {"reason": "Customer requests a refund over the limit"},
+}
+
+_TASK = TaskInput(task="Price PROD-001 and order two", context={"customer": "C-1"})
+_DECISION = AgentDecision(
+    decision_type=DecisionType.USE_TOOL,
+    reasoning="Look up the price first",
+    tool_call=ToolCall(tool_name="get_pricing", arguments={"product_id": "PROD-001"}),
+)
+_OBSERVATION = Observation(
+    tool_name="get_pricing",
+    success=True,
+    result={"product_id": "PROD-001", "name": "Basic Widget", "price": 29.99},
+)
+_RESPOND = {"decision_type": "respond", "reasoning": "done", "message": "ok"}
+
+
+class _SyntheticTool(BaseTool):
+    description = "Synthetic tool used to grow the tool list for benchmarking"
+
+    def __init__(self, index: int):
+        self.name = f"synthetic_tool_{index:04d}"
+        self.has_side_effects = index % 3 == 0
+
+    def execute(self, **kwargs: Any) -> ToolResult:
+        return ToolResult(success=True)
+
+
+# =============================================================================
+# Timing
+# =============================================================================
+
+
+def time_sync(fn: Callable[[], Any]) -> float:
+    """Best per-call time of `fn` in microseconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= MIN_RUN_SECONDS:
+            break
+        number *= 2
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def time_async(fn: Callable[[], Awaitable[Any]]) -> float:
+    """Best per-call time of the coroutine function `fn` in microseconds."""
+
+    async def run(number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        return time.perf_counter() - start
+
+    async def measure() -> float:
+        number = 1
+        while await run(number) < MIN_RUN_SECONDS:
+            number *= 2
+        best = min([await run(number) for _ in range(REPEATS)])
+        return best / number * 1e6
+
+    return asyncio.run(measure())
+
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+
+def benchmarks() -> dict[str, Callable[[], float]]:
+    """Name -> function returning microseconds per operation."""
+    agent = ReasoningAgent()
+    cases: dict[str, Callable[[], float]] = {}
+
+    raw = _DECISION.model_dump_json()
+    fenced = f"```json\n{raw}\n```"
+    cases["parse_decision/plain"] = lambda: time_sync(
+        lambda: agent._parse_decision(raw)
+    )
+    cases["parse_decision/fenced"] = lambda: time_sync(
+        lambda: agent._parse_decision(fenced)
+    )
+
+    for count in OBSERVATION_COUNTS:
+        conversation = Conversation(_TASK)
+        for _ in range(count):
+            conversation.add_decision(_DECISION)
+            conversation.add_observations([_OBSERVATION])
+        cases[f"build_messages/observations={count}"] = lambda c=conversation: (
+            time_sync(lambda: agent._build_messages(c))
+        )
+
+    for length in TRAJECTORY_LENGTHS:
+        cases[f"conversation/trajectory={length}"] = lambda n=length: time_sync(
+            lambda: _run_trajectory(agent, n)
+        )
+
+    for count in TOOL_COUNTS:
+        tools = registry.list_tools()
+        tools += [_SyntheticTool(i).get_schema() for i in range(count - len(tools))]
+        cases[f"system_prompt/tools={count}"] = lambda t=tools: time_sync(
+            lambda: build_system_prompt(t)
+        )
+    # What `reason()` pays per call: the prompt cached per registry version
+    cases["system_prompt/cached"] = lambda: time_sync(lambda: agent.system_prompt)
+
+    for name in registry.tool_names:
+        call = ToolCall(tool_name=name, arguments=TOOL_ARGUMENTS[name])
+        cases[f"dispatch_tool/{name}"] = lambda c=call: _time_dispatch(c)
+
+    decision_json = _DECISION.model_dump_json()
+    observation_json = _OBSERVATION.model_dump_json()
+    agent_response = AgentResponse(
+        status=ResponseStatus.SUCCESS,
+        message="ok",
+        data={"tool_calls": [_OBSERVATION.model_dump()]},
+    )
+    cases["schemas/agent_decision_roundtrip"] = lambda: time_sync(
+        lambda: AgentDecision.model_validate_json(
+            AgentDecision.model_validate_json(decision_json).model_dump_json()
+        )
+    )
+    cases["schemas/observation_roundtrip"] = lambda: time_sync(
+        lambda: Observation.model_validate_json(
+            Observation.model_validate_json(observation_json).model_dump_json()
+        )
+    )
+    cases["schemas/task_response_from_agent_response"] = lambda: time_sync(
+        lambda: TaskResponse.from_agent_response(agent_response).model_dump(mode="json")
+    )
+
+    histogram = Histogram("bench_seconds", "Benchmark histogram.", ["tool"])
+    counter = Counter("bench_total", "Benchmark counter.")
+    cases["metrics/histogram_observe"] = lambda: time_sync(
+        lambda: histogram.labels("get_pricing").observe(0.042)
+    )
+    cases["metrics/counter_inc"] = lambda: time_sync(counter.inc)
+
+    cases["process_task/respond"] = lambda: _time_process_task(
+        ScriptedChatModel(rules=[ScriptedRule(decision=_RESPOND)])
+    )
+    cases["process_task/tool_then_respond"] = lambda: _time_process_task(
+        ScriptedChatModel()
+    )
+    return cases
+
+
+def _run_trajectory(agent: ReasoningAgent, length: int) -> None:
+    """Build the history of a task with `length` tool iterations."""
+    conversation = Conversation(_TASK)
+    for _ in range(length):
+        agent._build_messages(conversation)
+        conversation.add_decision(_DECISION)
+        conversation.add_observations([_OBSERVATION])
+
+
+def _time_dispatch(call: ToolCall) -> float:
+    """Cost of really running a tool call, with its result cache disabled."""
+    tool = registry.get_or_raise(call.tool_name)
+    tool.cache_ttl_seconds = None  # Shadows the class default
+    try:
+        return time_async(lambda: dispatch_tool(call))
+    finally:
+        del tool.cache_ttl_seconds
+
+
+def _time_process_task(llm: ScriptedChatModel) -> float:
+    """End-to-end loop overhead with a zero-latency LLM and no decision cache."""
+    agent = task_service.get_agent()
+    saved = agent.llm, agent.decision_cache
+    agent.llm, agent.decision_cache = llm, None
+    try:
+        return time_async(lambda: task_service.process_task(_TASK))
+    finally:
+        agent.llm, agent.decision_cache = saved
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """Names of benchmarks slower than baseline * (1 + threshold)."""
+    return [
+        name
+        for name, us in results.items()
+        if name in baseline and us > baseline[name] * (1 + threshold)
+    ]
+
+
+def _print_results(results: dict[str, float], baseline: dict[str, float]) -> None:
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}} {'us/op':>12} {'baseline':>12} {'change':>8}")
+    for name, us in results.items():
+        if name in baseline:
+            change = f"{(us / baseline[name] - 1) * 100:+.1f}%"
+            print(f"{name:<{width}} {us:>12.2f} {baseline[name]:>12.2f} {change:>8}")
+        else:
+            print(f"{name:<{width}} {us:>12.2f} {'-':>12} {'-':>8}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks containing this")
+    parser.add_argument(
+        "--baseline", default=str(BASELINE_PATH), help="Baseline JSON file"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write results as the baseline"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Exit 1 if any benchmark regressed"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline: dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results: dict[str, float] = {}
+    for name, run in benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        # As timeit does: keep collector pauses out of the measurement
+        gc.collect()
+        gc.disable()
+        try:
+            results[name] = round(run(), 3)
+        finally:
+            gc.enable()
+
+    _print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.check:
+        if not baseline:
+            print(f"\nNo baseline at {args.baseline}", file=sys.stderr)
+            return 1
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(
+                f"\nRegressed by more than {args.threshold:.0%}: {', '.join(regressed)}",
+                file=sys.stderr,
+            )
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Shared test fixtures."""
+
+import json
+import os
+
+# Run the suite offline; tests that need specific outputs install StubLLM
+os.environ.setdefault("LLM_BACKEND", "scripted")
+
+import pytest  # noqa: E402
+from langchain_core.messages import AIMessage, AIMessageChunk  # noqa: E402
+
+from app.agents.llm import ScriptedChatModel  # noqa: E402
+from app.services import task_service  # noqa: E402
+
+
+class StubLLM:
+    """Returns canned decisions (or raw strings) in order and records prompts."""
+
+    def __init__(self, decisions: list[dict | str]):
+        self._outputs = [d if isinstance(d, str) else json.dumps(d) for d in decisions]
+        self.calls: list[list[dict]] = []
+
+    def invoke(self, messages):
+        self.calls.append(list(messages))
+        return AIMessage(content=self._outputs.pop(0))
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+    async def astream(self, messages):
+        self.calls.append(list(messages))
+        output = self._outputs.pop(0)
+        step = max(1, len(output) // 4)
+        for start in range(0, len(output), step):
+            yield AIMessageChunk(content=output[start : start + step])
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    def install(decisions: list[dict | str]) -> StubLLM:
+        llm = StubLLM(decisions)
+        monkeypatch.setattr(task_service._agent, "llm", llm)
+        monkeypatch.setattr(task_service._agent, "decision_cache", None)
+        return llm
+
+    return install
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    """Install a ScriptedChatModel (built from the given kwargs) on the agent."""
+
+    def install(**kwargs) -> ScriptedChatModel:
+        llm = ScriptedChatModel(**kwargs)
+        monkeypatch.setattr(task_service._agent, "llm", llm)
+        monkeypatch.setattr(task_service._agent, "decision_cache", None)
+        return llm
+
+    return install
@@ -0,0 +1,233 @@
+"""Admission control tests."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.admission import AdaptiveLimiter, Overloaded
+from app.resilience import BackoffPolicy, CircuitBreaker
+from app.schemas.task import AgentResponse, ResponseStatus, TaskInput
+from app.services import task_service
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_requests_over_the_limit_wait_in_order():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=10)
+    order: list[int] = []
+
+    async def request(n: int) -> None:
+        async with limiter.slot():
+            order.append(n)
+            await asyncio.sleep(0.01)
+
+    async def run_all() -> None:
+        await asyncio.gather(*(request(n) for n in range(4)))
+
+    asyncio.run(run_all())
+
+    assert order == [0, 1, 2, 3]
+    stats = limiter.stats()
+    assert stats["admitted"] == 4
+    assert stats["queued"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_full_queue_is_rejected_at_once():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=0)
+
+    async def run() -> None:
+        await limiter.acquire()
+        with pytest.raises(Overloaded) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == "queue_full"
+        assert rejected.value.retry_after >= 1
+
+    asyncio.run(run())
+
+    assert limiter.stats()["rejected"]["queue_full"] == 1
+
+
+def test_queue_wait_is_bounded():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=5, queue_timeout=0.02)
+
+    async def run() -> None:
+        await limiter.acquire()
+        with pytest.raises(Overloaded, match="queue_timeout"):
+            await limiter.acquire()
+
+    asyncio.run(run())
+
+    stats = limiter.stats()
+    assert stats["rejected"]["queue_timeout"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=5)
+
+    async def run() -> None:
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+
+    assert limiter.stats()["queue_depth"] == 0
+    assert limiter.in_flight == 1
+
+
+def test_limit_grows_while_saturated_and_fast():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=4, clock=clock)
+    limiter.in_flight = 4
+
+    for _ in range(4):
+        limiter.release(clock.now - 1.0)  # 1 s, same as the baseline
+        limiter.in_flight += 1
+
+    assert 4.9 < limiter.limit < 5.1
+    assert limiter.stats()["increases"] == 4
+
+
+def test_limit_backs_off_once_per_baseline_on_slow_tasks():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=10, clock=clock)
+    limiter.in_flight = 10
+    limiter.release(clock.now - 1.0)  # Baseline 1 s
+
+    for _ in range(3):  # A burst of slow completions counts once
+        limiter.in_flight += 1
+        limiter.release(clock.now - 5.0)
+    assert limiter.stats()["decreases"] == 1
+
+    clock.now += 2.0
+    limiter.in_flight += 1
+    limiter.release(clock.now - 5.0)
+    assert limiter.stats()["decreases"] == 2
+    assert limiter.limit < 10 * 0.9
+
+
+def test_slow_task_on_idle_server_keeps_the_limit():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=10, clock=clock)
+    limiter.in_flight = 1
+    limiter.release(clock.now - 1.0)
+
+    limiter.in_flight = 1
+    limiter.release(clock.now - 10.0)
+
+    assert limiter.limit == 10
+
+
+def test_limit_never_drops_below_min():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=5, min_limit=4, clock=clock)
+    for _ in range(10):
+        limiter.in_flight = 5
+        limiter.release(clock.now, failed=True)
+        clock.now += 100
+
+    assert limiter.limit == 4
+
+
+@pytest.fixture
+def limiter(monkeypatch) -> AdaptiveLimiter:
+    """A one-slot limiter with no queue, used for every task."""
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=0)
+    monkeypatch.setattr(main, "admission", limiter)
+    monkeypatch.setattr(task_service, "admission", limiter)
+    return limiter
+
+
+@pytest.mark.parametrize("path", ["/tasks", "/tasks/stream"])
+def test_task_endpoints_reject_with_429_when_full(limiter, path):
+    limiter.in_flight = 1
+    client = TestClient(main.app)
+
+    response = client.post(path, json={"task": "hello"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/status").json()["admission"]["rejected"]["queue_full"] == 1
+
+
+def test_batch_items_wait_for_a_slot_instead_of_failing(limiter, scripted):
+    scripted()
+    client = TestClient(main.app)
+
+    response = client.post(
+        "/tasks/batch",
+        json={"tasks": [{"task": f"Price PROD-00{n}"} for n in (1, 2, 3)]},
+    )
+
+    assert response.status_code == 200
+    assert all(r["error"] is None for r in response.json()["results"])
+    stats = limiter.stats()
+    assert stats["admitted"] == 3
+    assert stats["rejected"]["queue_full"] == 0
+
+
+def test_disabled_admission_admits_everything():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=0, enabled=False)
+
+    async def run() -> None:
+        async with limiter.slot():
+            async with limiter.slot():
+                pass
+
+    asyncio.run(run())
+    assert limiter.stats()["admitted"] == 0
+
+
+@pytest.mark.parametrize("provider_error", [True, False])
+def test_only_provider_failures_count_as_congestion(
+    monkeypatch, limiter, provider_error
+):
+    async def failed_loop(task_input, emit, stream_tokens):
+        return AgentResponse(
+            status=ResponseStatus.FAILED,
+            message="failed",
+            provider_error=provider_error,
+        )
+
+    monkeypatch.setattr(task_service, "_run_observation_loop", failed_loop)
+    client = TestClient(main.app)
+
+    response = client.post("/tasks", json={"task": "hello"})
+
+    assert response.json()["status"] == "failed"
+    assert "provider_error" not in response.json()
+    assert limiter.stats()["decreases"] == (1 if provider_error else 0)
+
+
+class UnreachableLLM:
+    async def ainvoke(self, messages):
+        raise ConnectionError("provider unreachable")
+
+
+def test_provider_errors_are_flagged_but_parse_failures_are_not(monkeypatch, stub_llm):
+    stub_llm(["not json", "still not json"])
+    parse_failure = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    agent = task_service._agent
+    monkeypatch.setattr(agent, "llm", UnreachableLLM())
+    monkeypatch.setattr(agent, "breaker", CircuitBreaker("llm:test", 100, 30))
+    monkeypatch.setattr(agent, "retry_policy", BackoffPolicy(max_retries=0))
+    provider_failure = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    assert parse_failure.status == provider_failure.status == ResponseStatus.FAILED
+    assert not parse_failure.provider_error
+    assert provider_failure.provider_error
@@ -1,5 +1,7 @@
 """API endpoint tests."""
 
+import json
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -25,6 +27,15 @@ def test_status_endpoint():
     assert "tools" in data
     assert "model" in data["agent"]
     assert "max_iterations" in data["agent"]
+    assert "hits" in data["agent"]["decision_cache"]
+    assert data["agent"]["decision_mode"] == "prompt"
+    assert "max_tokens" in data["agent"]["token_budget"]
+    assert data["agent"]["hedging"]["enabled"] is True
+    assert data["agent"]["rate_limit"]["waiting"] == 0
+    assert data["admission"]["enabled"] is True
+    assert isinstance(data["agent"]["usage"], dict)
+    assert data["agent"]["breaker"]["state"] == "closed"
+    assert isinstance(data["tools"]["breakers"], dict)
     assert "available" in data["tools"]
     assert "count" in data["tools"]
 
@@ -39,3 +50,118 @@ def test_tasks_endpoint_validation():
     # Note: This test requires OPENAI_API_KEY to be set
     # response = client.post("/tasks", json={"task": "What is 2+2?"})
     # assert response.status_code == 200
+
+
+def test_tasks_endpoint_with_scripted_backend(scripted):
+    """/tasks should run end to end offline with the scripted backend."""
+    scripted()
+
+    response = client.post("/tasks", json={"task": "What does PROD-003 cost?"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["data"]["tool_calls"][0]["result"]["price"] == 299.99
+
+
+RESPOND = {"decision_type": "respond", "reasoning": "ok", "message": "done"}
+
+
+def test_tasks_batch_returns_results_in_input_order(stub_llm):
+    """Batch results should come back in input order with timings."""
+    stub_llm([RESPOND] * 3)
+
+    response = client.post(
+        "/tasks/batch",
+        json={"tasks": [{"task": f"task {i}"} for i in range(3)], "concurrency": 2},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert all(item["response"]["status"] == "success" for item in results)
+    assert all(item["duration_ms"] >= 0 for item in results)
+
+
+def test_tasks_batch_isolates_item_failures(stub_llm):
+    """One task failing should not fail the rest of the batch."""
+    stub_llm([RESPOND, "not json", "still not json", RESPOND])
+
+    response = client.post(
+        "/tasks/batch",
+        json={"tasks": [{"task": "a"}, {"task": "b"}, {"task": "c"}], "concurrency": 1},
+    )
+
+    assert response.status_code == 200
+    statuses = [item["response"]["status"] for item in response.json()["results"]]
+    assert statuses == ["success", "failed", "success"]
+
+
+def test_tasks_batch_streams_ndjson(stub_llm):
+    """stream=true should return one JSON line per task."""
+    stub_llm([RESPOND] * 2)
+
+    response = client.post(
+        "/tasks/batch",
+        json={"tasks": [{"task": "a"}, {"task": "b"}], "stream": True},
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in lines) == [0, 1]
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_tasks_stream_emits_progress_events(stub_llm):
+    """The SSE stream should report each step and end with the result."""
+    stub_llm(
+        [
+            {
+                "decision_type": "use_tool",
+                "reasoning": "secret plan",
+                "tool_call": {
+                    "tool_name": "get_pricing",
+                    "arguments": {"product_id": "PROD-001"},
+                },
+            },
+            RESPOND,
+        ]
+    )
+
+    response = client.post("/tasks/stream", json={"task": "Price?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names == [
+        "iteration",
+        "decision",
+        "tool_call",
+        "observation",
+        "iteration",
+        "decision",
+        "result",
+    ]
+    assert "reasoning" not in events[1][1]
+    assert events[3][1]["result"]["price"] == 29.99
+    assert events[-1][1]["status"] == "success"
+
+
+def test_tasks_stream_forwards_tokens(stub_llm):
+    """With tokens=true the raw LLM output should arrive as token events."""
+    stub_llm([RESPOND])
+
+    response = client.post("/tasks/stream?tokens=true", json={"task": "hi"})
+
+    events = _parse_sse(response.text)
+    text = "".join(data["text"] for name, data in events if name == "token")
+    assert json.loads(text) == RESPOND
+    assert events[-1][0] == "result"
@@ -0,0 +1,11 @@
+"""Benchmark suite regression check tests."""
+
+from benchmarks.suite import compare
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    """Benchmarks within the threshold, faster, or new should pass."""
+    baseline = {"a": 10.0, "b": 10.0, "c": 10.0}
+    results = {"a": 12.4, "b": 12.6, "c": 5.0, "new": 99.0}
+
+    assert compare(results, baseline, threshold=0.25) == ["b"]
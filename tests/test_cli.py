@@ -0,0 +1,137 @@
+"""Batch runner CLI tests."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app import cli
+from app.cli import Checkpoint, main, run_batch
+
+RESPOND = {"decision_type": "respond", "reasoning": "ok", "message": "done"}
+
+
+def _write_tasks(path, count: int) -> None:
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({"id": f"t{i}", "task": f"task {i}"}) + "\n")
+        f.write("{not json}\n")
+
+
+def _read_lines(path) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_batch_writes_one_record_per_line(tmp_path, stub_llm):
+    """Every input line should produce exactly one output record."""
+    stub_llm([RESPOND] * 5)
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_tasks(source, 5)
+
+    stats = asyncio.run(run_batch(str(source), str(target), workers=3))
+
+    records = _read_lines(target)
+    assert sorted(r["line"] for r in records) == list(range(6))
+    assert {r["id"] for r in records if "id" in r} == {f"t{i}" for i in range(5)}
+    assert stats.statuses == {"success": 5, "invalid": 1}
+    assert not (tmp_path / "out.jsonl.checkpoint").exists()
+
+
+def test_run_batch_resumes_from_checkpoint(tmp_path, stub_llm):
+    """A resumed run should skip finished lines and drop unrecorded output."""
+    llm = stub_llm([RESPOND] * 3)
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_tasks(source, 4)
+
+    done = "".join(
+        json.dumps({"line": line, "status": "success"}) + "\n" for line in (0, 3)
+    )
+    target.write_text(done + '{"line": 2, "partial": tru')
+    checkpoint = Checkpoint(output_offset=len(done), next_line=1, done_above={3})
+    checkpoint.save(str(tmp_path / "out.jsonl.checkpoint"))
+
+    asyncio.run(run_batch(str(source), str(target), workers=2))
+
+    records = _read_lines(target)
+    assert sorted(r["line"] for r in records) == [0, 1, 2, 3, 4]
+    assert len(llm.calls) == 2
+
+
+def test_cli_refuses_to_clobber_output(tmp_path, capsys):
+    """An existing output without checkpoint needs --overwrite."""
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_tasks(source, 1)
+    target.write_text("keep me\n")
+
+    assert main([str(source), "-o", str(target)]) == 2
+    assert target.read_text() == "keep me\n"
+    assert "--overwrite" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("workers", ["0", "-1"])
+def test_cli_rejects_fewer_than_one_worker(tmp_path, workers, capsys):
+    """--workers below 1 would never process a line, so it is refused."""
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_tasks(source, 1)
+
+    with pytest.raises(SystemExit) as exc:
+        main([str(source), "-o", str(target), "--workers", workers])
+
+    assert exc.value.code == 2
+    assert "--workers must be at least 1" in capsys.readouterr().err
+    assert not target.exists()
+
+
+def test_output_and_checkpoints_are_written_off_the_event_loop(
+    tmp_path, stub_llm, monkeypatch
+):
+    """Writes and fsyncs should run in a thread, never on the loop's thread."""
+    stub_llm([RESPOND] * 4)
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_tasks(source, 4)
+    threads: set[int] = set()
+    save = cli._save_checkpoint
+
+    def record(output, checkpoint, path):
+        threads.add(threading.get_ident())
+        save(output, checkpoint, path)
+
+    monkeypatch.setattr(cli, "_save_checkpoint", record)
+
+    asyncio.run(run_batch(str(source), str(target), workers=2, checkpoint_every=1))
+
+    assert threads and threading.get_ident() not in threads
+    assert sorted(r["line"] for r in _read_lines(target)) == list(range(5))
+
+
+@pytest.mark.parametrize("line", [5, 6])
+def test_checkpoint_watermark_advances(line):
+    """Out-of-order completions should fold into the watermark."""
+    checkpoint = Checkpoint(next_line=5)
+    checkpoint.mark_done(line)
+
+    assert checkpoint.is_done(line)
+    assert checkpoint.next_line == (6 if line == 5 else 5)
+
+
+def test_blank_lines_advance_the_watermark(tmp_path, stub_llm, monkeypatch):
+    """Skipped blank lines should count as done, not pile up in done_above."""
+    stub_llm([RESPOND] * 2)
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    source.write_text('\n{"task": "a"}\n\n\n{"task": "b"}\n\n')
+    saved: list[Checkpoint] = []
+    save = cli._save_checkpoint
+
+    def record(output, checkpoint, path):
+        saved.append(checkpoint)
+        save(output, checkpoint, path)
+
+    monkeypatch.setattr(cli, "_save_checkpoint", record)
+
+    asyncio.run(run_batch(str(source), str(target), workers=2))
+
+    assert saved[-1].next_line == 6
+    assert saved[-1].done_above == set()
+    assert len(_read_lines(target)) == 2
@@ -0,0 +1,79 @@
+"""Conversation history tests."""
+
+import json
+
+import pytest
+
+from app.agents.conversation import Conversation
+from app.schemas.task import (
+    AgentDecision,
+    DecisionType,
+    Observation,
+    TaskInput,
+    ToolCall,
+)
+
+
+def _use_tool(product_id: str) -> AgentDecision:
+    return AgentDecision(
+        decision_type=DecisionType.USE_TOOL,
+        reasoning="need price",
+        tool_call=ToolCall(
+            tool_name="get_pricing", arguments={"product_id": product_id}
+        ),
+    )
+
+
+def test_conversation_starts_with_task():
+    """A new conversation should hold only the task message."""
+    conversation = Conversation(TaskInput(task="Hello", context={"a": 1}))
+
+    assert len(conversation.messages) == 1
+    assert conversation.messages[0]["role"] == "user"
+    assert conversation.messages[0]["content"].startswith("Task: Hello")
+
+
+def test_conversation_replays_real_tool_arguments():
+    """Assistant turns should carry the arguments the model actually sent."""
+    conversation = Conversation(TaskInput(task="Price?"))
+    conversation.add_decision(_use_tool("PROD-002"))
+
+    replayed = json.loads(conversation.messages[-1]["content"])
+    assert replayed["tool_call"]["arguments"] == {"product_id": "PROD-002"}
+
+
+def test_conversation_appends_without_rewriting_history():
+    """Each turn should append messages and leave earlier ones untouched."""
+    conversation = Conversation(TaskInput(task="Prices?"))
+    conversation.add_decision(_use_tool("PROD-001"))
+    conversation.add_observations(
+        [
+            Observation(tool_name="get_pricing", success=True, result={"p": 1}),
+            Observation(tool_name="get_pricing", success=False, error="boom"),
+        ]
+    )
+    before = list(conversation.messages)
+
+    conversation.add_decision(_use_tool("PROD-003"))
+
+    assert len(before) == 3
+    assert all(a is b for a, b in zip(before, conversation.messages))
+    assert "boom" in before[2]["content"]
+    assert len(conversation.observations) == 2
+
+
+def test_prefetched_results_extend_the_task_message():
+    """Prefetched results belong to the task message, before any decision."""
+    conversation = Conversation(TaskInput(task="Price?", context={"id": 1}))
+    conversation.add_prefetched(
+        [Observation(tool_name="get_pricing", success=True, result={"p": 1})]
+    )
+
+    assert len(conversation.messages) == 1
+    assert conversation.messages[0]["content"].startswith("Task: Price?")
+    assert '{"p":1}' in conversation.messages[0]["content"]
+    assert len(conversation.observations) == 1
+
+    conversation.add_decision(_use_tool("PROD-001"))
+    with pytest.raises(RuntimeError):
+        conversation.add_prefetched([])
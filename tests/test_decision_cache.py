@@ -0,0 +1,151 @@
+"""Decision cache tests."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents.decision_cache import (
+    DecisionCache,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+)
+from app.schemas.task import AgentDecision, DecisionType, TaskInput
+from app.services import task_service
+
+MESSAGES = [{"role": "user", "content": "Task: hello"}]
+DECISION = AgentDecision(
+    decision_type=DecisionType.RESPOND, reasoning="hi", message="Hello!"
+)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    """The LRU should drop the least recently read entry first."""
+    backend = MemoryCacheBackend(max_entries=2, ttl_seconds=60)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+    assert backend.get("c") == "3"
+
+
+def test_memory_backend_expires_entries():
+    """Entries older than the TTL should be treated as missing."""
+    backend = MemoryCacheBackend(max_entries=10, ttl_seconds=0)
+    backend.set("a", "1")
+
+    assert backend.get("a") is None
+
+
+def test_cache_key_depends_on_model_mode_and_messages():
+    """Changing model, decision mode or messages should change the key."""
+    cache = DecisionCache("gpt-4o-mini", 0.0, MemoryCacheBackend(10, 60))
+    other_model = DecisionCache("gpt-4o", 0.0, MemoryCacheBackend(10, 60))
+
+    assert cache.key(MESSAGES) == cache.key([dict(m) for m in MESSAGES])
+    assert cache.key(MESSAGES) != other_model.key(MESSAGES)
+    assert cache.key(MESSAGES) != cache.key(MESSAGES + MESSAGES)
+    assert cache.key(MESSAGES, "prompt") != cache.key(MESSAGES, "tools")
+    assert cache.key(MESSAGES, "json_schema") != cache.key(MESSAGES, "tools")
+
+
+def test_sqlite_backend_shares_hits_between_caches(tmp_path):
+    """Two caches on the same SQLite file should see each other's entries."""
+    path = str(tmp_path / "decisions.db")
+    writer = DecisionCache(
+        "m", 0.0, MemoryCacheBackend(10, 60), SQLiteCacheBackend(path, 10, 60)
+    )
+    reader = DecisionCache(
+        "m", 0.0, MemoryCacheBackend(10, 60), SQLiteCacheBackend(path, 10, 60)
+    )
+
+    key = writer.key(MESSAGES)
+    writer.put(key, DECISION)
+    writer.flush()
+
+    assert reader.get(key) == DECISION
+    assert reader.stats()["hits"] == 1
+
+
+class ThreadCheckingBackend(MemoryCacheBackend):
+    """Records the threads it is read from."""
+
+    def __init__(self) -> None:
+        super().__init__(max_entries=10, ttl_seconds=60)
+        self.threads: list[int] = []
+
+    def get(self, key: str) -> str | None:
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+
+def test_async_lookup_reads_shared_backend_off_the_event_loop():
+    """aget should hit the shared backend in a thread and fill the LRU."""
+    shared = ThreadCheckingBackend()
+    cache = DecisionCache("m", 0.0, MemoryCacheBackend(10, 60), shared)
+    key = cache.key(MESSAGES)
+    shared.set(key, DECISION.model_dump_json())
+
+    async def lookup() -> tuple[AgentDecision | None, int]:
+        return await cache.aget(key), threading.get_ident()
+
+    decision, loop_thread = asyncio.run(lookup())
+
+    assert decision == DECISION
+    assert shared.threads and loop_thread not in shared.threads
+    assert cache.memory.get(key) is not None
+    assert cache.stats()["hits"] == 1
+
+
+class OrderingLLM:
+    """Orders on the first turn, then responds once it has an observation."""
+
+    ORDER = {
+        "decision_type": "use_tool",
+        "reasoning": "order it",
+        "tool_call": {
+            "tool_name": "create_order",
+            "arguments": {"product_id": "PROD-001", "quantity": 1, "customer_id": "C1"},
+        },
+    }
+    DONE = {"decision_type": "respond", "reasoning": "ok", "message": "done"}
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        first_turn = messages[-1]["content"].startswith("Task:")
+        return AIMessage(content=json.dumps(self.ORDER if first_turn else self.DONE))
+
+    async def astream(self, messages):
+        yield await self.ainvoke(messages)
+
+
+@pytest.fixture
+def cached_agent(monkeypatch):
+    cache = DecisionCache("m", 0.0, MemoryCacheBackend(100, 60))
+    monkeypatch.setattr(task_service._agent, "decision_cache", cache)
+    return cache
+
+
+def test_cached_use_tool_still_executes_side_effects(monkeypatch, cached_agent):
+    """A cache hit on a USE_TOOL decision must still run the tool."""
+    llm = OrderingLLM()
+    monkeypatch.setattr(task_service._agent, "llm", llm)
+    task = TaskInput(task="Order PROD-001 for CUST-1")
+
+    first = asyncio.run(task_service.process_task(task))
+    second = asyncio.run(task_service.process_task(task))
+
+    assert first.data is not None and second.data is not None
+    first_order = first.data["tool_calls"][0]["result"]["order_id"]
+    second_order = second.data["tool_calls"][0]["result"]["order_id"]
+    assert first_order != second_order
+    assert cached_agent.hits == 1
+    assert llm.calls == 3
@@ -0,0 +1,148 @@
+"""Structured-output and native tool-calling decision mode tests."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents.decision_modes import (
+    FINAL_DECISION_FUNCTION,
+    decision_from_tool_calls,
+    decision_json_schema,
+    tool_definitions,
+)
+from app.agents.llm import ScriptedChatModel, ScriptedRule
+from app.schemas.task import DecisionType, ResponseStatus, TaskInput
+from app.services import task_service
+from app.tools import registry
+
+
+@pytest.fixture
+def agent_mode(monkeypatch):
+    def install(mode: str, llm: ScriptedChatModel):
+        agent = task_service.get_agent()
+        monkeypatch.setattr(agent, "decision_mode", mode)
+        monkeypatch.setattr(agent, "llm", llm)
+        monkeypatch.setattr(agent, "decision_cache", None)
+        monkeypatch.setattr(agent, "parse_stats", {})
+        return agent
+
+    return install
+
+
+def test_json_schema_ties_tool_calls_to_input_models():
+    """Each ToolCall variant should carry its tool's argument schema."""
+    schema = decision_json_schema(registry.tools)
+
+    variants = {
+        v["properties"]["tool_name"]["const"]: v["properties"]["arguments"]
+        for v in schema["$defs"]["ToolCall"]["anyOf"]
+    }
+    assert set(variants) == set(registry.tool_names)
+    assert variants["get_pricing"]["required"] == ["product_id"]
+    assert schema["required"] == ["decision_type", "reasoning"]
+
+
+def test_tool_definitions_add_final_decision_function():
+    """Every tool plus the final-decision function should be offered."""
+    names = [d["function"]["name"] for d in tool_definitions(registry.tools)]
+
+    assert names == [*registry.tool_names, FINAL_DECISION_FUNCTION]
+
+
+def test_decision_from_tool_calls():
+    """Native calls should map to USE_TOOL, final_decision to its type."""
+    single = AIMessage(
+        content="",
+        tool_calls=[{"name": "get_pricing", "args": {"product_id": "P"}, "id": "1"}],
+    )
+    several = AIMessage(
+        content="look both up",
+        tool_calls=[
+            {"name": "get_pricing", "args": {"product_id": "A"}, "id": "1"},
+            {"name": "get_pricing", "args": {"product_id": "B"}, "id": "2"},
+        ],
+    )
+    final = AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": FINAL_DECISION_FUNCTION,
+                "args": {"decision_type": "clarify", "reasoning": "r", "message": "?"},
+                "id": "1",
+            }
+        ],
+    )
+
+    decision = decision_from_tool_calls(single)
+    assert decision.decision_type == DecisionType.USE_TOOL
+    assert decision.tool_call is not None
+    assert decision.tool_call.arguments == {"product_id": "P"}
+
+    decision = decision_from_tool_calls(several)
+    assert [c.arguments["product_id"] for c in decision.tool_calls] == ["A", "B"]
+    assert decision.reasoning == "look both up"
+
+    decision = decision_from_tool_calls(final)
+    assert decision.decision_type == DecisionType.CLARIFY
+    assert decision.message == "?"
+
+
+def test_invalid_tool_call_arguments_raise():
+    """Unparseable native call arguments should trigger a retry."""
+    message = AIMessage(
+        content="",
+        invalid_tool_calls=[
+            {"name": "get_pricing", "args": "{", "id": "1", "error": "bad json"}
+        ],
+    )
+
+    with pytest.raises(ValueError, match="bad json"):
+        decision_from_tool_calls(message)
+
+
+@pytest.mark.parametrize("stream_tokens", [False, True])
+def test_tools_mode_end_to_end(agent_mode, stream_tokens):
+    """Tools mode should run the loop without any parse retries."""
+    agent = agent_mode("tools", ScriptedChatModel())
+
+    response = asyncio.run(
+        task_service.process_task(
+            TaskInput(task="Price of PROD-001?"), stream_tokens=stream_tokens
+        )
+    )
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert response.data is not None
+    assert response.data["tool_calls"][0]["result"]["price"] == 29.99
+    assert agent.parse_stats_summary()["tools"] == {
+        "requests": 2,
+        "retries": 0,
+        "failures": 0,
+        "retry_rate": 0.0,
+    }
+
+
+def test_text_answer_falls_back_to_prompt_parsing(agent_mode):
+    """Plain-text answers in tools mode should use the prompt-mode parser."""
+    agent = agent_mode("tools", ScriptedChatModel(rules=[ScriptedRule(output="nope")]))
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    assert response.status == ResponseStatus.FAILED
+    stats = agent.parse_stats_summary()["tools"]
+    assert stats["retries"] == 1
+    assert stats["failures"] == 1
+
+
+def test_json_schema_mode_binds_response_format(agent_mode):
+    """json_schema mode should bind the schema once per registry version."""
+    agent = agent_mode("json_schema", ScriptedChatModel())
+
+    bound = agent.decision_llm
+
+    assert bound.kwargs["response_format"]["json_schema"]["name"] == "agent_decision"
+    assert agent.decision_llm is bound
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="PROD-002?")))
+    assert response.status == ResponseStatus.SUCCESS
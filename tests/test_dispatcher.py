@@ -0,0 +1,195 @@
+"""Dispatcher tests."""
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from app.agents import dispatcher
+from app.agents.dispatcher import dispatch_tool, dispatch_tools
+from app.schemas.task import ToolCall
+from app.tools import BaseTool, ToolResult, registry
+
+
+class RecordingTool(BaseTool):
+    """Sleeps briefly and records the order in which calls start."""
+
+    description = "Test tool"
+
+    def __init__(self, name: str, has_side_effects: bool, log: list[str]):
+        self.name = name
+        self.has_side_effects = has_side_effects
+        self._log = log
+
+    def execute(self, **kwargs: Any) -> ToolResult:
+        raise NotImplementedError
+
+    async def aexecute(self, **kwargs: Any) -> ToolResult:
+        self._log.append(f"{self.name}:{kwargs.get('n')}")
+        await asyncio.sleep(0.05)
+        return ToolResult(success=True, data=kwargs)
+
+
+@pytest.fixture
+def call_log(monkeypatch) -> list[str]:
+    log: list[str] = []
+    monkeypatch.setitem(
+        registry._tools, "slow_lookup", RecordingTool("slow_lookup", False, log)
+    )
+    monkeypatch.setitem(
+        registry._tools, "slow_write", RecordingTool("slow_write", True, log)
+    )
+    return log
+
+
+def test_dispatch_tool_unknown_tool():
+    """Unknown tools should fail with a structured result, not raise."""
+    result = asyncio.run(dispatch_tool(ToolCall(tool_name="nope")))
+
+    assert result.success is False
+    assert result.error is not None
+    assert "Unknown tool" in result.error
+
+
+def test_dispatch_tools_runs_read_only_calls_concurrently(call_log):
+    """Side-effect-free calls should overlap instead of running back to back."""
+    calls = [ToolCall(tool_name="slow_lookup", arguments={"n": i}) for i in range(5)]
+
+    start = time.perf_counter()
+    results = asyncio.run(dispatch_tools(calls))
+    elapsed = time.perf_counter() - start
+
+    assert [r.data for r in results] == [{"n": i} for i in range(5)]
+    assert elapsed < 0.2
+
+
+def test_dispatch_tools_keeps_side_effect_order(call_log):
+    """Calls with side effects should run one at a time in the order given."""
+    calls = [
+        ToolCall(tool_name="slow_write", arguments={"n": 1}),
+        ToolCall(tool_name="slow_lookup", arguments={"n": 2}),
+        ToolCall(tool_name="slow_write", arguments={"n": 3}),
+        ToolCall(tool_name="get_pricing", arguments={"product_id": "PROD-003"}),
+    ]
+
+    results = asyncio.run(dispatch_tools(calls))
+
+    writes = [entry for entry in call_log if entry.startswith("slow_write")]
+    assert writes == ["slow_write:1", "slow_write:3"]
+    assert results[0].data == {"n": 1}
+    assert results[3].data is not None
+    assert results[3].data["product_id"] == "PROD-003"
+
+
+def test_dispatch_tools_never_reads_during_an_earlier_write(call_log):
+    """Reads should batch only between writes, in request order."""
+    calls = [
+        ToolCall(tool_name="slow_lookup", arguments={"n": 1}),
+        ToolCall(tool_name="slow_lookup", arguments={"n": 2}),
+        ToolCall(tool_name="slow_write", arguments={"n": 3}),
+        ToolCall(tool_name="slow_lookup", arguments={"n": 4}),
+        ToolCall(tool_name="slow_lookup", arguments={"n": 5}),
+    ]
+
+    start = time.perf_counter()
+    asyncio.run(dispatch_tools(calls))
+    elapsed = time.perf_counter() - start
+
+    assert call_log[2] == "slow_write:3"
+    assert set(call_log[:2]) == {"slow_lookup:1", "slow_lookup:2"}
+    assert 0.15 <= elapsed < 0.3  # Three steps of 0.05 s
+
+
+def test_dispatch_tools_redoes_early_reads_after_a_write(call_log):
+    """A read started early must not be reused once a write precedes it."""
+    write = ToolCall(tool_name="slow_write", arguments={"n": 1})
+    read = ToolCall(tool_name="slow_lookup", arguments={"n": 2})
+
+    async def run() -> None:
+        pending = dispatcher.PendingToolCalls()
+        pending.start(read)
+        await dispatch_tools([write, read], pending)
+        assert len(pending) == 1
+        pending.discard()
+
+    asyncio.run(run())
+
+    assert call_log.count("slow_lookup:2") == 2
+    assert call_log[-1] == "slow_lookup:2"
+
+
+class LookupInput(BaseModel):
+    key: str
+
+
+class CountingLookupTool(BaseTool):
+    """Read-only tool with a result cache that counts real executions."""
+
+    name = "counting_lookup"
+    description = "Test tool"
+    input_model = LookupInput
+    cache_ttl_seconds = 60.0
+
+    def __init__(self, has_side_effects: bool = False):
+        self.has_side_effects = has_side_effects
+        self.executions = 0
+
+    def execute(self, **kwargs: Any) -> ToolResult:
+        raise NotImplementedError
+
+    async def aexecute(self, **kwargs: Any) -> ToolResult:
+        self.executions += 1
+        await asyncio.sleep(0.02)
+        return ToolResult(success=True, data={"key": kwargs["key"]})
+
+
+@pytest.fixture
+def counting_tool(monkeypatch):
+    def install(has_side_effects: bool = False) -> CountingLookupTool:
+        tool = CountingLookupTool(has_side_effects)
+        monkeypatch.setitem(registry._tools, tool.name, tool)
+        monkeypatch.setattr(dispatcher, "_result_caches", {})
+        return tool
+
+    return install
+
+
+def test_dispatch_tool_serves_repeat_calls_from_cache(counting_tool):
+    """A repeated read-only call should not execute the tool again."""
+    tool = counting_tool()
+    call = ToolCall(tool_name=tool.name, arguments={"key": "a"})
+
+    first = asyncio.run(dispatch_tool(call))
+    second = asyncio.run(dispatch_tool(call))
+
+    assert first == second
+    assert tool.executions == 1
+    stats = dispatcher.result_cache_stats()[tool.name]
+    assert stats["hits"] == 1
+    assert stats["saved_latency_ms"] > 0
+
+
+def test_dispatch_tool_coalesces_concurrent_lookups(counting_tool):
+    """Identical concurrent calls should share a single execution."""
+    tool = counting_tool()
+    calls = [ToolCall(tool_name=tool.name, arguments={"key": "a"})] * 5
+
+    results = asyncio.run(dispatch_tools(calls))
+
+    assert all(r.data == {"key": "a"} for r in results)
+    assert tool.executions == 1
+    assert dispatcher.result_cache_stats()[tool.name]["coalesced"] == 4
+
+
+def test_dispatch_tool_never_caches_side_effects(counting_tool):
+    """Tools with side effects should run every time even if they set a TTL."""
+    tool = counting_tool(has_side_effects=True)
+    call = ToolCall(tool_name=tool.name, arguments={"key": "a"})
+
+    asyncio.run(dispatch_tool(call))
+    asyncio.run(dispatch_tool(call))
+
+    assert tool.executions == 2
+    assert tool.name not in dispatcher.result_cache_stats()
@@ -0,0 +1,171 @@
+"""Hedged LLM call tests."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.agents.hedging import HEDGE_MIN_SAMPLES, Hedger
+
+
+def primed(**kwargs) -> Hedger:
+    """A hedger that has seen enough 10 ms calls to hedge after min_delay."""
+    hedger = Hedger(min_delay=0.02, **kwargs)
+    for _ in range(HEDGE_MIN_SAMPLES):
+        hedger.observe(0.01)
+    return hedger
+
+
+def slow_then_fast(cancelled: list[int] | None = None):
+    """The first attempt hangs, later ones answer at once."""
+    attempts: list[int] = []
+
+    async def call(claim) -> str:
+        attempt = len(attempts)
+        attempts.append(attempt)
+        try:
+            await asyncio.sleep(0.3 if attempt == 0 else 0)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(attempt)
+            raise
+        return f"attempt {attempt}"
+
+    return call, attempts
+
+
+def test_no_hedging_until_latencies_are_known():
+    hedger = Hedger(min_delay=0.0)
+
+    assert hedger.hedge_delay() is None
+    for _ in range(HEDGE_MIN_SAMPLES):
+        hedger.observe(0.5)
+    assert hedger.hedge_delay() == 0.5
+
+
+def test_hedge_delay_is_the_configured_percentile():
+    hedger = Hedger(min_delay=0.0, percentile=90)
+    for ms in range(1, 101):
+        hedger.observe(ms / 1000)
+
+    assert hedger.hedge_delay() == pytest.approx(0.091)
+
+
+def test_slow_call_is_hedged_and_loser_cancelled():
+    hedger = primed()
+    cancelled: list[int] = []
+    call, attempts = slow_then_fast(cancelled)
+
+    start = time.perf_counter()
+    result = asyncio.run(hedger.run(call))
+
+    assert result == "attempt 1"
+    assert time.perf_counter() - start < 1
+    assert attempts == [0, 1]
+    assert cancelled == [0]
+    stats = hedger.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_won"] == 1
+
+
+def test_fast_call_is_not_hedged():
+    hedger = primed()
+
+    async def call(claim) -> str:
+        return "ok"
+
+    assert asyncio.run(hedger.run(call)) == "ok"
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_hedge_rate_is_capped():
+    """With no budget earned, only the initial burst may be spent."""
+    hedger = primed(max_rate=0.0)
+
+    for _ in range(3):
+        call, _ = slow_then_fast()
+        asyncio.run(hedger.run(call))
+
+    stats = hedger.stats()
+    assert stats["hedged"] == 2
+    assert stats["rate_limited"] == 1
+
+
+def test_failed_primary_falls_back_to_hedge():
+    """A hedge still running when the primary fails can answer instead."""
+    hedger = primed()
+    attempts: list[int] = []
+
+    async def call(claim) -> str:
+        attempt = len(attempts)
+        attempts.append(attempt)
+        await asyncio.sleep(0.05)
+        if attempt == 0:
+            raise ConnectionError("reset")
+        return "hedge"
+
+    assert asyncio.run(hedger.run(call)) == "hedge"
+
+
+def test_call_past_deadline_times_out():
+    hedger = Hedger(timeout=0.05, enabled=False)
+
+    async def call(claim) -> str:
+        await asyncio.sleep(5)
+        return "late"
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(hedger.run(call))
+    assert hedger.stats()["timeouts"] == 1
+
+
+def test_timeout_raised_by_the_call_is_not_a_deadline():
+    hedger = Hedger(timeout=5, enabled=False)
+
+    async def call(claim) -> str:
+        raise TimeoutError("read timeout")
+
+    with pytest.raises(TimeoutError, match="read timeout"):
+        asyncio.run(hedger.run(call))
+    assert hedger.stats()["timeouts"] == 0
+
+
+def test_streamed_attempt_claims_on_first_chunk():
+    """Once an attempt claims, the other stops before forwarding anything."""
+    hedger = primed()
+    forwarded: list[str] = []
+
+    async def call(claim) -> str:
+        attempt = hedger.counts["hedged"]
+        await asyncio.sleep(0.1 if attempt == 0 else 0.0)  # First chunk
+        claim()
+        for token in ("a", "b"):
+            forwarded.append(f"{attempt}{token}")
+            await asyncio.sleep(0.01)
+        return f"attempt {attempt}"
+
+    assert asyncio.run(hedger.run(call)) == "attempt 1"
+    assert forwarded == ["1a", "1b"]
+
+
+def test_run_sync_hedges_blocking_calls():
+    hedger = primed()
+    calls: list[int] = []
+
+    def call() -> str:
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    assert hedger.run_sync(call) == "hedge"
+    assert hedger.stats()["hedge_won"] == 1
+
+
+def test_run_sync_times_out():
+    hedger = Hedger(timeout=0.05, enabled=False)
+
+    with pytest.raises(TimeoutError):
+        hedger.run_sync(lambda: time.sleep(0.5))
+    assert hedger.stats()["timeouts"] == 1
@@ -0,0 +1,240 @@
+"""Job queue tests."""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.task import Job, JobStatus, TaskRequest
+from app.services.job_service import JobQueue
+from app.services.job_store import MemoryJobStore, SQLiteJobStore
+
+RESPOND = {"decision_type": "respond", "reasoning": "ok", "message": "done"}
+
+
+def _wait_for(client: TestClient, job_id: str) -> dict:
+    for _ in range(100):
+        body = client.get(f"/jobs/{job_id}").json()
+        if body["status"] in ("completed", "failed"):
+            return body
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submit_and_poll_job(stub_llm):
+    """POST /jobs should return an id whose result can be polled."""
+    stub_llm([RESPOND])
+
+    with TestClient(app) as client:
+        submitted = client.post("/jobs", json={"task": "hello"})
+        assert submitted.status_code == 202
+        job = _wait_for(client, submitted.json()["job_id"])
+        stats = client.get("/status").json()["jobs"]
+
+    assert job["status"] == "completed"
+    assert job["result"]["message"] == "done"
+    assert job["started_at"] >= job["created_at"]
+    assert stats["completed"] >= 1
+    assert "queue_depth" in stats
+
+
+def test_unknown_job_returns_404():
+    """Polling an unknown id should return 404."""
+    with TestClient(app) as client:
+        assert client.get("/jobs/does-not-exist").status_code == 404
+
+
+def test_sqlite_store_requeues_unfinished_jobs(tmp_path, stub_llm):
+    """Jobs left queued or running before a restart should be processed."""
+    stub_llm([RESPOND, RESPOND])
+    path = str(tmp_path / "jobs.db")
+    store = SQLiteJobStore(path)
+    for job_id, status in (("a", JobStatus.QUEUED), ("b", JobStatus.RUNNING)):
+        store.create(
+            Job(
+                job_id=job_id,
+                status=status,
+                task=TaskRequest(task=job_id),
+                created_at=time.time(),
+            )
+        )
+
+    async def restart_and_drain() -> None:
+        queue = JobQueue(SQLiteJobStore(path), workers=2)
+        await queue.start()
+        for _ in range(100):
+            if queue.stats()["completed"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(restart_and_drain())
+
+    for job_id in ("a", "b"):
+        job = SQLiteJobStore(path).get(job_id)
+        assert job is not None
+        assert job.status == JobStatus.COMPLETED
+
+
+def _job(job_id: str, status: JobStatus = JobStatus.QUEUED, created: float = 0.0):
+    return Job(
+        job_id=job_id, status=status, task=TaskRequest(task="t"), created_at=created
+    )
+
+
+def test_memory_store_recovers_unfinished_oldest_first():
+    """recover should skip finished jobs and keep submission order."""
+    store = MemoryJobStore()
+    for job_id, status, created in (
+        ("new", JobStatus.QUEUED, 2.0),
+        ("done", JobStatus.COMPLETED, 0.0),
+        ("old", JobStatus.RUNNING, 1.0),
+    ):
+        store.create(_job(job_id, status, created))
+
+    assert [job.job_id for job in store.recover()] == ["old", "new"]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_a_job_is_claimed_once(tmp_path, backend):
+    store = (
+        MemoryJobStore()
+        if backend == "memory"
+        else SQLiteJobStore(str(tmp_path / "jobs.db"))
+    )
+    store.create(_job("a"))
+
+    claimed = store.claim("a", "worker-1", 60)
+    assert claimed is not None
+    assert claimed.status == JobStatus.RUNNING
+    assert store.claim("a", "worker-2", 60) is None
+
+
+def test_sqlite_claims_are_atomic_across_connections(tmp_path):
+    """Two processes sharing the database never both run a job."""
+    path = str(tmp_path / "jobs.db")
+    first, second = SQLiteJobStore(path), SQLiteJobStore(path)
+    first.create(_job("a"))
+
+    with ThreadPoolExecutor(2) as pool:
+        claims = list(
+            pool.map(
+                lambda store: store.claim("a", str(id(store)), 60), [first, second]
+            )
+        )
+
+    assert sum(claim is not None for claim in claims) == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_only_expired_or_own_running_jobs_are_recovered(tmp_path, backend):
+    store = (
+        MemoryJobStore()
+        if backend == "memory"
+        else SQLiteJobStore(str(tmp_path / "jobs.db"))
+    )
+    for created, job_id in enumerate(("mine", "theirs", "dead")):
+        store.create(_job(job_id, created=created))
+    store.claim("mine", "me", 60)
+    store.claim("theirs", "other", 60)
+    store.claim("dead", "crashed", -1)  # Lease already expired
+
+    assert [job.job_id for job in store.recover()] == ["dead"]
+    assert store.renew("theirs", "other", 60)
+    assert not store.renew("dead", "crashed", 60)
+
+    assert [job.job_id for job in store.recover("me")] == ["mine", "dead"]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_a_recovered_job_only_takes_its_new_owners_result(tmp_path, backend):
+    store = (
+        MemoryJobStore()
+        if backend == "memory"
+        else SQLiteJobStore(str(tmp_path / "jobs.db"))
+    )
+    store.create(_job("a"))
+    stale = store.claim("a", "slow", -1)  # Lease already expired
+    store.recover()
+    rerun = store.claim("a", "fast", 60)
+    assert stale is not None and rerun is not None
+
+    done = {"status": JobStatus.COMPLETED}
+    assert store.update(rerun.model_copy(update={**done, "error": None}), "fast")
+    assert not store.update(stale.model_copy(update={**done, "error": "x"}), "slow")
+
+    job = store.get("a")
+    assert job is not None
+    assert job.status == JobStatus.COMPLETED and job.error is None
+
+
+def test_memory_store_forgets_finished_jobs():
+    store = MemoryJobStore(retention_seconds=3600, max_finished=2)
+    for job_id in ("a", "b", "c"):
+        store.create(_job(job_id))
+        job = store.claim(job_id, "me", 60)
+        assert job is not None
+        assert store.update(
+            job.model_copy(update={"status": JobStatus.COMPLETED}), "me"
+        )
+    store.create(_job("queued"))
+
+    assert store.get("a") is None  # Over the cap
+    assert store.get("c") is not None
+    assert store.get("queued") is not None
+
+    store.retention_seconds = 0
+    assert store.get("c") is None  # Past retention
+    assert store.get("queued") is not None  # Unfinished jobs are never dropped
+
+
+class LockedOnceStore(SQLiteJobStore):
+    """Raises like a locked database on the first claim and update."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.failures = {"claim", "update"}
+
+    def _fail_once(self, call: str) -> None:
+        if call in self.failures:
+            self.failures.discard(call)
+            raise sqlite3.OperationalError("database is locked")
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Job | None:
+        self._fail_once("claim")
+        return super().claim(job_id, owner, lease_seconds)
+
+    def update(self, job: Job, owner: str) -> bool:
+        self._fail_once("update")
+        return super().update(job, owner)
+
+
+def test_store_errors_do_not_stop_the_workers(tmp_path, stub_llm):
+    """A worker should log and count store errors, then keep going."""
+    stub_llm([RESPOND] * 3)
+    store = LockedOnceStore(str(tmp_path / "jobs.db"))
+
+    async def run() -> tuple[dict, list[Job]]:
+        queue = JobQueue(store, workers=1)
+        await queue.start()
+        jobs = [await queue.submit(TaskRequest(task=f"t{n}")) for n in range(3)]
+        for _ in range(100):
+            if queue.stats()["completed"] == 2 and queue.stats()["running"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue.stats(), jobs
+
+    stats, jobs = asyncio.run(run())
+
+    assert stats["store_errors"] == 2
+    assert stats["running"] == 0
+    stored = [store.get(job.job_id) for job in jobs]
+    statuses = [job.status if job is not None else None for job in stored]
+    # t0's claim failed (recovered later), t1's result wasn't saved (its
+    # lease expires), t2 ran normally on the same worker
+    assert statuses == [JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.COMPLETED]
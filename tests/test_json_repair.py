@@ -0,0 +1,93 @@
+"""Local JSON repair tests."""
+
+import asyncio
+
+import pytest
+
+from app.agents.json_repair import repair_json
+from app.schemas.task import DecisionType, ResponseStatus, TaskInput
+from app.services import task_service
+
+DECISION = '{"decision_type": "respond", "reasoning": "r", "message": "hi"}'
+
+
+@pytest.mark.parametrize(
+    ("raw", "repairs"),
+    [
+        (DECISION, []),
+        (f"```json\n{DECISION}\n```", ["code_fence"]),
+        # Missing closing fence: the last line is content, not a fence
+        (f"```json\n{DECISION}", ["code_fence"]),
+        (f"Sure! Here is my decision:\n{DECISION}\nLet me know.", ["extract_object"]),
+        (
+            f"I'll look it up.\n```json\n{DECISION}\n```\nDone.",
+            ["extract_object"],
+        ),
+        (
+            '{"decision_type": "respond", "reasoning": "r", "message": "a, }",}',
+            ["trailing_comma"],
+        ),
+        (
+            "{'decision_type': 'respond', 'reasoning': 'say \"hi\"', 'message': 'it\\'s'}",
+            ["single_quotes"],
+        ),
+        (
+            "Answer: {'decision_type': 'respond', 'reasoning': 'r', 'message': 'm',}",
+            ["extract_object", "trailing_comma", "single_quotes"],
+        ),
+    ],
+)
+def test_repair_json(raw, repairs):
+    """Each kind of damage should be fixed by its repair, in order."""
+    data, applied = repair_json(raw)
+
+    assert applied == repairs
+    assert data["decision_type"] == "respond"
+
+
+def test_repair_preserves_string_contents():
+    """Repairs must not touch commas, quotes or braces inside strings."""
+    data, _ = repair_json("{'message': \"it's {fine}, really\",}")
+
+    assert data == {"message": "it's {fine}, really"}
+
+
+def test_unrepairable_output_raises():
+    """Text with no JSON in it should still fail."""
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        repair_json("I cannot decide.")
+
+
+def test_repaired_output_does_not_spend_a_retry(stub_llm):
+    """A fixable decision should be used directly and its repairs counted."""
+    agent = task_service.get_agent()
+    agent.repair_counts.clear()
+    llm = stub_llm(
+        [
+            "Here you go:\n```json\n"
+            '{"decision_type": "RESPOND", "reasoning": "r", "message": "4",}'
+        ]
+    )
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="2+2?")))
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert response.message == "4"
+    assert len(llm.calls) == 1
+    assert agent.repair_counts == {
+        "extract_object": 1,
+        "trailing_comma": 1,
+        "decision_type_case": 1,
+    }
+
+
+def test_decision_type_spelling_is_normalized():
+    """Case, hyphens and spaces in decision_type should be accepted."""
+    agent = task_service.get_agent()
+
+    decision = agent._parse_decision(
+        '{"decision_type": "Use-Tool", "reasoning": "r",'
+        ' "tool_call": {"tool_name": "get_pricing", "arguments": {}}}'
+    )
+
+    assert decision.decision_type == DecisionType.USE_TOOL
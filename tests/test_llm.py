@@ -0,0 +1,125 @@
+"""Scripted (offline) LLM backend tests."""
+
+import asyncio
+import json
+
+import pytest
+from pydantic import SecretStr, ValidationError
+
+from app.agents.llm import ScriptedChatModel, ScriptedLLMError, ScriptedRule, load_rules
+from app.config import Settings
+from app.schemas.task import ResponseStatus, TaskInput
+from app.services import task_service
+
+
+def test_default_rules_look_up_price_then_respond(scripted):
+    """Built-in rules should call get_pricing for the product, then answer."""
+    scripted()
+
+    response = asyncio.run(
+        task_service.process_task(TaskInput(task="How much is PROD-002?"))
+    )
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert response.message == "Scripted response."
+    assert response.data is not None
+    assert response.data["tool_calls"][0]["result"]["price"] == 99.99
+
+
+def test_rules_file_matches_by_turn_and_expands_groups(tmp_path, scripted):
+    """Rules from a file should apply per turn, with regex groups expanded."""
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(
+        json.dumps(
+            {
+                "rules": [
+                    {"match": "garbage", "turn": 1, "output": "not json"},
+                    {
+                        "match": r"order for (\w+)",
+                        "turn": 1,
+                        "decision": {
+                            "decision_type": "clarify",
+                            "reasoning": "which product?",
+                            "message": r"What should \1 order?",
+                        },
+                    },
+                ]
+            }
+        )
+    )
+    scripted(rules=load_rules(str(rules_path)))
+
+    response = asyncio.run(
+        task_service.process_task(TaskInput(task="Place an order for alice"))
+    )
+
+    assert response.status == ResponseStatus.NEEDS_INPUT
+    assert response.message == "What should alice order?"
+
+
+def test_raw_output_rule_exercises_parse_retries(scripted):
+    """An `output` rule returns its text verbatim, so parsing fails."""
+    scripted(rules=[ScriptedRule(output="not json")])
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="anything")))
+
+    assert response.status == ResponseStatus.FAILED
+
+
+def test_unmatched_request_gets_a_respond_decision():
+    """With no matching rule the model still returns a valid decision."""
+    llm = ScriptedChatModel(rules=[ScriptedRule(match="never", output="x")])
+
+    message = asyncio.run(llm.ainvoke([{"role": "user", "content": "hello"}]))
+
+    assert json.loads(message.content)["decision_type"] == "respond"
+
+
+def test_injected_errors_and_latency():
+    """error_rate=1 should always fail, after the configured latency."""
+    llm = ScriptedChatModel(latency_ms=20, error_rate=1.0)
+
+    async def call() -> float:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(ScriptedLLMError):
+            await llm.ainvoke([{"role": "user", "content": "hi"}])
+        return loop.time() - start
+
+    assert asyncio.run(call()) >= 0.015
+
+
+def test_seed_makes_latency_and_failures_reproducible():
+    """Two models with the same seed should draw the same sequence."""
+    first = ScriptedChatModel(
+        latency_ms=100, latency_jitter_ms=50, error_rate=0.3, seed=7
+    )
+    second = ScriptedChatModel(
+        latency_ms=100, latency_jitter_ms=50, error_rate=0.3, seed=7
+    )
+
+    assert [first._draw() for _ in range(20)] == [second._draw() for _ in range(20)]
+
+
+def test_streaming_yields_the_same_output():
+    """astream chunks should join to the ainvoke output."""
+    llm = ScriptedChatModel()
+    messages = [{"role": "user", "content": "Price of PROD-001?"}]
+
+    async def run() -> tuple[str, str]:
+        full = await llm.ainvoke(messages)
+        chunks = [chunk.content async for chunk in llm.astream(messages)]
+        return str(full.content), "".join(str(c) for c in chunks)
+
+    full, streamed = asyncio.run(run())
+    assert len(full) > 16
+    assert streamed == full
+
+
+def test_openai_backend_requires_api_key():
+    """The API key is only mandatory for the openai backend."""
+    with pytest.raises(ValidationError):
+        Settings(llm_backend="openai", openai_api_key=None, _env_file=None)
+
+    Settings(llm_backend="scripted", openai_api_key=None, _env_file=None)
+    Settings(llm_backend="openai", openai_api_key=SecretStr("sk-x"), _env_file=None)
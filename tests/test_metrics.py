@@ -0,0 +1,149 @@
+"""Metrics and /metrics endpoint tests."""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.agents.dispatcher import dispatch_tool
+from app.main import app
+from app.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from app.schemas.task import TaskInput, ToolCall
+from app.services import task_service
+
+client = TestClient(app)
+
+
+def _sample(name: str, labels: str = "") -> float:
+    """Current value of one sample in the /metrics output."""
+    text = metrics.registry.render()
+    for line in text.splitlines():
+        if line.startswith(f"{name}{labels} "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Buckets should be cumulative, inclusive, and end with +Inf, sum and count."""
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency.", ["tool"], buckets=(0.1, 1.0))
+    )
+    child = histogram.labels("get_pricing")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{tool="get_pricing",le="0.1"} 2',
+        'latency_seconds_bucket{tool="get_pricing",le="1"} 3',
+        'latency_seconds_bucket{tool="get_pricing",le="+Inf"} 4',
+        'latency_seconds_sum{tool="get_pricing"} 3.65',
+        'latency_seconds_count{tool="get_pricing"} 4',
+    ]
+
+
+def test_counter_and_gauge():
+    """Counters and gauges should render per label set, with escaped values."""
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("tasks_total", "Tasks.", ["status"]))
+    gauge = registry.register(Gauge("in_flight", "In flight."))
+    counter.labels('say "hi"').inc()
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    text = registry.render()
+    assert 'tasks_total{status="say \\"hi\\""} 1' in text
+    assert "in_flight 1" in text
+
+
+def test_updates_from_threads_are_not_lost():
+    """Concurrent updates from worker threads should all be counted."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    counter = Counter("calls_total", "Calls.")
+    histogram = Histogram("wait_seconds", "Waits.", buckets=(1.0,))
+
+    def update() -> None:
+        for _ in range(2_000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(8):
+                pool.submit(update)
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert counter.labels().value == 16_000
+    assert histogram.labels().snapshot() == ([16_000, 0], 8_000.0)
+
+
+def test_wrong_label_count_raises():
+    """Label values must match the declared names; names must be unique."""
+    with pytest.raises(ValueError, match="expects labels"):
+        Counter("c_total", "C.", ["status"]).labels()
+    registry = MetricsRegistry()
+    registry.register(Counter("c_total", "C."))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(Counter("c_total", "C."))
+
+
+def test_metric_types_must_implement_children():
+    class Incomplete(metrics._Metric):
+        type_name = "untyped"
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete("x", "X.")
+
+
+def test_task_metrics(scripted):
+    """A task should update latency, status, iteration and tool metrics."""
+    scripted()
+    success = '{status="success"}'
+    tool = '{tool="get_pricing",success="true"}'
+    before = {
+        "tasks": _sample("agent_tasks_total", success),
+        "duration": _sample("agent_task_duration_seconds_count", success),
+        "iterations": _sample("agent_task_iterations_sum"),
+        "llm": _sample("agent_llm_iteration_duration_seconds_count"),
+        "tool": _sample("agent_tool_duration_seconds_count", tool),
+    }
+
+    asyncio.run(task_service.process_task(TaskInput(task="Price PROD-001")))
+
+    assert _sample("agent_tasks_total", success) == before["tasks"] + 1
+    assert (
+        _sample("agent_task_duration_seconds_count", success) == before["duration"] + 1
+    )
+    assert _sample("agent_task_iterations_sum") == before["iterations"] + 2
+    assert _sample("agent_llm_iteration_duration_seconds_count") == before["llm"] + 2
+    assert _sample("agent_tool_duration_seconds_count", tool) == before["tool"] + 1
+    assert _sample("agent_tasks_in_flight") == 0
+
+
+def test_unknown_tools_share_a_label():
+    """Hallucinated tool names should not create new label values."""
+    labels = '{tool="unknown",success="false"}'
+    before = _sample("agent_tool_duration_seconds_count", labels)
+
+    asyncio.run(dispatch_tool(ToolCall(tool_name="made_up_tool", arguments={})))
+
+    assert _sample("agent_tool_duration_seconds_count", labels) == before + 1
+    assert "made_up_tool" not in metrics.registry.render()
+
+
+def test_metrics_endpoint():
+    """/metrics should serve the Prometheus text format."""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE agent_task_duration_seconds histogram" in response.text
+    assert "# TYPE agent_parse_retries_total counter" in response.text
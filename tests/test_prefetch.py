@@ -0,0 +1,134 @@
+"""Context prefetch tests."""
+
+import asyncio
+
+import pytest
+
+from app.agents import dispatcher
+from app.schemas.task import ResponseStatus, TaskInput
+from app.services import task_service
+from app.tools import registry
+
+RESPOND = {"decision_type": "respond", "reasoning": "done", "message": "ok"}
+
+
+def _price(product_id: str) -> dict:
+    return {
+        "decision_type": "use_tool",
+        "reasoning": "need price",
+        "tool_call": {
+            "tool_name": "get_pricing",
+            "arguments": {"product_id": product_id},
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def prefetch_counts(monkeypatch):
+    monkeypatch.setattr(dispatcher, "_prefetch", dispatcher.Counter())
+    monkeypatch.setattr(dispatcher, "_result_caches", {})
+
+
+@pytest.fixture
+def no_prefetch_wait(monkeypatch):
+    """Start the first LLM call without waiting for prefetched results."""
+    monkeypatch.setattr(task_service.settings, "context_prefetch_wait_seconds", 0)
+
+
+def test_prefetch_arguments_follow_declared_context_keys():
+    """Only complete, valid context maps to arguments; side effects never do."""
+    pricing = registry.get_or_raise("get_pricing")
+    order = registry.get_or_raise("create_order")
+
+    assert pricing.prefetch_arguments({"product_id": "PROD-001", "x": 1}) == {
+        "product_id": "PROD-001"
+    }
+    assert pricing.prefetch_arguments({"customer_id": "C1"}) is None
+    assert pricing.prefetch_arguments({"product_id": None}) is None
+    assert pricing.prefetch_arguments(None) is None
+    assert order.prefetch_arguments({"product_id": "PROD-001"}) is None
+
+
+def test_prefetched_results_are_in_the_first_prompt(stub_llm):
+    """Results ready before the first LLM call are part of its prompt."""
+    llm = stub_llm([RESPOND])
+
+    response = asyncio.run(
+        task_service.process_task(
+            TaskInput(task="Price?", context={"product_id": "PROD-001"})
+        )
+    )
+
+    first_prompt = llm.calls[0][-1]["content"]
+    assert first_prompt.startswith("Task: Price?")
+    assert "get_pricing" in first_prompt and "29.99" in first_prompt
+    assert response.data is not None
+    assert [call["tool"] for call in response.data["tool_calls"]] == ["get_pricing"]
+    assert dispatcher.prefetch_stats()["observed"] == 1
+    assert dispatcher.prefetch_stats()["discarded"] == 0
+
+
+def test_requested_prefetch_is_confirmed(stub_llm, no_prefetch_wait):
+    """A first decision matching the prefetched call reuses its result."""
+    stub_llm([_price("PROD-001"), RESPOND])
+
+    response = asyncio.run(
+        task_service.process_task(
+            TaskInput(task="Price?", context={"product_id": "PROD-001"})
+        )
+    )
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert response.data is not None
+    assert len(response.data["tool_calls"]) == 1
+    assert dispatcher.prefetch_stats() == {
+        "started": 1,
+        "confirmed": 1,
+        "observed": 0,
+        "discarded": 0,
+    }
+
+
+def test_unrequested_prefetch_is_handed_in_as_observation(stub_llm, no_prefetch_wait):
+    """Late prefetched results go to the model with the first tool results."""
+    llm = stub_llm([_price("PROD-002"), RESPOND])
+
+    response = asyncio.run(
+        task_service.process_task(
+            TaskInput(task="Compare", context={"product_id": "PROD-001"})
+        )
+    )
+
+    assert response.data is not None
+    prices = [call["result"]["price"] for call in response.data["tool_calls"]]
+    assert prices == [99.99, 29.99]
+    second_prompt = llm.calls[1][-1]["content"]
+    assert "PROD-001" in second_prompt and "PROD-002" in second_prompt
+    assert dispatcher.prefetch_stats()["observed"] == 1
+
+
+def test_prefetch_unused_by_a_direct_answer_is_discarded(stub_llm, no_prefetch_wait):
+    """A terminal first decision discards a still running prefetched call."""
+    stub_llm([RESPOND])
+
+    asyncio.run(
+        task_service.process_task(
+            TaskInput(task="Hi", context={"product_id": "PROD-001"})
+        )
+    )
+
+    assert dispatcher.prefetch_stats()["discarded"] == 1
+
+
+def test_prefetch_can_be_disabled(stub_llm, monkeypatch):
+    """With context_prefetch off, nothing starts before a decision."""
+    monkeypatch.setattr(task_service.settings, "context_prefetch", False)
+    stub_llm([RESPOND])
+
+    asyncio.run(
+        task_service.process_task(
+            TaskInput(task="Hi", context={"product_id": "PROD-001"})
+        )
+    )
+
+    assert dispatcher.prefetch_stats()["started"] == 0
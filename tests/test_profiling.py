@@ -0,0 +1,118 @@
+"""Per-request profiling tests."""
+
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.profiling import StackProfiler, run_profiled
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path, scripted):
+    """Enable profiling into a temporary directory, on the scripted LLM."""
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    scripted()
+    return tmp_path
+
+
+def _busy(n: int) -> int:
+    return sum(json.loads(json.dumps(list(range(n)))))
+
+
+async def _work(n: int) -> int:
+    total = 0
+    for _ in range(3):
+        total += _busy(n)
+        await asyncio.sleep(0)
+    return total
+
+
+async def _other_work() -> int:
+    return await _work(100)
+
+
+def test_profile_covers_only_the_profiled_coroutine(profiling, monkeypatch):
+    """Stacks should start at the coroutine; concurrent tasks are excluded."""
+    monkeypatch.setattr(settings, "profile_format", "collapsed")
+
+    async def main():
+        other = asyncio.create_task(_other_work())
+        result, path = await run_profiled(_work(200), "test")
+        await other
+        return result, path
+
+    result, path = asyncio.run(main())
+
+    assert result == 3 * sum(range(200))
+    stacks = [
+        line.rsplit(" ", 1)[0]
+        for line in open(path, encoding="utf-8").read().splitlines()
+    ]
+    assert all(stack.startswith("tests.test_profiling._work") for stack in stacks)
+    assert "tests.test_profiling._work;tests.test_profiling._busy;json.dumps" in {
+        ";".join(stack.split(";")[:3]) for stack in stacks
+    }
+    assert not any("_other_work" in stack for stack in stacks)
+
+
+def test_speedscope_output():
+    """The speedscope export should index frames and weight one sample per stack."""
+    profiler = StackProfiler()
+    profiler.totals.update({"a;b": 0.002, "a": 0.001})
+
+    data = profiler.speedscope("label")
+
+    assert [frame["name"] for frame in data["shared"]["frames"]] == ["a", "b"]
+    (profile,) = data["profiles"]
+    assert profile["samples"] == [[0], [0, 1]]
+    assert profile["weights"] == [1000.0, 2000.0]
+    assert profile["endValue"] == 3000.0
+
+
+def test_tasks_endpoint_profiles_on_request(profiling):
+    """?profile=true should write a profile of the whole observation loop."""
+    response = client.post("/tasks?profile=true", json={"task": "Price PROD-001"})
+
+    assert response.status_code == 200
+    name = response.headers["X-Profile-File"]
+    assert name.endswith(".speedscope.json")
+    data = json.loads((profiling / name).read_text())
+    frames = {frame["name"] for frame in data["shared"]["frames"]}
+    assert "app.services.task_service.process_task" in frames
+    assert "app.agents.reasoning.ReasoningAgent._parse_decision" in frames
+    assert any(name.startswith("pydantic") for name in frames)
+
+
+def test_header_trigger_and_retention(profiling, monkeypatch):
+    """The X-Profile header should also trigger; old profiles beyond the cap go."""
+    monkeypatch.setattr(settings, "profile_max_files", 2)
+
+    names = [
+        client.post("/tasks", json={"task": "Hi"}, headers={"X-Profile": "1"}).headers[
+            "X-Profile-File"
+        ]
+        for _ in range(3)
+    ]
+
+    assert len(set(names)) == 3
+    assert len(os.listdir(profiling)) == 2
+    assert names[-1] in os.listdir(profiling)
+
+
+def test_profiling_is_gated_by_config(profiling, monkeypatch):
+    """Without PROFILING_ENABLED, profile requests are ignored."""
+    monkeypatch.setattr(settings, "profiling_enabled", False)
+
+    response = client.post("/tasks?profile=true", json={"task": "Hi"})
+
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert os.listdir(profiling) == []
@@ -0,0 +1,36 @@
+"""System prompt tests."""
+
+from app.agents import reasoning
+from app.agents.prompts import SYSTEM_PROMPT_PREFIX, build_system_prompt
+from app.tools import registry
+
+
+def test_system_prompt_prefix_is_stable():
+    """The prompt should start with the same bytes whatever the tools are."""
+    with_tools = build_system_prompt(registry.list_tools())
+    without_tools = build_system_prompt([])
+
+    assert with_tools.startswith(SYSTEM_PROMPT_PREFIX)
+    assert without_tools.startswith(SYSTEM_PROMPT_PREFIX)
+    assert "get_pricing" in with_tools
+    assert "get_pricing" not in SYSTEM_PROMPT_PREFIX
+
+
+def test_system_prompt_cached_until_registry_changes(monkeypatch):
+    """The agent should rebuild its prompt only when the registry version moves."""
+    builds: list[int] = []
+
+    def counting_build(tools):
+        builds.append(len(tools))
+        return build_system_prompt(tools)
+
+    monkeypatch.setattr(reasoning, "build_system_prompt", counting_build)
+    agent = reasoning.ReasoningAgent()
+
+    first = agent.system_prompt
+    assert agent.system_prompt is first
+    assert len(builds) == 1
+
+    monkeypatch.setattr(registry, "_version", registry.version + 1)
+    assert agent.system_prompt == first
+    assert len(builds) == 2
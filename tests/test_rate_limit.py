@@ -0,0 +1,222 @@
+"""Client-side LLM rate limiter tests."""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents.hedging import HEDGE_MIN_SAMPLES, Hedger
+from app.agents.llm import shared_http_clients
+from app.agents.rate_limit import LLMRateLimiter, TokenBucket
+from app.schemas.task import ResponseStatus, TaskInput
+from app.services import task_service
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_waits_for_debt_to_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)  # 1 per second
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(2) == pytest.approx(3.0)  # Behind the first waiter
+
+    clock.now = 10.0
+    assert bucket.level == pytest.approx(7.0)
+
+
+def test_bucket_never_refills_past_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    clock.now = 600.0
+
+    assert bucket.level == 60
+
+
+def test_limiter_waits_for_the_tighter_limit():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(
+        requests_per_minute=600, tokens_per_minute=6000, clock=clock
+    )
+
+    assert limiter._reserve(6000) == 0.0
+    assert limiter._reserve(100) == pytest.approx(1.0)  # 100 tokens/s
+
+
+def test_unlimited_limiter_never_waits():
+    limiter = LLMRateLimiter()
+
+    asyncio.run(limiter.acquire(10**9))
+
+    stats = limiter.stats()
+    assert stats["enabled"] is False
+    assert stats["calls"] == 1
+    assert stats["queued"] == 0
+
+
+def test_callers_over_the_limit_queue_in_arrival_order():
+    limiter = LLMRateLimiter(tokens_per_minute=6000)  # 100 tokens/s
+    asyncio.run(limiter.acquire(6000))
+    finished: list[int] = []
+
+    async def call(n: int) -> None:
+        await limiter.acquire(5)
+        finished.append(n)
+
+    async def run_all() -> None:
+        await asyncio.gather(*(call(n) for n in range(3)))
+
+    start = time.perf_counter()
+    asyncio.run(run_all())
+
+    assert finished == [0, 1, 2]
+    assert time.perf_counter() - start >= 0.14
+    stats = limiter.stats()
+    assert stats["queued"] == 3
+    assert stats["waiting"] == 0
+    assert stats["max_wait_ms"] >= 140
+
+
+def test_cancelled_waiter_gives_its_reservation_back():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(tokens_per_minute=6000, clock=clock)
+    limiter._reserve(6000)
+
+    async def run() -> None:
+        task = asyncio.create_task(limiter.acquire(500))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == pytest.approx(0.0)
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_hedges_only_take_free_capacity():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(requests_per_minute=2, clock=clock)
+
+    assert limiter.try_acquire(0)
+    assert limiter.try_acquire(0)
+    assert not limiter.try_acquire(0)
+    assert limiter.stats()["hedges_refused"] == 1
+
+
+def test_settle_corrects_the_token_estimate():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(tokens_per_minute=1000, clock=clock)
+    limiter._reserve(500)
+
+    limiter.settle(500, 200)
+
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == pytest.approx(800)
+
+
+def test_agent_calls_go_through_the_limiter(stub_llm, monkeypatch):
+    stub_llm([{"decision_type": "respond", "reasoning": "ok", "message": "ok"}])
+    limiter = LLMRateLimiter(requests_per_minute=60, tokens_per_minute=100_000)
+    monkeypatch.setattr(task_service._agent, "rate_limiter", limiter)
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    assert response.status == ResponseStatus.SUCCESS
+    stats = limiter.stats()
+    assert stats["calls"] == 1
+    assert stats["available_requests"] == pytest.approx(59, abs=0.1)
+    assert stats["available_tokens"] < 100_000
+
+
+def test_http_clients_are_shared():
+    assert shared_http_clients() is shared_http_clients()
+
+
+def test_failed_call_gives_back_its_expected_output():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(
+        tokens_per_minute=1000, expected_output_tokens=100, clock=clock
+    )
+    limiter._reserve(500)
+
+    limiter.settle(500, None)
+
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == pytest.approx(600)
+    assert limiter.stats()["abandoned"] == 1
+
+
+class BrokenLLM:
+    async def ainvoke(self, messages):
+        raise ConnectionError("provider unreachable")
+
+
+def test_failed_call_settles_its_reservation(monkeypatch):
+    agent = task_service._agent
+    limiter = LLMRateLimiter(
+        tokens_per_minute=100_000, expected_output_tokens=256, clock=FakeClock()
+    )
+    monkeypatch.setattr(agent, "rate_limiter", limiter)
+    monkeypatch.setattr(agent, "llm", BrokenLLM())
+    messages = [{"role": "user", "content": "hi"}]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(agent._call_llm(messages))
+
+    prompt = agent._reserved_tokens(messages) - 256
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == pytest.approx(100_000 - prompt, abs=0.01)
+    assert limiter.stats()["abandoned"] == 1
+
+
+class SlowThenFastLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(5)
+        return AIMessage(
+            content='{"decision_type": "respond", "reasoning": "ok", "message": "ok"}',
+            usage_metadata={
+                "input_tokens": 40,
+                "output_tokens": 10,
+                "total_tokens": 50,
+            },
+        )
+
+
+def test_cancelled_hedge_loser_settles_its_reservation(monkeypatch):
+    agent = task_service._agent
+    limiter = LLMRateLimiter(
+        tokens_per_minute=100_000, expected_output_tokens=256, clock=FakeClock()
+    )
+    hedger = Hedger(min_delay=0.01)
+    for _ in range(HEDGE_MIN_SAMPLES):
+        hedger.observe(0.01)
+    monkeypatch.setattr(agent, "rate_limiter", limiter)
+    monkeypatch.setattr(agent, "hedger", hedger)
+    monkeypatch.setattr(agent, "llm", SlowThenFastLLM())
+    messages = [{"role": "user", "content": "hi"}]
+    reserved = agent._reserved_tokens(messages)
+
+    asyncio.run(agent._call_llm(messages))
+
+    assert hedger.stats()["hedge_won"] == 1
+    assert limiter.stats()["abandoned"] == 1  # The cancelled primary
+    # Winner settled at 50 tokens, loser at its prompt only
+    expected = 100_000 - 50 - (reserved - 256)
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == pytest.approx(expected, abs=0.01)
@@ -0,0 +1,375 @@
+"""Circuit breaker and backoff tests."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from app import resilience
+from app.agents import dispatcher
+from app.agents.dispatcher import dispatch_tool
+from app.resilience import (
+    BackoffPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+    call_with_resilience,
+    retry_after_hint,
+)
+from app.schemas.task import ResponseStatus, TaskInput, ToolCall
+from app.services import task_service
+from app.tools import BaseTool, ToolResult, registry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("rate limited")
+        self.retry_after = retry_after
+
+
+def no_sleep(delays: list[float], clock: FakeClock | None = None):
+    async def sleep(seconds: float) -> None:
+        delays.append(seconds)
+        if clock is not None:
+            clock.now += seconds
+
+    return sleep
+
+
+def test_breaker_opens_after_threshold_and_recovers():
+    """Consecutive failures open the breaker; a half-open success closes it."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "dep", failure_threshold=3, recovery_seconds=10, clock=clock
+    )
+
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+    clock.now = 10.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # One trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 1
+
+
+def test_breaker_half_open_failure_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "dep", failure_threshold=1, recovery_seconds=5, clock=clock
+    )
+    breaker.record_failure()
+    clock.now = 5.0
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.retry_in() == 5.0
+
+
+def test_retry_after_hint_counts_towards_threshold():
+    """A retry-after hint delays the retry but doesn't open the breaker alone."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("dep", failure_threshold=2, clock=clock)
+    delays: list[float] = []
+
+    async def limited() -> str:
+        raise RateLimited(0.25)
+
+    policy = BackoffPolicy(max_retries=1, max_delay=1.0)
+    with pytest.raises(RateLimited):
+        asyncio.run(
+            call_with_resilience(
+                breaker, policy, limited, sleep=no_sleep(delays, clock)
+            )
+        )
+
+    assert delays == [0.25]
+    assert breaker.stats()["opened"] == 1  # On the second failure, not the first
+
+
+def test_backoff_delays_are_jittered_and_capped():
+    policy = BackoffPolicy(max_retries=3, base_delay=1.0, max_delay=3.0)
+
+    for _ in range(50):
+        assert 0 <= policy.delay(1) <= 1.0
+        assert 0 <= policy.delay(3) <= 3.0
+    assert policy.delay(4) is None
+    assert policy.delay(1, retry_after=2.5) == 2.5
+    assert policy.delay(1, retry_after=30.0) is None
+
+
+def test_retry_after_hint_reads_response_headers():
+    class Response:
+        headers = {"retry-after-ms": "1500"}
+
+    class HTTPError(Exception):
+        response = Response()
+
+    assert retry_after_hint(HTTPError()) == 1.5
+    assert retry_after_hint(RateLimited(3)) == 3.0
+    assert retry_after_hint(ValueError()) is None
+
+
+def test_call_with_resilience_retries_then_succeeds():
+    breaker = CircuitBreaker("dep", failure_threshold=5)
+    attempts: list[int] = []
+    delays: list[float] = []
+
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    result = asyncio.run(
+        call_with_resilience(breaker, BackoffPolicy(), flaky, sleep=no_sleep(delays))
+    )
+
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert len(delays) == 2
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_call_with_resilience_waits_retry_after():
+    clock = FakeClock()
+    breaker = CircuitBreaker("dep", failure_threshold=5, clock=clock)
+    delays: list[float] = []
+    attempts: list[int] = []
+
+    async def limited() -> str:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited(0.25)
+        return "ok"
+
+    policy = BackoffPolicy(max_delay=1.0)
+    result = asyncio.run(
+        call_with_resilience(breaker, policy, limited, sleep=no_sleep(delays, clock))
+    )
+
+    assert result == "ok"
+    assert delays == [0.25]
+    assert breaker.state == "closed"
+
+
+def test_call_with_resilience_ignored_errors_do_not_count():
+    breaker = CircuitBreaker("dep", failure_threshold=1)
+
+    async def bad_output() -> str:
+        raise ValueError("empty")
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            call_with_resilience(breaker, None, bad_output, ignore=(ValueError,))
+        )
+
+    assert breaker.state == "closed"
+
+
+def test_cancelled_half_open_call_releases_slot():
+    """A cancelled trial call (e.g. a discarded speculation) frees its slot."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "dep", failure_threshold=1, recovery_seconds=1, clock=clock
+    )
+    breaker.record_failure()
+    clock.now = 1.0
+
+    async def run() -> None:
+        task = asyncio.create_task(
+            call_with_resilience(breaker, None, lambda: asyncio.sleep(10))
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+class LookupInput(BaseModel):
+    key: str
+
+
+class BrokenLookupTool(BaseTool):
+    """Read-only cached tool that raises until `healthy` is set."""
+
+    name = "broken_lookup"
+    description = "Test tool"
+    input_model = LookupInput
+    cache_ttl_seconds = 60.0
+    breaker_failure_threshold = 2
+
+    def __init__(self) -> None:
+        self.executions = 0
+        self.healthy = False
+
+    def execute(self, **kwargs: Any) -> ToolResult:
+        raise NotImplementedError
+
+    async def aexecute(self, **kwargs: Any) -> ToolResult:
+        self.executions += 1
+        if not self.healthy:
+            raise ConnectionError("backend down")
+        return ToolResult(success=True, data={"key": kwargs["key"]})
+
+
+@pytest.fixture
+def broken_tool(monkeypatch) -> BrokenLookupTool:
+    tool = BrokenLookupTool()
+    monkeypatch.setitem(registry._tools, tool.name, tool)
+    monkeypatch.setattr(dispatcher, "_result_caches", {})
+    monkeypatch.setattr(resilience, "_breakers", {})
+    return tool
+
+
+def test_failing_tool_opens_breaker_and_fails_fast(broken_tool):
+    for key in ("a", "b"):
+        result = asyncio.run(
+            dispatch_tool(ToolCall(tool_name=broken_tool.name, arguments={"key": key}))
+        )
+        assert result.success is False
+    assert broken_tool.executions == 2
+
+    result = asyncio.run(
+        dispatch_tool(ToolCall(tool_name=broken_tool.name, arguments={"key": "c"}))
+    )
+
+    assert broken_tool.executions == 2  # Not called while open
+    assert result.success is False
+    assert result.data is not None and result.data["circuit_open"] is True
+    stats = dispatcher.breaker_stats_by_tool()[broken_tool.name]
+    assert stats["state"] == "open"
+    assert stats["rejected"] == 1
+
+
+def test_cached_results_are_served_while_breaker_is_open(broken_tool):
+    broken_tool.healthy = True
+    cached = ToolCall(tool_name=broken_tool.name, arguments={"key": "a"})
+    assert asyncio.run(dispatch_tool(cached)).success
+
+    broken_tool.healthy = False
+    for key in ("b", "c"):
+        asyncio.run(
+            dispatch_tool(ToolCall(tool_name=broken_tool.name, arguments={"key": key}))
+        )
+
+    result = asyncio.run(dispatch_tool(cached))
+
+    assert result.success is True
+    assert result.data == {"key": "a"}
+
+
+class FlakyLookupTool(BrokenLookupTool):
+    """Reports failure in its result instead of raising."""
+
+    name = "flaky_lookup"
+
+    def __init__(self, transient: bool) -> None:
+        super().__init__()
+        self.transient = transient
+
+    async def aexecute(self, **kwargs: Any) -> ToolResult:
+        self.executions += 1
+        return ToolResult(success=False, error="down", transient=self.transient)
+
+
+@pytest.mark.parametrize("transient", [True, False])
+def test_only_transient_tool_failures_open_the_breaker(monkeypatch, transient):
+    tool = FlakyLookupTool(transient)
+    monkeypatch.setitem(registry._tools, tool.name, tool)
+    monkeypatch.setattr(dispatcher, "_result_caches", {})
+    monkeypatch.setattr(resilience, "_breakers", {})
+
+    for key in ("a", "b"):
+        asyncio.run(
+            dispatch_tool(ToolCall(tool_name=tool.name, arguments={"key": key}))
+        )
+    result = asyncio.run(
+        dispatch_tool(ToolCall(tool_name=tool.name, arguments={"key": "c"}))
+    )
+
+    circuit_open = result.data is not None and result.data.get("circuit_open")
+    assert tool.executions == (2 if transient else 3)  # Results aren't retried
+    assert bool(circuit_open) is transient
+
+
+def test_unknown_products_leave_the_pricing_breaker_closed(monkeypatch):
+    monkeypatch.setattr(dispatcher, "_result_caches", {})
+    monkeypatch.setattr(resilience, "_breakers", {})
+
+    for n in range(10):
+        call = ToolCall(tool_name="get_pricing", arguments={"product_id": f"X-{n}"})
+        assert "not found" in (asyncio.run(dispatch_tool(call)).error or "")
+
+    call = ToolCall(tool_name="get_pricing", arguments={"product_id": "PROD-001"})
+    assert asyncio.run(dispatch_tool(call)).success
+    assert dispatcher.breaker_stats_by_tool()["get_pricing"]["state"] == "closed"
+
+
+def test_invalid_arguments_bypass_the_breaker(broken_tool):
+    for _ in range(3):
+        asyncio.run(dispatch_tool(ToolCall(tool_name=broken_tool.name, arguments={})))
+
+    assert broken_tool.executions == 3
+    assert broken_tool.name not in dispatcher.breaker_stats_by_tool()
+
+
+class FailingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        raise ConnectionError("provider down")
+
+    async def astream(self, messages):
+        self.calls += 1
+        raise ConnectionError("provider down")
+        yield  # pragma: no cover
+
+
+def test_open_llm_breaker_fails_task_fast(monkeypatch):
+    """Once the LLM breaker opens, tasks fail at once with a structured error."""
+    agent = task_service._agent
+    llm = FailingLLM()
+    monkeypatch.setattr(agent, "llm", llm)
+    monkeypatch.setattr(agent, "decision_cache", None)
+    monkeypatch.setattr(agent, "breaker", CircuitBreaker("llm:test", 2, 30))
+    monkeypatch.setattr(agent, "retry_policy", BackoffPolicy(max_retries=0))
+
+    for _ in range(2):
+        response = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+        assert response.status == ResponseStatus.FAILED
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    assert llm.calls == 2
+    assert response.status == ResponseStatus.FAILED
+    assert response.data is not None
+    assert response.data["circuit_open"] is True
+    assert response.data["retry_after"] > 0
+
+
+def test_circuit_open_error_message():
+    assert "retry in 2.0s" in str(CircuitOpenError("llm:x", 2.0))
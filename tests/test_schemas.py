@@ -96,3 +96,42 @@ def test_response_status_values():
     assert ResponseStatus.FAILED.value == "failed"
     assert ResponseStatus.NEEDS_INPUT.value == "needs_input"
     assert ResponseStatus.ESCALATED.value == "escalated"
+
+
+def test_agent_decision_requested_tool_calls():
+    """requested_tool_calls should cover both tool_call and tool_calls."""
+    single = AgentDecision(
+        decision_type=DecisionType.USE_TOOL,
+        reasoning="one",
+        tool_call=ToolCall(tool_name="get_pricing"),
+    )
+    multi = AgentDecision(
+        decision_type=DecisionType.USE_TOOL,
+        reasoning="many",
+        tool_calls=[ToolCall(tool_name="get_pricing"), ToolCall(tool_name="x")],
+    )
+
+    assert [c.tool_name for c in single.requested_tool_calls] == ["get_pricing"]
+    assert len(multi.requested_tool_calls) == 2
+
+
+def test_agent_decision_merges_tool_call_into_tool_calls():
+    """A decision setting both fields should run every call, each once."""
+    both = AgentDecision(
+        decision_type=DecisionType.USE_TOOL,
+        reasoning="both",
+        tool_call=ToolCall(tool_name="get_pricing"),
+        tool_calls=[ToolCall(tool_name="x")],
+    )
+    repeated = AgentDecision(
+        decision_type=DecisionType.USE_TOOL,
+        reasoning="repeated",
+        tool_call=ToolCall(tool_name="x"),
+        tool_calls=[ToolCall(tool_name="get_pricing"), ToolCall(tool_name="x")],
+    )
+
+    assert [c.tool_name for c in both.requested_tool_calls] == ["get_pricing", "x"]
+    assert [c.tool_name for c in repeated.requested_tool_calls] == [
+        "get_pricing",
+        "x",
+    ]
@@ -0,0 +1,167 @@
+"""Speculative tool execution tests."""
+
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from app.agents import dispatcher
+from app.agents.reasoning import StreamingDecisionParser
+from app.schemas.task import ResponseStatus, TaskInput
+from app.services import task_service
+from app.tools import registry
+from tests.test_dispatcher import RecordingTool
+
+LOOKUP = {
+    "decision_type": "use_tool",
+    "tool_call": {"tool_name": "slow_lookup", "arguments": {"n": 1}},
+    "reasoning": 'A long explanation that is still streaming {with braces} and "quotes"',
+}
+RESPOND = {"decision_type": "respond", "reasoning": "ok", "message": "done"}
+
+
+def _feed_chars(parser: StreamingDecisionParser, text: str) -> list[tuple[int, str]]:
+    """Feed one character at a time; return (position, tool name) per call found."""
+    found = []
+    for i, char in enumerate(text):
+        found += [(i, call.tool_name) for call in parser.feed(char)]
+    return found
+
+
+def test_parser_emits_tool_call_before_stream_ends():
+    """A complete tool_call should be reported as soon as it closes."""
+    text = "```json\n" + json.dumps(LOOKUP) + "\n```"
+
+    found = _feed_chars(StreamingDecisionParser(), text)
+
+    assert found == [(text.index("}}") + 1, "slow_lookup")]
+
+
+def test_parser_holds_calls_until_decision_type_is_known():
+    """Calls before decision_type are released only for use_tool."""
+    call = {"tool_name": "slow_lookup", "arguments": {}}
+    use_tool = json.dumps({"tool_call": call, "decision_type": "USE_TOOL"})
+    respond = json.dumps({"tool_call": call, "decision_type": "respond"})
+
+    assert [name for _, name in _feed_chars(StreamingDecisionParser(), use_tool)] == [
+        "slow_lookup"
+    ]
+    assert _feed_chars(StreamingDecisionParser(), respond) == []
+
+
+def test_parser_reads_tool_calls_array_elements():
+    """Each tool_calls element should be emitted once it is complete."""
+    text = json.dumps(
+        {
+            "decision_type": "use_tool",
+            "tool_calls": [
+                {"tool_name": "a", "arguments": {"x": [1, {"y": "}"}]}},
+                {"tool_name": "b", "arguments": {}},
+            ],
+            "reasoning": "r",
+        }
+    )
+
+    found = _feed_chars(StreamingDecisionParser(), text)
+
+    assert [name for _, name in found] == ["a", "b"]
+    assert found[1][0] < text.index("reasoning")
+
+
+class GatedLLM:
+    """Streams a decision, pausing after the tool call until the tool has run."""
+
+    def __init__(self, first: dict, tool_started: asyncio.Event):
+        self._outputs = [json.dumps(first), json.dumps(RESPOND)]
+        self._tool_started = tool_started
+        self.overlapped = False
+
+    async def astream(self, messages):
+        output = self._outputs.pop(0)
+        split = output.find("}}") + 2 if "}}" in output else len(output)
+        yield AIMessageChunk(content=output[:split])
+        if split < len(output):
+            try:
+                await asyncio.wait_for(self._tool_started.wait(), timeout=0.2)
+                self.overlapped = True
+            except asyncio.TimeoutError:
+                pass
+            yield AIMessageChunk(content=output[split:])
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    def install(first: dict, has_side_effects: bool = False) -> tuple[GatedLLM, list]:
+        log: list[str] = []
+        tool = RecordingTool("slow_lookup", has_side_effects, log)
+        monkeypatch.setitem(registry._tools, "slow_lookup", tool)
+        monkeypatch.setattr(dispatcher, "_speculation", dispatcher.Counter())
+        monkeypatch.setattr(task_service._agent, "decision_cache", None)
+
+        started = asyncio.Event()
+        original = tool.aexecute
+
+        async def aexecute(**kwargs):
+            started.set()
+            return await original(**kwargs)
+
+        monkeypatch.setattr(tool, "aexecute", aexecute)
+        llm = GatedLLM(first, started)
+        monkeypatch.setattr(task_service._agent, "llm", llm)
+        return llm, log
+
+    return install
+
+
+def test_read_only_tool_starts_while_decision_streams(gated):
+    """The tool should run during generation and not be run again after it."""
+    llm, log = gated(LOOKUP)
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="look up")))
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert llm.overlapped is True
+    assert log == ["slow_lookup:1"]
+    assert dispatcher.speculation_stats() == {
+        "started": 1,
+        "confirmed": 1,
+        "discarded": 0,
+    }
+
+
+def test_side_effect_tools_are_not_started_early(gated):
+    """Tools with side effects must wait for the validated decision."""
+    llm, log = gated(LOOKUP, has_side_effects=True)
+
+    asyncio.run(task_service.process_task(TaskInput(task="write")))
+
+    assert llm.overlapped is False
+    assert log == ["slow_lookup:1"]
+    assert dispatcher.speculation_stats()["started"] == 0
+
+
+def test_unconfirmed_call_is_discarded(gated):
+    """A call from a decision that fails validation is thrown away."""
+    broken = {**LOOKUP, "decision_type": "use_tool", "message": {"not": "a string"}}
+    gated(broken)
+
+    asyncio.run(task_service.process_task(TaskInput(task="look up")))
+
+    stats = dispatcher.speculation_stats()
+    assert stats["started"] == 1
+    assert stats["confirmed"] == 0
+    assert stats["discarded"] == 1
+
+
+def test_speculation_can_be_disabled(gated, monkeypatch):
+    """With speculative_tools off, tools only run after the decision."""
+    monkeypatch.setattr(task_service.settings, "speculative_tools", False)
+    llm, log = gated(LOOKUP)
+
+    asyncio.run(
+        task_service.process_task(TaskInput(task="look up"), stream_tokens=True)
+    )
+
+    assert llm.overlapped is False
+    assert log == ["slow_lookup:1"]
@@ -0,0 +1,95 @@
+"""Observation loop tests (LLM replaced with a scripted stub)."""
+
+import asyncio
+
+from app.agents.conversation import Conversation
+from app.schemas.task import ResponseStatus, TaskInput
+from app.services import task_service
+
+
+def test_process_task_direct_response(stub_llm):
+    """A RESPOND decision should finish the task in one iteration."""
+    llm = stub_llm([{"decision_type": "respond", "reasoning": "easy", "message": "4"}])
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="2+2?")))
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert response.message == "4"
+    assert len(llm.calls) == 1
+
+
+def test_process_task_tool_then_respond(stub_llm):
+    """Tool results should be fed back before the final decision."""
+    llm = stub_llm(
+        [
+            {
+                "decision_type": "use_tool",
+                "reasoning": "need price",
+                "tool_call": {
+                    "tool_name": "get_pricing",
+                    "arguments": {"product_id": "PROD-001"},
+                },
+            },
+            {"decision_type": "respond", "reasoning": "done", "message": "$29.99"},
+        ]
+    )
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="Price?")))
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert response.data is not None
+    assert response.data["tool_calls"][0]["result"]["price"] == 29.99
+    assert "29.99" in llm.calls[1][-1]["content"]
+
+
+def test_process_task_concurrent_tasks(stub_llm):
+    """Many tasks should run concurrently on a single event loop."""
+    stub_llm([{"decision_type": "respond", "reasoning": "ok", "message": "ok"}] * 20)
+
+    async def run_all():
+        tasks = [TaskInput(task=f"task {i}") for i in range(20)]
+        return await asyncio.gather(*(task_service.process_task(t) for t in tasks))
+
+    responses = asyncio.run(run_all())
+
+    assert all(r.status == ResponseStatus.SUCCESS for r in responses)
+
+
+def test_process_task_multiple_tool_calls_in_one_iteration(stub_llm):
+    """A tool_calls decision should be executed in a single loop iteration."""
+    llm = stub_llm(
+        [
+            {
+                "decision_type": "use_tool",
+                "reasoning": "need all prices",
+                "tool_calls": [
+                    {"tool_name": "get_pricing", "arguments": {"product_id": pid}}
+                    for pid in ("PROD-001", "PROD-002", "PROD-003")
+                ],
+            },
+            {"decision_type": "respond", "reasoning": "done", "message": "prices"},
+        ]
+    )
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="Prices?")))
+
+    assert response.status == ResponseStatus.SUCCESS
+    assert len(llm.calls) == 2
+    assert response.data is not None
+    prices = [call["result"]["price"] for call in response.data["tool_calls"]]
+    assert prices == [29.99, 99.99, 299.99]
+
+
+def test_reason_and_areason_retry_alike(stub_llm):
+    """Sync and async reasoning share one parse-retry loop."""
+    respond = {"decision_type": "respond", "reasoning": "ok", "message": "ok"}
+    llm = stub_llm(["not json", respond, "not json", respond])
+    agent = task_service._agent
+
+    sync_decision = agent.reason(Conversation(TaskInput(task="hi")))
+    async_decision = asyncio.run(agent.areason(Conversation(TaskInput(task="hi"))))
+
+    assert sync_decision == async_decision
+    sync_hint, async_hint = llm.calls[1][-1], llm.calls[3][-1]
+    assert sync_hint == async_hint
+    assert sync_hint is not async_hint  # Built per retry, never shared
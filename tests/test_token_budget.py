@@ -0,0 +1,115 @@
+"""Token budget and observation compaction tests."""
+
+from app.agents.conversation import Conversation
+from app.agents.token_budget import TokenBudget, TokenCounter
+from app.schemas.task import (
+    AgentDecision,
+    DecisionType,
+    Observation,
+    TaskInput,
+    ToolCall,
+)
+
+SYSTEM_PROMPT = "You are a test agent."
+
+
+def _conversation(turns: int, result_chars: int = 4000) -> Conversation:
+    conversation = Conversation(TaskInput(task="Summarize the catalog"))
+    for i in range(turns):
+        conversation.add_decision(
+            AgentDecision(
+                decision_type=DecisionType.USE_TOOL,
+                reasoning="need data",
+                tool_call=ToolCall(tool_name="get_pricing", arguments={"i": i}),
+            )
+        )
+        conversation.add_observations(
+            [
+                Observation(
+                    tool_name="get_pricing",
+                    success=True,
+                    result={
+                        "turn": i,
+                        "notes": "x" * result_chars,
+                        "rows": list(range(50)),
+                    },
+                )
+            ]
+        )
+    return conversation
+
+
+def _budget(max_tokens: int, **kwargs) -> TokenBudget:
+    return TokenBudget(TokenCounter("test", use_tiktoken=False), max_tokens, **kwargs)
+
+
+def test_counter_estimates_without_tokenizer():
+    """Without tiktoken, counts should be a characters / 4 estimate."""
+    counter = TokenCounter("test", use_tiktoken=False)
+
+    assert counter.count("a" * 400) == 101
+    assert not counter.exact
+    assert counter.count_messages([{"role": "user", "content": "a" * 400}]) == 105
+
+
+def test_under_budget_leaves_messages_untouched():
+    """A prompt that fits should be the system prompt plus the shared messages."""
+    conversation = _conversation(2)
+    budget = _budget(100_000)
+
+    messages = budget.build(SYSTEM_PROMPT, conversation)
+
+    assert messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert all(a is b for a, b in zip(messages[1:], conversation.messages))
+    assert budget.stats()["truncated"] == 0
+
+
+def test_older_observations_truncated_first():
+    """Older turns should be truncated before the latest one is touched."""
+    conversation = _conversation(3)
+    counter = TokenCounter("test", use_tiktoken=False)
+    full = counter.count_messages(
+        [{"role": "system", "content": SYSTEM_PROMPT}, *conversation.messages]
+    )
+    budget = _budget(full - 1000)
+
+    messages = budget.build(SYSTEM_PROMPT, conversation)
+
+    assert counter.count_messages(messages) <= budget.max_tokens
+    first, last = (
+        conversation.observation_turns[0][0],
+        conversation.observation_turns[-1][0],
+    )
+    assert "(truncated)" in messages[first + 1]["content"]
+    assert "more chars" in messages[first + 1]["content"]
+    assert "more items" in messages[first + 1]["content"]
+    assert messages[last + 1] is conversation.messages[last]
+    # The conversation itself keeps the full observations
+    assert "(truncated)" not in conversation.messages[first]["content"]
+
+
+def test_elides_when_truncation_is_not_enough():
+    """Results should be elided, latest turn last, down to the budget."""
+    conversation = _conversation(3)
+    budget = _budget(400, keep_recent=1)
+
+    messages = budget.build(SYSTEM_PROMPT, conversation)
+
+    contents = [
+        messages[index + 1]["content"] for index, _ in conversation.observation_turns
+    ]
+    assert all("elided" in content for content in contents[:2])
+    assert messages[0]["content"] == SYSTEM_PROMPT
+    assert messages[1] is conversation.messages[0]  # Task is never compacted
+    assert budget.stats()["elided"] >= 2
+
+
+def test_over_budget_is_counted():
+    """A prompt that can't fit even fully compacted should still be sent."""
+    conversation = _conversation(1)
+    budget = _budget(10)
+
+    messages = budget.build(SYSTEM_PROMPT, conversation)
+
+    assert len(messages) == len(conversation.messages) + 1
+    assert budget.stats()["over_budget"] == 1
@@ -1,6 +1,8 @@
 """Tool system tests."""
 
-from app.tools import registry
+import asyncio
+
+from app.tools import ToolRegistry, registry
 from app.tools.orders import CreateOrderTool
 from app.tools.pricing import GetPricingTool
 
@@ -85,3 +87,24 @@ def test_create_order_tool_invalid_quantity():
 
     assert result.success is False
     assert result.error is not None
+
+
+def test_tool_aexecute_defaults_to_execute():
+    """BaseTool.aexecute should fall back to running execute in a thread."""
+    tool = GetPricingTool()
+    result = asyncio.run(tool.aexecute(product_id="PROD-002"))
+
+    assert result.success is True
+    assert result.data is not None
+    assert result.data["price"] == 99.99
+
+
+def test_registry_version_bumps_on_register():
+    """Registering a tool should bump the registry version."""
+    local = ToolRegistry()
+    assert local.version == 0
+
+    local.register(GetPricingTool())
+    local.register(CreateOrderTool())
+
+    assert local.version == 2
@@ -0,0 +1,164 @@
+"""Tracing tests."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.task import TaskInput
+from app.services import task_service
+from app.tracing import (
+    FileExporter,
+    InMemoryExporter,
+    Tracer,
+    current_span,
+    parse_traceparent,
+    tracer,
+)
+
+client = TestClient(app)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans(monkeypatch, scripted):
+    """Record spans in memory and run tasks on the scripted LLM."""
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    scripted()
+    return exporter.spans
+
+
+def _by_name(spans, name):
+    return [span for span in spans if span.name == name]
+
+
+def test_task_spans_nest(spans):
+    """Iterations, LLM attempts and tool calls should nest under the task."""
+    asyncio.run(task_service.process_task(TaskInput(task="Price PROD-001")))
+
+    (task,) = _by_name(spans, "process_task")
+    iterations = _by_name(spans, "process_task.iteration")
+    llm_calls = _by_name(spans, "llm.invoke")
+    (tool,) = _by_name(spans, "dispatch_tool")
+
+    assert task.parent_id is None
+    assert task.attributes["status"] == "success"
+    assert task.attributes["iterations"] == 2
+    assert [s.attributes["iteration"] for s in iterations] == [1, 2]
+    assert all(s.parent_id == task.span_id for s in iterations)
+    assert [s.attributes["decision_type"] for s in iterations] == [
+        "use_tool",
+        "respond",
+    ]
+    assert [s.parent_id for s in llm_calls] == [s.span_id for s in iterations]
+    assert llm_calls[0].attributes["attempt"] == 1
+    assert llm_calls[0].attributes["input_tokens"] > 0
+    # Started speculatively while the first decision was streaming
+    assert tool.parent_id == llm_calls[0].span_id
+    assert tool.attributes == {"tool.name": "get_pricing", "tool.success": True}
+    assert {s.trace_id for s in spans} == {task.trace_id}
+    assert all(s.status == "OK" for s in spans)
+
+
+def test_parse_retry_records_failed_attempt(spans, stub_llm):
+    """An unparseable attempt should be an ERROR span, the retry a new one."""
+    stub_llm(
+        ["not json", '{"decision_type": "respond", "reasoning": "r", "message": "m"}']
+    )
+
+    asyncio.run(task_service.process_task(TaskInput(task="Hi")))
+
+    first, second = _by_name(spans, "llm.invoke")
+    assert (first.attributes["attempt"], first.status) == (1, "ERROR")
+    assert "ValueError" in first.status_message
+    assert (second.attributes["attempt"], second.status) == (2, "OK")
+
+
+def test_incoming_traceparent_is_continued(spans):
+    """/tasks should join the caller's trace and return its span id."""
+    response = client.post(
+        "/tasks",
+        json={"task": "Hello"},
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+
+    (run_task,) = _by_name(spans, "run_task")
+    assert run_task.trace_id == TRACE_ID
+    assert run_task.parent_id == PARENT_ID
+    assert _by_name(spans, "process_task")[0].parent_id == run_task.span_id
+    assert response.headers["traceparent"] == f"00-{TRACE_ID}-{run_task.span_id}-01"
+
+
+def test_unsampled_traces_record_nothing(spans, monkeypatch):
+    """Unsampled parents and a zero sample rate should export no spans."""
+    client.post(
+        "/tasks",
+        json={"task": "Hello"},
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"},
+    )
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    response = client.post("/tasks", json={"task": "Hello"})
+
+    assert not spans
+    assert "traceparent" not in response.headers
+
+
+def test_disabled_tracer_is_a_no_op():
+    """Without an exporter, spans are shared no-ops that never become current."""
+    disabled = Tracer(None)
+
+    with disabled.start_span("a") as outer, disabled.start_span("b") as inner:
+        inner.set_attribute("key", "value")
+        assert current_span() is None
+
+    assert outer is inner and not outer.recording
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    """Each finished span should be appended as one OTel-style JSON object."""
+    path = tmp_path / "traces.jsonl"
+    exporter = FileExporter(str(path))
+    file_tracer = Tracer(exporter)
+
+    with file_tracer.start_span("outer", {"k": 1}):
+        with file_tracer.start_span("inner"):
+            pass
+    exporter.close()
+
+    inner, outer = [json.loads(line) for line in path.read_text().splitlines()]
+    assert inner["parent_span_id"] == outer["span_id"]
+    assert outer["attributes"] == {"k": 1}
+    assert outer["status"] == {"code": "OK"}
+    assert outer["end_time_unix_nano"] >= outer["start_time_unix_nano"]
+
+
+def test_in_memory_exporter_keeps_the_latest_spans():
+    exporter = InMemoryExporter(max_spans=2)
+    memory_tracer = Tracer(exporter)
+
+    for name in ("a", "b", "c"):
+        with memory_tracer.start_span(name):
+            pass
+
+    assert [span.name for span in exporter.spans] == ["b", "c"]
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        None,
+        "garbage",
+        f"01-{TRACE_ID}-{PARENT_ID}-01",
+        f"00-{'0' * 32}-{PARENT_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01",
+    ],
+)
+def test_invalid_traceparent_is_ignored(header):
+    """Malformed or all-zero traceparents should start a new trace."""
+    assert parse_traceparent(header) is None
@@ -0,0 +1,103 @@
+"""Per-task latency and token accounting tests."""
+
+import asyncio
+import logging
+
+from app.agents import usage as usage_module
+from app.agents.rate_limit import LLMRateLimiter
+from app.agents.usage import TaskUsage, estimate_cost, usage_stats
+from app.config import settings
+from app.schemas.task import ResponseStatus, TaskInput
+from app.services import task_service
+
+
+def _run_task(task: str = "Price PROD-001"):
+    return asyncio.run(task_service.process_task(TaskInput(task=task)))
+
+
+def test_usage_in_response_when_enabled(monkeypatch, scripted):
+    """Each iteration's timings and tokens should be in data["usage"]."""
+    scripted()
+    monkeypatch.setattr(settings, "task_usage_in_response", True)
+
+    response = _run_task()
+
+    assert response.status == ResponseStatus.SUCCESS
+    usage = response.data["usage"]
+    assert usage["model"] == settings.openai_model
+    first, second = usage["iterations"]
+    assert first["llm_calls"] == 1 and first["tools_ms"] > 0
+    assert second["tools_ms"] == 0
+    assert first["input_tokens"] > 0 and first["output_tokens"] > 0
+    assert usage["input_tokens"] == first["input_tokens"] + second["input_tokens"]
+    assert usage["cost_usd"] > 0
+
+
+def test_usage_not_in_response_by_default(scripted):
+    """Without the flag the response data should be unchanged."""
+    scripted()
+    response = _run_task()
+
+    assert "usage" not in response.data
+
+
+def test_task_complete_log_has_breakdown(scripted, caplog):
+    """The task.complete event should carry timings, tokens and cost."""
+    scripted()
+    with caplog.at_level(logging.INFO, logger="app.services.task_service"):
+        _run_task()
+
+    record = next(r for r in caplog.records if r.getMessage() == "task.complete")
+    for key in ("llm_ms", "parse_ms", "tools_ms", "input_tokens", "cost_usd"):
+        assert hasattr(record, key)
+    assert record.llm_calls == 2
+
+
+def test_per_model_totals(monkeypatch, scripted):
+    """Finished tasks should add to the per-model aggregates."""
+    scripted()
+    monkeypatch.setattr(usage_module, "_totals", {})
+
+    _run_task()
+    _run_task()
+
+    totals = usage_stats()[settings.openai_model]
+    assert totals["tasks"] == 2
+    assert totals["llm_calls"] == 4
+    assert totals["cost_usd"] == estimate_cost(
+        settings.openai_model, totals["input_tokens"], totals["output_tokens"]
+    )
+
+
+def test_cost_of_unpriced_model_is_unknown():
+    """Models without prices should report no cost rather than zero."""
+    usage = TaskUsage(model="unpriced-model")
+    usage.step().input_tokens = 1000
+
+    assert usage.totals()["cost_usd"] is None
+    assert estimate_cost("gpt-4o-mini", 1_000_000, 0) == 0.15
+
+
+def test_usage_in_failed_response(monkeypatch, stub_llm):
+    """A task that fails still reports what it spent."""
+    monkeypatch.setattr(settings, "task_usage_in_response", True)
+    stub_llm(["not json", "still not json"])
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    assert response.status == ResponseStatus.FAILED
+    assert response.data["usage"]["iterations"][0]["llm_calls"] == 2
+
+
+def test_llm_time_excludes_rate_limiter_waits(monkeypatch, stub_llm):
+    stub_llm([{"decision_type": "respond", "reasoning": "ok", "message": "ok"}])
+    limiter = LLMRateLimiter(requests_per_minute=600)  # One every 0.1 s
+    assert limiter.requests is not None
+    limiter.requests.reserve(600)  # Used up: the task waits 0.1 s for its turn
+    monkeypatch.setattr(task_service._agent, "rate_limiter", limiter)
+    monkeypatch.setattr(settings, "task_usage_in_response", True)
+
+    response = asyncio.run(task_service.process_task(TaskInput(task="hi")))
+
+    assert limiter.stats()["queued"] == 1
+    assert response.data["usage"]["llm_ms"] < 50